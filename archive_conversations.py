@@ -0,0 +1,44 @@
+"""
+Conversation history maintenance for EthioGerman Language School Telegram Bot.
+Creates upcoming monthly partitions of conversation_history and moves partitions
+older than the retention window into conversation_archive (compressed cold storage).
+
+Usage:
+    python archive_conversations.py
+
+Run daily from cron (or schedule the same two SQL calls with pg_cron in Supabase).
+Requires DATABASE_URL; CONVERSATION_RETENTION_MONTHS defaults to 6.
+"""
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+RETENTION_MONTHS = int(os.getenv('CONVERSATION_RETENTION_MONTHS', '6'))
+PARTITIONS_AHEAD = 2
+
+
+def archive_conversations() -> None:
+    """Ensure future partitions exist and archive expired ones."""
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set.")
+        sys.exit(2)
+
+    import psycopg
+
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute("SELECT ensure_conversation_partitions(%s)", (PARTITIONS_AHEAD,))
+        print(f"✓ Partitions ensured for the next {PARTITIONS_AHEAD} months")
+
+        with conn.transaction():
+            archived = conn.execute(
+                "SELECT archive_conversation_history(%s)",
+                (RETENTION_MONTHS,)
+            ).fetchone()[0]
+        print(f"✓ Archived {archived} sessions older than {RETENTION_MONTHS} months")
+
+
+if __name__ == '__main__':
+    archive_conversations()
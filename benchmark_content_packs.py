@@ -0,0 +1,143 @@
+"""
+Content pack benchmark for EthioGerman Language School Telegram Bot.
+Scales the bundled A1-B1 source up to --records records and times the pack
+pipeline: compiling the JSONL source, opening the memory-mapped pack, the first
+decode of a (level, exam type) group and the warm question sampling that the
+exam engine does instead of AI generation. With DATABASE_URL set it also times
+the batched import into exam_questions and lessons for several batch sizes.
+
+Usage:
+    python benchmark_content_packs.py
+    python benchmark_content_packs.py --records 200000 --batch-sizes 1 100 500 2000
+
+The import runs in a transaction that is rolled back, so no rows are left behind,
+but DATABASE_URL must still point at a local Postgres (never production) with
+the migrations applied. Everything else needs no database or API keys.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.content.pack import ContentPack, build_pack
+from bot.services.content_library import CONTENT_DIR, ContentLibrary
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+QUESTIONS_PER_EXAM = 5
+
+
+def write_source(path: Path, records: int) -> None:
+    """A JSONL source of `records` records, copies of the bundled ones under new keys."""
+    lines = (CONTENT_DIR / 'a1_b1.jsonl').read_text(encoding='utf-8').splitlines()
+    header, base = lines[0], [json.loads(line) for line in lines[1:] if line.strip()]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header + '\n')
+        for i in range(records):
+            record = base[i % len(base)]
+            f.write(json.dumps({**record, 'key': f"{record['key']}-{i}"}, ensure_ascii=False) + '\n')
+
+
+def percentiles(samples: list) -> str:
+    """p50/p95/p99 of latencies in seconds, formatted in ms."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return f"p50 {pick(0.5):7.3f} ms   p95 {pick(0.95):7.3f} ms   p99 {pick(0.99):7.3f} ms"
+
+
+def benchmark_serving(directory: Path, samples: int) -> None:
+    """Time opening the pack, the first decode of each group and warm sampling."""
+    started = time.perf_counter()
+    pack = ContentPack(directory / 'bench.egpack')
+    print(f"  open (mmap + index)      {(time.perf_counter() - started) * 1000:7.2f} ms")
+    groups = [(level, type_) for kind, level, type_ in pack.groups() if kind == 'question']
+    pack.close()
+
+    library = ContentLibrary(directory)
+    library.packs  # open the packs before timing
+    cold = []
+    for level, exam_type in groups:
+        started = time.perf_counter()
+        library.questions(level, exam_type)
+        cold.append(time.perf_counter() - started)
+    print(f"  first decode per group   {percentiles(cold)}   ({len(groups)} groups)")
+
+    warm = []
+    for i in range(samples):
+        level, exam_type = groups[i % len(groups)]
+        started = time.perf_counter()
+        library.sample(level, exam_type, QUESTIONS_PER_EXAM)
+        warm.append(time.perf_counter() - started)
+    print(f"  sample {QUESTIONS_PER_EXAM} questions       {percentiles(warm)}")
+
+
+def benchmark_import(path: Path, batch_sizes: list) -> None:
+    """Time the batched upserts of import_content.py, rolling each run back."""
+    import psycopg
+    from psycopg.types.json import Jsonb
+    from import_content import QUESTION_UPSERT_SQL, LESSON_UPSERT_SQL, batches
+
+    pack = ContentPack(path)
+    questions = [
+        (r['id'], r['level'], r['exam_type'], r['question_text'], Jsonb(r.get('question_data') or {}),
+         r.get('correct_answer') or '', r.get('difficulty') or 5)
+        for r in pack.records('question')
+    ]
+    lessons = [
+        (r['id'], r['level'], r['skill'], r.get('topic'), r['title'], Jsonb(r.get('content') or {}))
+        for r in pack.records('lesson')
+    ]
+    pack.close()
+
+    with psycopg.connect(DATABASE_URL) as conn:
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            with conn.transaction(force_rollback=True), conn.cursor() as cur:
+                for sql, rows in ((QUESTION_UPSERT_SQL, questions), (LESSON_UPSERT_SQL, lessons)):
+                    for batch in batches(rows, batch_size):
+                        cur.executemany(sql, batch)
+            elapsed = time.perf_counter() - started
+            total = len(questions) + len(lessons)
+            print(f"  batch size {batch_size:>5}  {elapsed:7.2f} s   {total / elapsed:8.0f} rows/s")
+
+
+def main() -> None:
+    """Build a scaled-up pack and time building, serving and (optionally) importing it."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=50_000, help="records in the scaled-up source")
+    parser.add_argument('--samples', type=int, default=10_000, help="timed question samples")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 500, 2000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        source = directory / 'bench.jsonl'
+        write_source(source, args.records)
+
+        started = time.perf_counter()
+        target = build_pack(source)
+        elapsed = time.perf_counter() - started
+        print(f"Build: {args.records} records in {elapsed:.2f} s ({args.records / elapsed:.0f} records/s), "
+              f"{source.stat().st_size / 2**20:.1f} MiB -> {target.stat().st_size / 2**20:.1f} MiB\n")
+
+        print("Serve")
+        benchmark_serving(directory, args.samples)
+
+        print("\nImport")
+        if not DATABASE_URL:
+            print("  skipped: DATABASE_URL is not set")
+            return
+        benchmark_import(target, args.batch_sizes)
+
+
+if __name__ == '__main__':
+    main()
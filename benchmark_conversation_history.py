@@ -0,0 +1,165 @@
+"""
+Conversation history benchmark for EthioGerman Language School Telegram Bot.
+Fills the partitioned conversation_history table with synthetic tutoring turns
+and measures the latency of the reads and inserts DatabaseService issues.
+
+Usage:
+    python setup_database.py                        # apply migrations to the local database first
+    python benchmark_conversation_history.py        # generate 50M rows, then benchmark
+    python benchmark_conversation_history.py --rows 1000000 --months 6
+    python benchmark_conversation_history.py --skip-generate
+
+Requires DATABASE_URL pointing at a local Postgres (never production): the
+generator inserts synthetic users with IDs from 9000000000 up and needs tens of
+GB of disk at 50M rows.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from uuid import uuid4
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+FIRST_USER_ID = 9_000_000_000
+MESSAGES_PER_SESSION = 20
+BATCH_ROWS = 1_000_000
+
+# (name, SQL equivalent of the PostgREST query); %(user)s and %(session)s are filled per sample
+READS = [
+    ('history (user)',
+     "SELECT * FROM conversation_history WHERE user_id = %(user)s ORDER BY timestamp DESC LIMIT 10"),
+    ('history (session)',
+     "SELECT * FROM conversation_history WHERE user_id = %(user)s AND session_id = %(session)s "
+     "ORDER BY timestamp DESC LIMIT 10"),
+    ('history (resume window)',
+     "SELECT * FROM conversation_history WHERE user_id = %(user)s "
+     "AND timestamp >= NOW() - INTERVAL '7 days' ORDER BY timestamp DESC LIMIT 10"),
+]
+
+INSERT_SQL = """
+INSERT INTO conversation_history (id, user_id, session_id, role, content, timestamp)
+VALUES (%s, %s, %s, 'user', 'Ich möchte einen Termin vereinbaren.', NOW())
+ON CONFLICT (id, timestamp) DO NOTHING
+"""
+
+
+def generate(conn, rows: int, users: int, months: int) -> None:
+    """Insert synthetic users and `rows` messages spread over the last `months` months."""
+    conn.execute(
+        "INSERT INTO users (id, first_name) "
+        "SELECT id, 'Benchmark' FROM generate_series(%s::BIGINT, %s::BIGINT) id "
+        "ON CONFLICT (id) DO NOTHING",
+        (FIRST_USER_ID, FIRST_USER_ID + users - 1)
+    )
+    for month in range(months + 1):
+        conn.execute(
+            "SELECT create_conversation_partition(((NOW() AT TIME ZONE 'UTC') - make_interval(months => %s))::DATE)",
+            (month,)
+        )
+    conn.commit()
+
+    # Row n belongs to session n / MESSAGES_PER_SESSION; sessions are dealt out to users
+    # round-robin and start at a random point in the window, one message a minute
+    for start in range(0, rows, BATCH_ROWS):
+        end = min(rows, start + BATCH_ROWS)
+        started = time.perf_counter()
+        conn.execute(
+            """
+            INSERT INTO conversation_history (user_id, session_id, role, content, timestamp)
+            SELECT %(first_user)s + (n / %(per_session)s) %% %(users)s,
+                   md5('session' || (n / %(per_session)s))::UUID,
+                   CASE WHEN n %% 2 = 0 THEN 'user' ELSE 'assistant' END,
+                   repeat('Das ist eine Beispielnachricht. ', 1 + (n %% 8)),
+                   NOW() - make_interval(mins => (hashtext('start' || (n / %(per_session)s)) & 2147483647)
+                                                 %% (%(months)s::INT * 30 * 24 * 60))
+                         + make_interval(mins => (n %% %(per_session)s)::INT)
+            FROM generate_series(%(start)s::BIGINT, %(end)s::BIGINT - 1) n
+            """,
+            {
+                'first_user': FIRST_USER_ID, 'per_session': MESSAGES_PER_SESSION, 'users': users,
+                'months': months, 'start': start, 'end': end
+            }
+        )
+        conn.commit()
+        print(f"  {end:,}/{rows:,} rows ({(end - start) / (time.perf_counter() - started):,.0f} rows/s)")
+
+    conn.execute("ANALYZE conversation_history")
+    conn.commit()
+
+
+def percentiles(samples: list) -> str:
+    """p50/p95/p99 of latencies in seconds, formatted in ms."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return f"p50 {pick(0.5):7.2f} ms   p95 {pick(0.95):7.2f} ms   p99 {pick(0.99):7.2f} ms"
+
+
+def benchmark(conn, users: int, samples: int) -> None:
+    """Time the history reads for random users, and single-message inserts."""
+    for name, sql in READS:
+        latencies = []
+        for _ in range(samples):
+            user = FIRST_USER_ID + random.randrange(users)
+            session = conn.execute(
+                "SELECT session_id FROM conversation_history WHERE user_id = %s "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (user,)
+            ).fetchone()
+            params = {'user': user, 'session': session[0] if session else str(uuid4())}
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            latencies.append(time.perf_counter() - started)
+        print(f"{name:<26} {percentiles(latencies)}")
+
+    latencies = []
+    for _ in range(samples):
+        user = FIRST_USER_ID + random.randrange(users)
+        started = time.perf_counter()
+        conn.execute(INSERT_SQL, (str(uuid4()), user, str(uuid4())))
+        conn.commit()
+        latencies.append(time.perf_counter() - started)
+    print(f"{'insert (one message)':<26} {percentiles(latencies)}")
+
+    sql = READS[2][1] % {'user': FIRST_USER_ID}
+    plan = conn.execute(f"EXPLAIN (ANALYZE, FORMAT TEXT) {sql}").fetchall()
+    scanned = sum(1 for (line,) in plan if 'conversation_history_' in line and 'Scan' in line)
+    print(f"\nResume-window read scans {scanned} partition index(es) (older months are pruned)")
+
+
+def main() -> None:
+    """Generate data unless skipped, then print latency percentiles."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000_000)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--samples', type=int, default=1000, help="timed queries per benchmark")
+    parser.add_argument('--skip-generate', action='store_true', help="benchmark data generated earlier")
+    args = parser.parse_args()
+
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set. Point it at a local Postgres with migrations applied.")
+        sys.exit(2)
+
+    import psycopg
+
+    with psycopg.connect(DATABASE_URL) as conn:
+        if not args.skip_generate:
+            print(f"Generating {args.rows:,} messages for {args.users:,} users over {args.months} months...")
+            generate(conn, args.rows, args.users, args.months)
+
+        total = conn.execute(
+            "SELECT COALESCE(SUM(GREATEST(child.reltuples, 0)), 0)::BIGINT "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'conversation_history'::regclass"
+        ).fetchone()[0]
+        print(f"\nconversation_history: ~{total:,} rows (planner estimate), {args.samples} samples per benchmark\n")
+        benchmark(conn, args.users, args.samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Lesson delivery benchmark for EthioGerman Language School Telegram Bot.
+Runs simulated learning sessions through the learn handlers and compares the
+structured lesson flow (pick a skill and a lesson from the in-memory catalog,
+read it, then practice with the tutor) with free conversation, where the tutor
+is asked to teach the topic from scratch. Prints the average and p95 response
+latency and the LLM calls per session for each mode.
+
+Usage:
+    python benchmark_lessons.py
+    python benchmark_lessons.py --sessions 200 --turns 8 --llm-latency 2.5 --db-latency 0.05
+
+Needs no database or API keys: Telegram, the tutor and the database calls are
+stubs with the given latencies (measure the real ones in the bot's logs; the
+learn handlers log the time spent in the tutor), and lessons come from the
+bundled content packs.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+for name in ('TELEGRAM_BOT_TOKEN', 'SUPABASE_URL', 'SUPABASE_KEY', 'OPENROUTER_API_KEY'):
+    os.environ.setdefault(name, 'https://benchmark.invalid' if name == 'SUPABASE_URL' else 'benchmark')
+
+from bot.services import speech as speech_module
+from bot.services.speech import SpeechService
+
+# The learn handlers import speech_service; a worker socket keeps it from loading a model
+if speech_module._speech_service is None:
+    speech_module._speech_service = SpeechService(worker_sockets=['unused.sock'])
+
+from bot.handlers import learn  # noqa: E402
+from bot.services import lesson_catalog as lesson_catalog_module  # noqa: E402
+
+QUESTIONS = [
+    "Kannst du mir das erklären?", "Ist dieser Satz richtig?", "Noch ein Beispiel, bitte.",
+    "Warum ist das so?", "Ich verstehe das nicht ganz.", "Gib mir eine Übung."
+]
+
+
+class StubDatabase:
+    """The database calls of the learn flow, each taking `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def _wait(self, result=None):
+        await asyncio.sleep(self.latency)
+        return result
+
+    async def check_subscription(self, user_id):
+        return await self._wait((True, None))
+
+    async def get_user(self, user_id):
+        return await self._wait(SimpleNamespace(current_level='A1', preferred_lang='english'))
+
+    async def get_user_statistics(self, user_id):
+        return await self._wait({'weak_areas': []})
+
+    async def save_conversation(self, *args, **kwargs):
+        return await self._wait({})
+
+    async def get_lessons_version(self):
+        return await self._wait('1')
+
+    async def get_lesson_catalog(self, limit):
+        return await self._wait([])  # bundled lessons only
+
+    async def get_lesson_by_id(self, lesson_id):
+        return await self._wait(None)
+
+
+class StubTutor:
+    """ai_tutor.chat taking `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def chat(self, user_message, **kwargs):
+        await asyncio.sleep(self.latency)
+        return "Sehr gut! Versuch jetzt diesen Satz: ..."
+
+
+class Chat:
+    """A Telegram chat for one session: callback queries and text messages."""
+
+    def __init__(self, user_id: int):
+        user = SimpleNamespace(id=user_id)
+        self.query = SimpleNamespace(data='', from_user=user, answer=self._noop, edit_message_text=self._send)
+        self.message = SimpleNamespace(text='', voice=None, chat_id=user_id, reply_text=self._send)
+        self.update = SimpleNamespace(callback_query=self.query, message=self.message, effective_user=user)
+        self.context = SimpleNamespace(user_data={}, bot=SimpleNamespace(send_chat_action=self._noop))
+        self.latencies: List[float] = []
+
+    async def _noop(self, *args, **kwargs):
+        pass
+
+    async def _send(self, text, **kwargs):
+        self.last_markup = kwargs.get('reply_markup')
+
+    async def tap(self, handler, data: str) -> None:
+        """Press an inline button and time the handler's response."""
+        self.query.data = data
+        started = time.perf_counter()
+        await handler(self.update, self.context)
+        self.latencies.append(time.perf_counter() - started)
+
+    async def say(self, text: str) -> None:
+        """Send a text message and time the tutor's reply."""
+        self.message.text = text
+        started = time.perf_counter()
+        await learn.handle_message(self.update, self.context)
+        self.latencies.append(time.perf_counter() - started)
+
+    def buttons(self) -> List[str]:
+        """callback_data of the inline buttons last shown."""
+        return [button.callback_data for row in self.last_markup.inline_keyboard for button in row]
+
+
+async def free_chat(chat: Chat, turns: int, rng: random.Random) -> None:
+    """Free conversation: the tutor explains and practices the topic."""
+    await chat.tap(learn.skill_selected, 'learn_conversation')
+    for _ in range(turns):
+        await chat.say(rng.choice(QUESTIONS))
+
+
+async def lesson(chat: Chat, turns: int, rng: random.Random) -> None:
+    """Structured lesson: choose a skill and a lesson, read it, practice what is left of the turns."""
+    await chat.tap(learn.skill_selected, 'learn_lessons')
+    await chat.tap(learn.browse_lessons, rng.choice([b for b in chat.buttons() if b.startswith('lessons_skill_')]))
+    await chat.tap(learn.browse_lessons, rng.choice([b for b in chat.buttons() if b.startswith('lesson_open_')]))
+    await chat.tap(learn.start_lesson_practice, 'lesson_practice')
+    for _ in range(max(0, turns - 3)):
+        await chat.say(rng.choice(QUESTIONS))
+
+
+async def run(mode, sessions: int, turns: int) -> Tuple[List[float], List[int]]:
+    """Run the sessions concurrently; returns every response latency and each session's LLM calls."""
+    rng = random.Random(7)
+    chats = [Chat(9_300_000_000 + i) for i in range(sessions)]
+    await asyncio.gather(*(mode(chat, turns, rng) for chat in chats))
+    return [t for chat in chats for t in chat.latencies], [chat.context.user_data.get('llm_calls', 0) for chat in chats]
+
+
+def main() -> None:
+    """Print response latency and LLM calls per session for both modes."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=100, help="concurrent sessions per mode")
+    parser.add_argument('--turns', type=int, default=6, help="learner interactions per session")
+    parser.add_argument('--llm-latency', type=float, default=2.0, help="seconds per tutor reply")
+    parser.add_argument('--db-latency', type=float, default=0.03, help="seconds per database call")
+    args = parser.parse_args()
+
+    stub_db = StubDatabase(args.db_latency)
+    learn.db = stub_db
+    lesson_catalog_module.db = stub_db
+    learn.ai_tutor = StubTutor(args.llm_latency)
+    # The bot loads the catalog at startup (post_init)
+    asyncio.run(lesson_catalog_module.lesson_catalog.refresh(force=True))
+
+    print(f"{args.sessions} sessions of {args.turns} interactions, tutor {args.llm_latency:.1f} s, "
+          f"database {args.db_latency * 1000:.0f} ms\n")
+    print(f"{'mode':<14} {'responses':>9} {'LLM calls':>9} {'mean s':>7} {'p95 s':>7}")
+    for name, mode in (('free chat', free_chat), ('lesson', lesson)):
+        latencies, calls = asyncio.run(run(mode, args.sessions, args.turns))
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        print(f"{name:<14} {len(latencies) / args.sessions:>9.1f} {sum(calls) / args.sessions:>9.1f} "
+              f"{sum(latencies) / len(latencies):>7.2f} {p95:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
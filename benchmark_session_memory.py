@@ -0,0 +1,114 @@
+"""
+Exam session memory benchmark for EthioGerman Language School Telegram Bot.
+Simulates the `context.user_data` of many concurrent objective exams (the
+questions, the answers so far and the current question) and compares the
+memory held with raw Supabase row dictionaries against the slotted row models.
+
+Usage:
+    python benchmark_session_memory.py                # 10,000 sessions
+    python benchmark_session_memory.py --sessions 50000
+
+Needs no database or API keys.
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.services.models import ExamQuestion, Answer
+
+QUESTIONS_PER_EXAM = 10
+
+# One exam_questions row as PostgREST returns it
+QUESTION_ROW = json.dumps({
+    'id': '3f2b6c1e-8a4d-4f0e-9b7a-2c5d8e1f4a6b',
+    'level': 'A2',
+    'exam_type': 'lesen',
+    'question_text': 'Lesen Sie den Text. Was möchte Frau Berger am Samstag machen?',
+    'question_data': {
+        'passage': 'Liebe Anna, am Samstag gehe ich mit meiner Schwester auf den Markt.',
+        'options': ['Einkaufen gehen', 'Ins Kino gehen', 'Zu Hause bleiben', 'Sport machen'],
+        'topic': 'Freizeit'
+    },
+    'correct_answer': 'Einkaufen gehen',
+    'difficulty': 5,
+    'generated': False,
+    'irt_difficulty': None,
+    'irt_responses': 0
+})
+
+
+def dict_session() -> Dict[str, Any]:
+    """An exam's user_data with raw row dictionaries."""
+    questions = [json.loads(QUESTION_ROW) for _ in range(QUESTIONS_PER_EXAM)]
+    answers = [
+        {
+            'question_id': q['id'],
+            'user_answer': 'Einkaufen gehen',
+            'correct_answer': q['correct_answer'],
+            'is_correct': True,
+            'topic': q['question_data']['topic']
+        }
+        for q in questions
+    ]
+    return {'questions': questions, 'answers': answers, 'current_question_data': questions[-1]}
+
+
+def model_session() -> Dict[str, Any]:
+    """The same user_data with ExamQuestion and Answer models."""
+    questions = [ExamQuestion.from_row(json.loads(QUESTION_ROW)) for _ in range(QUESTIONS_PER_EXAM)]
+    answers = [
+        Answer(q.id, 'Einkaufen gehen', q.correct_answer, True, q.topic)
+        for q in questions
+    ]
+    return {'questions': questions, 'answers': answers, 'current_question_data': questions[-1]}
+
+
+def measure(build: Callable[[], Dict[str, Any]], sessions: int) -> int:
+    """Bytes held by `sessions` simulated exam sessions."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        held: List[Dict[str, Any]] = [build() for _ in range(sessions)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del held
+    return after - before
+
+
+def access_time(session: Dict[str, Any], read: Callable[[Any], Any], rounds: int = 20000) -> float:
+    """Seconds per field read on a session's questions."""
+    questions = session['questions']
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for question in questions:
+            read(question)
+    return (time.perf_counter() - started) / (rounds * len(questions))
+
+
+def main() -> None:
+    """Print memory per session and field access time for both representations."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=10_000)
+    args = parser.parse_args()
+
+    dicts = measure(dict_session, args.sessions)
+    models = measure(model_session, args.sessions)
+    print(f"{args.sessions:,} concurrent exam sessions, {QUESTIONS_PER_EXAM} questions each")
+    print(f"  row dicts:   {dicts / 2**20:7.1f} MiB  ({dicts / args.sessions / 1024:5.1f} KiB per session)")
+    print(f"  row models:  {models / 2**20:7.1f} MiB  ({models / args.sessions / 1024:5.1f} KiB per session)")
+    print(f"  saved:       {1 - models / dicts:7.0%}")
+
+    dict_read = access_time(dict_session(), lambda q: q['correct_answer'])
+    model_read = access_time(model_session(), lambda q: q.correct_answer)
+    print(f"\nField read: dict {dict_read * 1e9:.0f} ns, model {model_read * 1e9:.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Concurrent transcription benchmark for EthioGerman Language School Telegram Bot.
+Sends 1 to 32 voice clips at once through SpeechService's dispatcher (each clip
+goes to the next free WHISPER_WORKERS thread) and through the batching window it
+replaced (clips collected for --window ms and run together, the next window
+waiting for the whole batch), and prints throughput and latency per level.
+
+Usage:
+    python benchmark_speech_concurrency.py --audio sample.ogg
+    python benchmark_speech_concurrency.py --audio sample.ogg --tier standard --workers 4 --seconds 15
+
+The audio should be a German voice recording (any format PyAV reads); clips of
+--seconds are cut from it, looping if it is shorter. Needs faster-whisper and the
+tier's model (downloaded on first use); no database or API keys.
+"""
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.config import Config
+
+LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+def load_clip(path: str, seconds: float):
+    """16 kHz float32 samples of the recording, looped or cut to `seconds`."""
+    import numpy as np
+    from faster_whisper import decode_audio
+
+    samples = decode_audio(path, sampling_rate=16000)
+    return np.resize(samples, int(seconds * 16000)).astype(np.float32)
+
+
+async def dispatched(service, clip, count: int, tier: str) -> List[float]:
+    """Latencies of `count` simultaneous clips through SpeechService.transcribe_samples."""
+    started = time.perf_counter()
+
+    async def one() -> float:
+        await service.transcribe_samples(clip, 'de', tier)
+        return time.perf_counter() - started
+
+    return list(await asyncio.gather(*(one() for _ in range(count))))
+
+
+async def windowed(service, clip, count: int, tier: str, window: float, max_batch: int = 16) -> List[float]:
+    """The replaced dispatch: wait out the window, run the batch, start the next batch when all are done."""
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    latencies: List[float] = []
+    remaining = count
+    while remaining:
+        await asyncio.sleep(window)
+        batch = min(max_batch, remaining)
+        remaining -= batch
+        await asyncio.gather(*(
+            loop.run_in_executor(service._executor, service._transcribe_sync, clip, 'de', tier)
+            for _ in range(batch)
+        ))
+        latencies += [time.perf_counter() - started] * batch
+    return latencies
+
+
+def summary(latencies: List[float]) -> Tuple[float, float, float]:
+    """(clips per second, p50 latency, p95 latency)."""
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return len(ordered) / ordered[-1], pick(0.5), pick(0.95)
+
+
+def main() -> None:
+    """Print throughput and latency for each concurrency level and dispatch mode."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audio', help="German voice recording to cut clips from")
+    parser.add_argument('--seconds', type=float, default=8.0, help="clip length (voice notes are mostly short)")
+    parser.add_argument('--tier', default='fast', choices=list(Config.SPEECH_TIERS))
+    parser.add_argument('--workers', type=int, default=Config.WHISPER_WORKERS)
+    parser.add_argument('--window', type=float, default=0.25, help="batching window in seconds")
+    parser.add_argument('--levels', type=int, nargs='+', default=LEVELS)
+    args = parser.parse_args()
+
+    if not args.audio:
+        print("Pass --audio with a German voice recording; Whisper skips synthetic audio as non-speech.")
+        sys.exit(2)
+
+    Config.WHISPER_WORKERS = args.workers
+    from bot.services.speech import SpeechService
+
+    service = SpeechService(worker_sockets=[])
+    if not service.is_available:
+        print("faster-whisper or the Whisper model is not available.")
+        sys.exit(2)
+    clip = load_clip(args.audio, args.seconds)
+    service._transcribe_sync(clip, 'de', args.tier)  # load the tier's model and warm up
+
+    print(f"{args.seconds:.0f} s clips, '{args.tier}' tier, {args.workers} worker threads\n")
+    print(f"{'clips':>5}  {'mode':<10} {'clips/s':>8} {'audio x':>8} {'p50 s':>7} {'p95 s':>7}")
+    for count in args.levels:
+        for mode, run in (
+            ('dispatch', lambda: dispatched(service, clip, count, args.tier)),
+            ('window', lambda: windowed(service, clip, count, args.tier, args.window)),
+        ):
+            rate, p50, p95 = summary(asyncio.run(run()))
+            print(f"{count:>5}  {mode:<10} {rate:>8.2f} {rate * args.seconds:>8.1f} {p50:>7.2f} {p95:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
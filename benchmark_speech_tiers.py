@@ -0,0 +1,120 @@
+"""
+Speech tier benchmark for EthioGerman Language School Telegram Bot.
+Transcribes a set of German recordings with every quality tier in
+Config.SPEECH_TIERS (and any extra model/beam combinations) and prints the
+word error rate against reference transcripts next to the real-time factor
+(transcription time / audio length), to pick the tiers' models and beams.
+
+Usage:
+    python benchmark_speech_tiers.py --samples samples/
+    python benchmark_speech_tiers.py --samples samples/ --extra small:1 medium:5 --threads 4
+
+The samples directory holds recordings (any format PyAV reads) with a
+reference transcript next to each: hallo.ogg and hallo.txt. A few dozen
+learner-style voice notes of 5-30 s are enough to rank the tiers. Needs
+faster-whisper and the models (downloaded on first use); no database or API keys.
+"""
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.config import Config
+
+AUDIO_SUFFIXES = {'.ogg', '.oga', '.opus', '.mp3', '.m4a', '.wav', '.flac'}
+
+
+def load_samples(directory: Path) -> List[Tuple[str, str]]:
+    """(audio path, reference text) for every recording with a .txt next to it."""
+    samples = []
+    for path in sorted(directory.iterdir()):
+        reference = path.with_suffix('.txt')
+        if path.suffix.lower() in AUDIO_SUFFIXES and reference.exists():
+            samples.append((str(path), reference.read_text(encoding='utf-8')))
+    return samples
+
+
+def words(text: str) -> List[str]:
+    """Lowercased words without punctuation (umlauts and ß kept)."""
+    return re.findall(r"\w+", text.lower())
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Word-level edit distance (substitutions, insertions and deletions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def benchmark(service, clips, tier: str) -> Tuple[float, float]:
+    """(WER, real-time factor) of one tier over all clips."""
+    errors = reference_words = 0
+    elapsed = duration = 0.0
+    for audio, reference in clips:
+        started = time.perf_counter()
+        transcript = service._transcribe_sync(audio, 'de', tier)
+        elapsed += time.perf_counter() - started
+        duration += len(audio) / service.SAMPLE_RATE
+
+        expected = words(reference)
+        errors += word_errors(expected, words(transcript.text))
+        reference_words += len(expected)
+    return errors / max(1, reference_words), elapsed / duration
+
+
+def main() -> None:
+    """Print WER and real-time factor for each tier."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', help="directory of recordings with reference .txt files")
+    parser.add_argument('--extra', nargs='*', default=[], metavar='MODEL:BEAM',
+                        help="more model/beam combinations to compare, e.g. small:1")
+    parser.add_argument('--threads', type=int, default=Config.WHISPER_CPU_THREADS, help="CTranslate2 cpu_threads")
+    args = parser.parse_args()
+
+    if not args.samples or not Path(args.samples).is_dir():
+        print("Pass --samples with a directory of German recordings and reference .txt transcripts.")
+        sys.exit(2)
+
+    Config.WHISPER_CPU_THREADS = args.threads
+    Config.TRANSCRIPT_CACHE_ENABLED = False
+    for extra in args.extra:
+        model_size, beam_size = extra.split(':')
+        Config.SPEECH_TIERS[extra] = {'model_size': model_size, 'beam_size': int(beam_size)}
+
+    from bot.services.speech import SpeechService, WHISPER_AVAILABLE
+
+    service = SpeechService(worker_sockets=[])
+    if not WHISPER_AVAILABLE or not service.is_available:
+        print("faster-whisper or the Whisper model is not available.")
+        sys.exit(2)
+
+    from faster_whisper import decode_audio
+
+    clips = [(decode_audio(path, sampling_rate=service.SAMPLE_RATE), text) for path, text in load_samples(Path(args.samples))]
+    if not clips:
+        print(f"No recordings with reference transcripts in {args.samples}.")
+        sys.exit(2)
+    minutes = sum(len(audio) for audio, _ in clips) / service.SAMPLE_RATE / 60
+    print(f"{len(clips)} clips, {minutes:.1f} min of audio, {args.threads} CPU threads\n")
+
+    print(f"{'tier':<10} {'model':<10} {'beam':>4} {'WER':>7} {'RTF':>7}")
+    for tier, settings in Config.SPEECH_TIERS.items():
+        service._transcribe_sync(clips[0][0], 'de', tier)  # load the model and warm up
+        wer, rtf = benchmark(service, clips, tier)
+        print(f"{tier:<10} {settings['model_size']:<10} {settings['beam_size']:>4} {wer:>7.1%} {rtf:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Speech worker benchmark for EthioGerman Language School Telegram Bot.
+Sends batches of simultaneous voice notes through SpeechService twice: with
+Whisper loaded in the bot process (WHISPER_WORKERS threads) and with the same
+number of standalone speech worker processes (bot/services/speech_worker.py)
+behind Unix sockets. Prints throughput, latency and how late the bot's event
+loop wakes up meanwhile, since in-process decoding competes with it for the GIL.
+
+Usage:
+    python benchmark_speech_workers.py --audio sample.ogg
+    python benchmark_speech_workers.py --audio sample.ogg --workers 4 --clips 8 32 --tier standard
+
+The audio should be a German voice note (OGG/Opus as Telegram sends it, or any
+format PyAV reads); it is sent as-is, like a downloaded voice message. Run it
+on a box with at least --workers cores. Needs faster-whisper and the tier's
+model (downloaded on first use); no database or API keys.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.config import Config
+
+CLIPS = [1, 4, 16, 32]
+
+# Event loop probe: sleep this long and record how late the loop wakes up
+PROBE_INTERVAL = 0.01
+
+
+async def loop_lag(stop: asyncio.Event) -> List[float]:
+    """Wake-up delays of the event loop until `stop` is set."""
+    delays = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(time.perf_counter() - started - PROBE_INTERVAL)
+    return delays
+
+
+async def in_process(service, data: bytes, tier: str) -> None:
+    """The bot's path without workers: decode and trim, then the worker threads."""
+    audio = await service.prepare_voice_async(data)
+    await service.transcribe_samples(audio, 'de', tier)
+
+
+async def out_of_process(service, data: bytes, tier: str) -> None:
+    """The bot's path with workers: send the encoded note to the least busy one."""
+    from bot.services.speech_worker import ENCODING_COMPRESSED
+
+    await service._transcribe_remote(data, ENCODING_COMPRESSED, 'de', tier)
+
+
+async def run(send, service, data: bytes, count: int, tier: str) -> Tuple[List[float], List[float]]:
+    """Latencies of `count` simultaneous notes and the event loop's wake-up delays meanwhile."""
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag(stop))
+    started = time.perf_counter()
+
+    async def one() -> float:
+        await send(service, data, tier)
+        return time.perf_counter() - started
+
+    latencies = list(await asyncio.gather(*(one() for _ in range(count))))
+    stop.set()
+    return latencies, await probe
+
+
+def start_workers(directory: str, count: int) -> Tuple[List[subprocess.Popen], List[str]]:
+    """Start `count` single-threaded speech workers and wait for their sockets."""
+    env = {**os.environ, 'WHISPER_WORKERS': '1', 'TRANSCRIPT_CACHE_ENABLED': 'false'}
+    sockets = [os.path.join(directory, f'speech-{i}.sock') for i in range(count)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-m', 'bot.services.speech_worker', '--socket', path],
+            cwd=Path(__file__).parent, env=env, stderr=subprocess.DEVNULL
+        )
+        for path in sockets
+    ]
+    deadline = time.monotonic() + 300  # first start may download the model
+    while not all(os.path.exists(path) for path in sockets):
+        if time.monotonic() > deadline or any(p.poll() is not None for p in processes):
+            stop_workers(processes)
+            print("Speech workers did not start; is the Whisper model available?")
+            sys.exit(2)
+        time.sleep(0.2)
+    return processes, sockets
+
+
+def stop_workers(processes: List[subprocess.Popen]) -> None:
+    """Terminate the worker processes."""
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait()
+
+
+def report(mode: str, count: int, latencies: List[float], lag: List[float]) -> None:
+    """One result line: notes/s, latency p50/p95 and worst event loop delay."""
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    worst_lag = max(lag, default=0.0) * 1000
+    print(f"{count:>5}  {mode:<14} {count / ordered[-1]:>8.2f} {pick(0.5):>7.2f} {pick(0.95):>7.2f} {worst_lag:>11.1f}")
+
+
+def main() -> None:
+    """Compare in-process and worker-process transcription at each batch size."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audio', help="German voice note to send")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help="worker threads in process, and worker processes out of it")
+    parser.add_argument('--tier', default='fast', choices=list(Config.SPEECH_TIERS))
+    parser.add_argument('--clips', type=int, nargs='+', default=CLIPS, help="simultaneous notes per batch")
+    args = parser.parse_args()
+
+    if not args.audio:
+        print("Pass --audio with a German voice note; Whisper skips synthetic audio as non-speech.")
+        sys.exit(2)
+    data = Path(args.audio).read_bytes()
+
+    Config.WHISPER_WORKERS = args.workers
+    Config.TRANSCRIPT_CACHE_ENABLED = False
+    from bot.services.speech import SpeechService
+
+    local = SpeechService(worker_sockets=[])
+    if not local.is_available:
+        print("faster-whisper or the Whisper model is not available.")
+        sys.exit(2)
+    asyncio.run(in_process(local, data, args.tier))  # load the tier's model and warm up
+
+    with tempfile.TemporaryDirectory() as directory:
+        processes, sockets = start_workers(directory, args.workers)
+        try:
+            remote = SpeechService(worker_sockets=sockets)
+            # Warm up every worker: simultaneous notes go to different (least busy) workers
+            asyncio.run(run(out_of_process, remote, data, len(sockets), args.tier))
+
+            print(f"'{args.tier}' tier, {args.workers} worker threads vs {args.workers} worker processes\n")
+            print(f"{'notes':>5}  {'mode':<14} {'notes/s':>8} {'p50 s':>7} {'p95 s':>7} {'loop lag ms':>11}")
+            for count in args.clips:
+                report('in-process', count, *asyncio.run(run(in_process, local, data, count, args.tier)))
+                report('worker procs', count, *asyncio.run(run(out_of_process, remote, data, count, args.tier)))
+        finally:
+            stop_workers(processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+User statistics benchmark for EthioGerman Language School Telegram Bot.
+Gives synthetic users 10, 1,000 and 100,000 progress rows and compares the
+get_user_statistics RPC (aggregation in Postgres) with the previous approach:
+fetch the latest 100 rows and aggregate them in Python.
+
+Usage:
+    python setup_database.py                   # apply migrations to the local database first
+    python benchmark_user_statistics.py
+    python benchmark_user_statistics.py --sizes 10 1000 100000 1000000 --samples 200
+
+Requires DATABASE_URL pointing at a local Postgres (never production): the
+generator inserts synthetic users with IDs from 9100000000 up.
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+FIRST_USER_ID = 9_100_000_000
+
+SKILLS = ['lesen', 'horen', 'schreiben', 'sprechen', 'vokabular', 'grammatik']
+WEAK_AREAS = ['Dativ', 'Akkusativ', 'Perfekt', 'Wortstellung', 'Artikel', 'Modalverben', 'Präpositionen']
+
+RPC_SQL = "SELECT get_user_statistics(%s)"
+
+# What DatabaseService.get_user_progress(limit=100) sent before the RPC
+ROWS_SQL = "SELECT * FROM user_progress WHERE user_id = %s ORDER BY completed_at DESC LIMIT 100"
+
+
+def generate(conn, user_id: int, rows: int) -> None:
+    """Replace the user's progress with `rows` synthetic entries."""
+    conn.execute(
+        "INSERT INTO users (id, first_name) VALUES (%s, 'Benchmark') ON CONFLICT (id) DO NOTHING",
+        (user_id,)
+    )
+    conn.execute("DELETE FROM user_progress WHERE user_id = %s", (user_id,))
+    conn.execute(
+        """
+        INSERT INTO user_progress (user_id, skill, activity_type, score, weak_areas, completed_at)
+        SELECT %(user)s,
+               (%(skills)s::TEXT[])[1 + n %% %(skill_count)s],
+               'exam',
+               (hashtext('score' || n) & 2147483647) %% 101,
+               ARRAY[(%(areas)s::TEXT[])[1 + n %% %(area_count)s], (%(areas)s::TEXT[])[1 + (n / 3) %% %(area_count)s]],
+               NOW() - make_interval(mins => n)
+        FROM generate_series(1, %(rows)s) n
+        """,
+        {
+            'user': user_id, 'rows': rows,
+            'skills': SKILLS, 'skill_count': len(SKILLS),
+            'areas': WEAK_AREAS, 'area_count': len(WEAK_AREAS)
+        }
+    )
+    conn.commit()
+
+
+def client_side(rows: list) -> dict:
+    """The Python aggregation get_user_statistics did over the fetched rows."""
+    skill_scores = {}
+    weak_areas = Counter()
+    for row in rows:
+        skill_scores.setdefault(row['skill'], []).append(float(row['score'] or 0))
+        weak_areas.update(row['weak_areas'] or [])
+    averages = {skill: sum(s) / len(s) for skill, s in skill_scores.items()}
+    scores = [float(row['score'] or 0) for row in rows]
+    return {
+        'total_activities': len(rows),
+        'average_score': sum(scores) / len(scores) if scores else 0,
+        'skill_scores': averages,
+        'weak_areas': [area for area, _ in weak_areas.most_common(5)],
+        'strengths': [skill for skill, avg in averages.items() if avg >= 75]
+    }
+
+
+def percentiles(samples: list) -> str:
+    """p50/p95/p99 of latencies in seconds, formatted in ms."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return f"p50 {pick(0.5):7.2f} ms   p95 {pick(0.95):7.2f} ms   p99 {pick(0.99):7.2f} ms"
+
+
+def benchmark(conn, user_id: int, samples: int) -> None:
+    """Time the RPC and the fetch-and-aggregate path for one user."""
+    from psycopg.rows import dict_row
+
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        stats = conn.execute(RPC_SQL, (user_id,)).fetchone()[0]
+        latencies.append(time.perf_counter() - started)
+    print(f"  {'RPC (full history)':<28} {percentiles(latencies)}   {stats['total_activities']:,} activities")
+
+    latencies = []
+    with conn.cursor(row_factory=dict_row) as cur:
+        for _ in range(samples):
+            started = time.perf_counter()
+            stats = client_side(cur.execute(ROWS_SQL, (user_id,)).fetchall())
+            latencies.append(time.perf_counter() - started)
+    print(f"  {'fetch 100 + Python':<28} {percentiles(latencies)}   {stats['total_activities']:,} activities")
+
+
+def main() -> None:
+    """Generate each history size, then print latency percentiles."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1_000, 100_000])
+    parser.add_argument('--samples', type=int, default=500, help="timed calls per benchmark")
+    args = parser.parse_args()
+
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set. Point it at a local Postgres with migrations applied.")
+        sys.exit(2)
+
+    import psycopg
+
+    with psycopg.connect(DATABASE_URL) as conn:
+        for i, rows in enumerate(args.sizes):
+            user_id = FIRST_USER_ID + i
+            generate(conn, user_id, rows)
+            conn.execute("ANALYZE user_progress")
+            print(f"\n{rows:,} progress rows, {args.samples} samples")
+            benchmark(conn, user_id, args.samples)
+
+
+if __name__ == '__main__':
+    main()
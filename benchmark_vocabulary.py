@@ -0,0 +1,175 @@
+"""
+Vocabulary scheduling benchmark for EthioGerman Language School Telegram Bot.
+Models 100,000 students with 2,000 spaced-repetition cards each: times the
+per-deck operations of bot/services/vocabulary.py (building the due heap when a
+deck is loaded, taking the next due card and rescheduling it) against scanning
+every card, measures deck memory, and replays a day of reviews from the active
+students through VocabularyScheduler's LRU of decks.
+
+Usage:
+    python benchmark_vocabulary.py
+    python benchmark_vocabulary.py --users 100000 --cards 2000 --active 20000 --cache 2000
+
+Needs no database or API keys: decks are synthetic and loaded through a stub
+of the two database calls; the service modules create their clients at import,
+so placeholder credentials are filled in for any that are unset.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+for name in ('TELEGRAM_BOT_TOKEN', 'SUPABASE_URL', 'SUPABASE_KEY', 'OPENROUTER_API_KEY'):
+    os.environ.setdefault(name, 'https://benchmark.invalid' if name == 'SUPABASE_URL' else 'benchmark')
+
+from bot.config import Config
+from bot.services import vocabulary as vocabulary_module
+from bot.services.models import VocabularyCard
+from bot.services.vocabulary import DAY, Deck, VocabularyScheduler, Word, sm2
+
+REVIEWS_PER_SESSION = 20
+
+
+def make_words(count: int) -> Dict[str, Word]:
+    """A synthetic A1 word list of `count` words."""
+    return {f'Wort{i}': Word(f'Wort{i}', f'word {i}', f'Das ist Wort{i}.', 'A1') for i in range(count)}
+
+
+def make_cards(user_id: int, words: Dict[str, Word], now: float) -> List[VocabularyCard]:
+    """A student's cards, a tenth of them due; the rest spread over the next 60 days."""
+    rng = random.Random(user_id)
+    return [
+        VocabularyCard(
+            word, 'A1',
+            ease=round(rng.uniform(1.3, 2.8), 3),
+            interval_days=rng.choice([1.0, 6.0, 15.0, 40.0]),
+            repetitions=rng.randrange(1, 6),
+            due_at=now + (rng.uniform(-DAY, 0) if rng.random() < 0.1 else rng.uniform(0, 60 * DAY))
+        )
+        for word in words
+    ]
+
+
+class StubDatabase:
+    """get_vocabulary_cards/save_vocabulary_cards over synthetic decks, counting the loads."""
+
+    def __init__(self, words: Dict[str, Word], now: float):
+        self.words = words
+        self.now = now
+        self.loads = 0
+
+    async def get_vocabulary_cards(self, user_id: int) -> List[VocabularyCard]:
+        self.loads += 1
+        return make_cards(user_id, self.words, self.now)
+
+    async def save_vocabulary_cards(self, user_id: int, cards: List[VocabularyCard], only_new: bool = False) -> bool:
+        return True
+
+
+def percentiles(samples: list) -> str:
+    """p50/p95/p99 of latencies in seconds, formatted in µs."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+    return f"p50 {pick(0.5):8.1f} µs   p95 {pick(0.95):8.1f} µs   p99 {pick(0.99):8.1f} µs"
+
+
+def scan_next_due(cards: Dict[str, VocabularyCard], now: float):
+    """Next due card without the heap: look at every card."""
+    card = min(cards.values(), key=lambda c: (c.due_at, c.word))
+    return card if card.due_at <= now else None
+
+
+def deck_operations(words: Dict[str, Word], decks: int) -> float:
+    """Time loading decks and a review session on each, with the heap and with a scan; returns bytes per deck."""
+    now = time.time()
+    cards = [make_cards(user_id, words, now) for user_id in range(decks)]
+
+    build = []
+    for user_cards in cards:
+        started = time.perf_counter()
+        Deck(user_cards)
+        build.append(time.perf_counter() - started)
+    print(f"  {'load deck (heapify)':<26} {percentiles(build)}")
+
+    for name, next_due in (('heap', lambda deck: deck.next_due(now)), ('scan', lambda deck: scan_next_due(deck.cards, now))):
+        latencies = []
+        for user_cards in cards:
+            deck = Deck(user_cards)
+            for _ in range(REVIEWS_PER_SESSION):
+                started = time.perf_counter()
+                card = next_due(deck)
+                if card is not None:
+                    deck.add(sm2(card, 4, now))
+                latencies.append(time.perf_counter() - started)
+        print(f"  {'next due + review (' + name + ')':<26} {percentiles(latencies)}")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [Deck(make_cards(user_id, words, now)) for user_id in range(decks)]
+    per_deck = (tracemalloc.get_traced_memory()[0] - before) / len(kept)
+    tracemalloc.stop()
+    return per_deck
+
+
+async def review_day(scheduler: VocabularyScheduler, users: int, active: int, seed: int = 1) -> List[float]:
+    """Sessions of REVIEWS_PER_SESSION reviews from `active` random students, interleaved over the day."""
+    rng = random.Random(seed)
+    students = rng.sample(range(users), active)
+    # Most students come back for a second session later in the day
+    sessions = students + rng.sample(students, active * 2 // 3)
+    rng.shuffle(sessions)
+
+    latencies = []
+    for user_id in sessions:
+        for _ in range(REVIEWS_PER_SESSION):
+            started = time.perf_counter()
+            item = await scheduler.next_card(user_id, 'A1')
+            if item is not None:
+                await scheduler.review(user_id, 'A1', item[0].word, rng.choice([2, 3, 4, 5]))
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main() -> None:
+    """Print per-deck timings, projected memory and a day of reviews through the LRU."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100_000, help="students with a deck")
+    parser.add_argument('--cards', type=int, default=2_000, help="cards per student")
+    parser.add_argument('--active', type=int, default=5_000, help="students reviewing during the day")
+    parser.add_argument('--cache', type=int, default=Config.VOCAB_CACHE_SIZE,
+                        help="decks kept in memory (VOCAB_CACHE_SIZE)")
+    parser.add_argument('--decks', type=int, default=200, help="decks sampled for the per-deck timings")
+    args = parser.parse_args()
+
+    words = make_words(args.cards)
+
+    print(f"Per deck ({args.cards} cards, {args.decks} decks)")
+    per_deck = deck_operations(words, args.decks)
+    print(f"  {'memory per deck':<26} {per_deck / 2**20:.2f} MiB")
+    print(f"  all {args.users} decks  {per_deck * args.users / 2**30:.1f} GiB,"
+          f" cached {args.cache}  {per_deck * args.cache / 2**30:.2f} GiB\n")
+
+    stub = StubDatabase(words, time.time())
+    vocabulary_module.db = stub
+    scheduler = VocabularyScheduler(max_users=args.cache, words=words)
+
+    started = time.perf_counter()
+    latencies = asyncio.run(review_day(scheduler, args.users, args.active))
+    elapsed = time.perf_counter() - started
+
+    print(f"A day of reviews ({args.active} of {args.users} students, LRU of {args.cache} decks)")
+    print(f"  {'next card + review':<26} {percentiles(latencies)}")
+    # Deck loads include generating the synthetic rows, standing in for the database read
+    print(f"  {len(latencies)} reviews in {elapsed:.1f} s, {stub.loads} deck loads"
+          f" ({stub.loads * REVIEWS_PER_SESSION / len(latencies):.0%} of sessions)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Voice note preprocessing benchmark for EthioGerman Language School Telegram Bot.
+Times the per-message work before Whisper runs for 5, 30 and 120 second
+OGG/Opus voice notes: the previous path (write the download to a temporary
+file, let faster-whisper decode the file, delete it) against SpeechService's
+in-memory path (decode the downloaded bytes, then trim silence with the VAD
+pre-pass).
+
+Usage:
+    python benchmark_voice_decode.py
+    python benchmark_voice_decode.py --audio sample.ogg --lengths 5 30 120 600 --samples 50
+
+Without --audio the notes are synthetic (voiced bursts with pauses, encoded
+with libopus like Telegram voice notes); with it, the recording is looped or
+cut to each length and re-encoded. Needs faster-whisper (for PyAV and NumPy),
+but no Whisper model, database or API keys.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot.config import Config
+
+LENGTHS = [5, 30, 120]
+
+# Telegram voice notes are 48 kHz mono Opus in an OGG container
+OPUS_RATE = 48000
+
+
+def synthetic_speech(seconds: float):
+    """Float32 samples at 48 kHz: 1 s voiced bursts, 0.4 s pauses, quiet edges and background noise."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * OPUS_RATE)) / OPUS_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / OPUS_RATE) / k for k in range(1, 6))
+    gate = ((t % 1.4) < 1.0) & (t > 0.5) & (t < seconds - 0.5)
+    samples = 0.3 * voiced * gate + 0.003 * rng.standard_normal(len(t))
+    return samples.astype(np.float32)
+
+
+def recording(path: str, seconds: float):
+    """A recording at 48 kHz, looped or cut to `seconds`."""
+    import numpy as np
+    from faster_whisper import decode_audio
+
+    return np.resize(decode_audio(path, sampling_rate=OPUS_RATE), int(seconds * OPUS_RATE)).astype(np.float32)
+
+
+def encode_voice_note(samples) -> bytes:
+    """OGG/Opus bytes as Telegram would deliver them."""
+    import av
+
+    buffer = io.BytesIO()
+    with av.open(buffer, 'w', format='ogg') as container:
+        stream = container.add_stream('libopus', rate=OPUS_RATE, layout='mono')
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format='flt', layout='mono')
+        frame.rate = OPUS_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def via_temp_file(service, data: bytes):
+    """The previous path: download to disk, decode the file, delete it."""
+    from faster_whisper import decode_audio
+
+    with tempfile.NamedTemporaryFile(suffix='.ogg', delete=False) as f:
+        f.write(data)
+        path = f.name
+    try:
+        return decode_audio(path, sampling_rate=service.SAMPLE_RATE)
+    finally:
+        os.unlink(path)
+
+
+def percentiles(samples: list) -> str:
+    """p50/p95/p99 of latencies in seconds, formatted in ms."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return f"p50 {pick(0.5):7.2f} ms   p95 {pick(0.95):7.2f} ms   p99 {pick(0.99):7.2f} ms"
+
+
+def benchmark(service, data: bytes, seconds: float, samples: int) -> None:
+    """Time each preprocessing path on one encoded voice note."""
+    paths = [
+        ('temp file + decode', lambda: via_temp_file(service, data)),
+        ('in-memory decode', lambda: service.decode_voice(data)),
+        ('in-memory + VAD', lambda: service.prepare_voice(data)),
+    ]
+    for name, run in paths:
+        run()  # warm up
+        latencies = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - started)
+        print(f"  {name:<20} {percentiles(latencies)}   {seconds / sorted(latencies)[len(latencies) // 2]:7.0f}x realtime")
+
+    audio = service.decode_voice(data)
+    voiced = service.trim_silence(audio)
+    kept = 0 if voiced is None else len(voiced) / len(audio)
+    print(f"  {len(data) / 1024:.0f} KiB Opus -> {audio.nbytes / 1024:.0f} KiB PCM, VAD keeps {kept:.0%}\n")
+
+
+def main() -> None:
+    """Encode a voice note per length and time its preprocessing."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audio', help="recording to use instead of synthetic speech")
+    parser.add_argument('--lengths', type=float, nargs='+', default=LENGTHS, help="voice note lengths in seconds")
+    parser.add_argument('--samples', type=int, default=20, help="timed runs per path")
+    args = parser.parse_args()
+
+    from bot.services.speech import SpeechService, WHISPER_AVAILABLE
+
+    if not WHISPER_AVAILABLE:
+        print("faster-whisper is not installed.")
+        sys.exit(2)
+
+    # Decoding and VAD need no model; the worker socket keeps SpeechService from loading one
+    Config.TRANSCRIPT_CACHE_ENABLED = False
+    service = SpeechService(worker_sockets=['unused.sock'])
+
+    for seconds in args.lengths:
+        samples = recording(args.audio, seconds) if args.audio else synthetic_speech(seconds)
+        print(f"{seconds:.0f} s voice note")
+        benchmark(service, encode_voice_note(samples), seconds, args.samples)
+
+
+if __name__ == '__main__':
+    main()
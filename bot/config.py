@@ -12,16 +12,56 @@ class Config:
     
     # Telegram
     TELEGRAM_BOT_TOKEN: str = os.getenv('TELEGRAM_BOT_TOKEN', '')
+    # Telegram user IDs allowed to use /status (comma-separated)
+    ADMIN_USER_IDS: list = [
+        int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip()
+    ]
     
     # Supabase
     SUPABASE_URL: str = os.getenv('SUPABASE_URL', '')
     SUPABASE_KEY: str = os.getenv('SUPABASE_KEY', '')
+    DB_TIMEOUT: float = float(os.getenv('DB_TIMEOUT', '10'))  # seconds per PostgREST request
+    DB_SLOW_CALL_SECONDS: float = 3.0  # slower queries count as failures for the circuit breaker
+    DB_WRITE_ATTEMPTS: int = 4  # tries per write on transient errors
+    DB_WRITE_DEADLINE: float = 15.0  # seconds a write may spend retrying
+    DB_RETRY_BASE_DELAY: float = 0.2  # backoff doubles per retry, full jitter
+    DB_RETRY_MAX_DELAY: float = 2.0
     
     # OpenRouter
     OPENROUTER_API_KEY: str = os.getenv('OPENROUTER_API_KEY', '')
     OPENROUTER_API_URL: str = 'https://openrouter.ai/api/v1/chat/completions'
     AI_MODEL: str = 'google/gemini-2.0-flash-exp:free'
     
+    # Model routing: comma-separated OpenRouter models per task, tried in order
+    AI_MODELS: dict = {
+        'chat': [m.strip() for m in os.getenv('AI_MODELS_CHAT', AI_MODEL).split(',') if m.strip()],
+        'evaluation': [m.strip() for m in os.getenv('AI_MODELS_EVALUATION', AI_MODEL).split(',') if m.strip()],
+        'generation': [m.strip() for m in os.getenv('AI_MODELS_GENERATION', AI_MODEL).split(',') if m.strip()],
+    }
+    LLM_MODEL_LATENCY_WINDOW: int = 200  # recent successful requests per model
+    LLM_MODEL_FAILURE_THRESHOLD: int = 3  # consecutive failures before a model is skipped
+    LLM_MODEL_COOLDOWN: float = 60.0  # seconds a failing model is skipped
+    # Hedged requests: tasks that fire a backup request when the first runs past p95 latency
+    LLM_HEDGE_TASKS: list = [t.strip() for t in os.getenv('LLM_HEDGE_TASKS', '').split(',') if t.strip()]  # e.g. "chat"
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # latencies needed before p95 is trusted
+    LLM_HEDGE_DEFAULT_DELAY: float = 8.0  # seconds, until then
+    LLM_HEDGE_MIN_DELAY: float = 1.0
+    LLM_SLOW_CALL_SECONDS: float = 45.0  # slower requests count as failures for the circuit breaker
+    
+    # Circuit breakers (OpenRouter and Supabase): fail fast while a backend is degraded
+    CIRCUIT_WINDOW: int = 20  # recent calls considered
+    CIRCUIT_MIN_CALLS: int = 5  # calls in the window before the circuit can open
+    CIRCUIT_FAILURE_RATE: float = 0.5  # share of failed or slow calls that opens the circuit
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds open before probing
+    CIRCUIT_HALF_OPEN_CALLS: int = 2  # successful probes needed to close again
+    
+    # OpenRouter request scheduling (chat > evaluation > generation, round robin per user)
+    LLM_RATE_PER_MINUTE: float = float(os.getenv('LLM_RATE_PER_MINUTE', '20'))  # free tier limit
+    LLM_BURST: int = int(os.getenv('LLM_BURST', '5'))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+    LLM_MAX_ATTEMPTS: int = 3  # sends per request while rate limited (429)
+    LLM_RATE_LIMIT_PAUSE: float = 10.0  # seconds, when a 429 carries no Retry-After
+    
     # CEFR Levels
     CEFR_LEVELS: list = ['A1', 'A2', 'B1']
     
@@ -37,6 +77,89 @@ class Config:
     # Max conversation history for AI context
     MAX_CONVERSATION_HISTORY: int = 10
     
+    # Background evaluation of writing/speaking submissions
+    EVALUATION_QUEUE_PATH: str = os.getenv('EVALUATION_QUEUE_PATH', 'evaluations.db')
+    EVALUATION_WORKERS: int = int(os.getenv('EVALUATION_WORKERS', '4'))
+    EVALUATION_MAX_ATTEMPTS: int = 4
+    EVALUATION_RETRY_BASE: float = 5.0  # seconds, doubled on every retry
+    EVALUATION_RETRY_MAX: float = 300.0
+    EVALUATION_FAILED_RETENTION: float = 7 * 24 * 3600  # seconds failed jobs are kept for inspection
+    
+    # Adaptive objective exams (Rasch model, abilities and difficulties in logits)
+    ADAPTIVE_EXAMS: bool = os.getenv('ADAPTIVE_EXAMS', 'true').lower() == 'true'
+    # Questions (stored plus bundled) needed per level/type, else fixed buckets; the bundled
+    # pack has 5-10 per level and type, and simulate_adaptive.py shows no loss at that size
+    ADAPTIVE_MIN_BANK: int = int(os.getenv('ADAPTIVE_MIN_BANK', '5'))
+    ADAPTIVE_BANK_SIZE: int = 1000
+    ADAPTIVE_BANK_TTL: int = 600  # seconds before the question bank is reloaded
+    ADAPTIVE_MIN_QUESTIONS: int = 4
+    ADAPTIVE_TARGET_SE: float = 0.45  # stop once the ability estimate is this precise
+    ADAPTIVE_PRIOR_MIN_SD: float = 0.5  # keeps room for learning between exams
+    ADAPTIVE_ITEM_K: float = 0.4  # Elo step for question difficulty, shrinks with responses
+    
+    # Bundled content packs (content/*.egpack), used before AI-generated questions
+    CONTENT_PACKS_ENABLED: bool = os.getenv('CONTENT_PACKS_ENABLED', 'true').lower() == 'true'
+    
+    # Lesson catalog (lessons table plus bundled packs, held in memory)
+    LESSON_CATALOG_SIZE: int = 2000
+    LESSON_CATALOG_CHECK_INTERVAL: int = 60  # seconds between checks for changed lessons
+    
+    # Vocabulary review (SM-2 spaced repetition over vocabulary/a1_b1.tsv)
+    VOCAB_NEW_PER_DAY: int = 20  # new words introduced per day
+    VOCAB_RELEARN_MINUTES: int = 10  # forgotten words come back within the session
+    VOCAB_CACHE_SIZE: int = 2000  # users whose decks stay in memory
+    
+    # Objective exams: show answer feedback together with the next question (one edit per answer)
+    EXAM_FAST_FEEDBACK: bool = os.getenv('EXAM_FAST_FEEDBACK', 'true').lower() == 'true'
+    
+    # Resuming tutoring sessions
+    CONVERSATION_CACHE_SIZE: int = 1000  # users kept in the warm cache
+    RESUME_HISTORY_WINDOW: int = 20  # messages hydrated from the database
+    RESUME_VERBATIM_MESSAGES: int = 4  # most recent messages sent as-is, older ones summarized
+    RESUME_MAX_AGE_DAYS: int = 30
+    
+    # Speech transcription
+    WHISPER_DEVICE: str = os.getenv('WHISPER_DEVICE', 'cpu')  # "cuda" for GPU
+    WHISPER_COMPUTE_TYPE: str = os.getenv('WHISPER_COMPUTE_TYPE', 'int8')
+    WHISPER_CPU_THREADS: int = int(os.getenv('WHISPER_CPU_THREADS', '0'))  # 0 = CTranslate2 default
+    WHISPER_WORKERS: int = int(os.getenv('WHISPER_WORKERS', '2'))  # parallel transcriptions
+    WHISPER_BATCH_SIZE: int = 8  # speech chunks decoded per batch within one clip
+    WHISPER_DOWNGRADE_QUEUE: int = 8  # pending clips before falling back to a faster tier (0 = never)
+    
+    PARTIAL_TRANSCRIPT_INTERVAL: float = 1.5  # min seconds between partial transcript edits
+    
+    # Fluency metrics from word timestamps (speaking exams)
+    SPEECH_PAUSE_MIN_SEC: float = 0.3  # shorter gaps between words are not pauses
+    SPEECH_LONG_PAUSE_SEC: float = 1.0
+    SPEECH_LOW_CONFIDENCE: float = 0.5  # word probability below this is flagged as unclear
+    
+    # Out-of-process transcription (python -m bot.services.speech_worker); empty = in-process
+    SPEECH_WORKER_SOCKETS: list = [
+        path.strip() for path in os.getenv('SPEECH_WORKER_SOCKETS', '').split(',') if path.strip()
+    ]
+    SPEECH_WORKER_TIMEOUT: float = 120.0  # seconds per request
+    
+    # Energy-based silence trimming before transcription
+    VAD_ENABLED: bool = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+    VAD_FRAME_MS: int = 30
+    VAD_MIN_RMS: float = 0.01  # absolute floor, about -40 dBFS
+    VAD_NOISE_RATIO: float = 3.0  # voiced frames must be this much louder than the noise floor
+    VAD_PADDING_MS: int = 300  # audio kept around the voiced region
+    VAD_MIN_SPEECH_MS: int = 250  # clips with less voiced audio are rejected as empty
+    
+    # Transcript cache keyed by Telegram file_unique_id
+    TRANSCRIPT_CACHE_ENABLED: bool = os.getenv('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+    TRANSCRIPT_CACHE_PATH: str = os.getenv('TRANSCRIPT_CACHE_PATH', 'transcripts.db')
+    TRANSCRIPT_CACHE_TTL: int = 7 * 24 * 3600  # seconds
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = 20000
+    
+    # Quality tiers: greedy tiny model for chat, beam search on a larger model for graded exams
+    SPEECH_TIERS: dict = {
+        'fast': {'model_size': os.getenv('WHISPER_FAST_MODEL', 'tiny'), 'beam_size': 1},
+        'standard': {'model_size': os.getenv('WHISPER_MODEL', 'base'), 'beam_size': 5},
+        'accurate': {'model_size': os.getenv('WHISPER_ACCURATE_MODEL', 'small'), 'beam_size': 5},
+    }
+    
     @classmethod
     def validate(cls) -> bool:
         """Validate that all required configuration is present."""
@@ -52,8 +175,15 @@ class Config:
         if missing:
             raise ValueError(f"Missing required configuration: {', '.join(missing)}")
         
+        # The LLM scheduler divides by the rate and never dispatches without tokens or slots
+        limits = [
+            ('LLM_RATE_PER_MINUTE', cls.LLM_RATE_PER_MINUTE),
+            ('LLM_BURST', cls.LLM_BURST),
+            ('LLM_MAX_CONCURRENCY', cls.LLM_MAX_CONCURRENCY),
+        ]
+        invalid = [name for name, value in limits if value <= 0]
+        
+        if invalid:
+            raise ValueError(f"Configuration must be positive: {', '.join(invalid)}")
+        
         return True
-
-
-# Validate on import
-Config.validate()
@@ -0,0 +1,3 @@
+from .pack import ContentPack, build_pack, read_source, write_pack
+
+__all__ = ['ContentPack', 'build_pack', 'read_source', 'write_pack']
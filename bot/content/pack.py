@@ -0,0 +1,183 @@
+"""
+Content pack format for bundled exam questions and lessons.
+
+Sources are JSONL files (content/*.jsonl): an optional first line
+{"kind": "pack", "name": ..., "version": ...} followed by one record per line,
+either {"kind": "question", "key", "level", "exam_type", "question_text",
+"question_data", "correct_answer", "difficulty"} or {"kind": "lesson", "key",
+"level", "skill", "topic", "title", "content"}.
+
+Compiled packs (*.egpack, big-endian header):
+    magic "EGCP", version (uint8), index length (uint32), index (UTF-8 JSON), blocks
+Each block is zlib-compressed JSONL with up to BLOCK_RECORDS records of one
+(kind, level, type) group. The index lists every block's offset, length and
+record count, so readers memory-map the file and inflate only what they need.
+"""
+import os
+import json
+import mmap
+import zlib
+import struct
+import uuid
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+MAGIC = b'EGCP'
+VERSION = 1
+
+HEADER = struct.Struct('!4sBI')
+
+BLOCK_RECORDS = 256
+
+# Record IDs are derived from the record key, so re-importing a pack updates rows
+ID_NAMESPACE = uuid.UUID('c4b7b636-cd6e-4f88-8b18-c0e950d10cd9')
+
+REQUIRED_FIELDS = {
+    'question': ('key', 'level', 'exam_type', 'question_text'),
+    'lesson': ('key', 'level', 'skill', 'title'),
+}
+
+
+def record_id(record: Dict[str, Any]) -> str:
+    """Stable UUID of a record."""
+    return record.get('id') or str(uuid.uuid5(ID_NAMESPACE, record['key']))
+
+
+def group_key(record: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(kind, level, exam type or skill) block group of a record."""
+    kind = record['kind']
+    return kind, record['level'], record['exam_type'] if kind == 'question' else record['skill']
+
+
+def read_source(path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Parse and validate a JSONL content source.
+
+    Returns:
+        (pack metadata, records with their IDs filled in)
+    """
+    meta: Dict[str, Any] = {'name': Path(path).stem, 'version': 1}
+    records: List[Dict[str, Any]] = []
+    keys = set()
+
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.get('kind')
+
+            if kind == 'pack':
+                meta.update({k: v for k, v in record.items() if k != 'kind'})
+                continue
+            if kind not in REQUIRED_FIELDS:
+                raise ValueError(f"{path}:{line_no}: unknown record kind {kind!r}")
+
+            missing = [field for field in REQUIRED_FIELDS[kind] if not record.get(field)]
+            if missing:
+                raise ValueError(f"{path}:{line_no}: missing {', '.join(missing)}")
+            if record['key'] in keys:
+                raise ValueError(f"{path}:{line_no}: duplicate key {record['key']!r}")
+            keys.add(record['key'])
+
+            records.append({**record, 'id': record_id(record)})
+
+    return meta, records
+
+
+def write_pack(path: Path, meta: Dict[str, Any], records: List[Dict[str, Any]]) -> None:
+    """Write records as a compiled pack (atomically replacing an existing file)."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(group_key(record), []).append(record)
+
+    blocks: List[Dict[str, Any]] = []
+    body = bytearray()
+    for (kind, level, type_), group in sorted(groups.items()):
+        for start in range(0, len(group), BLOCK_RECORDS):
+            chunk = group[start:start + BLOCK_RECORDS]
+            data = zlib.compress(
+                ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in chunk).encode('utf-8'),
+                9
+            )
+            blocks.append({
+                'kind': kind, 'level': level, 'type': type_,
+                'offset': len(body), 'length': len(data), 'count': len(chunk)
+            })
+            body += data
+
+    index = json.dumps({**meta, 'records': len(records), 'blocks': blocks}, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def build_pack(source: Path, target: Optional[Path] = None) -> Path:
+    """
+    Compile a JSONL source into a pack next to it.
+
+    Returns:
+        Path of the written pack
+    """
+    source = Path(source)
+    target = Path(target) if target else source.with_suffix('.egpack')
+    meta, records = read_source(source)
+    write_pack(target, meta, records)
+    return target
+
+
+class ContentPack:
+    """Read-only view of a compiled pack through a memory map."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path}: not a content pack (magic={magic!r}, version={version})")
+
+        self.index: Dict[str, Any] = json.loads(self._mmap[HEADER.size:HEADER.size + index_length])
+        self._body = HEADER.size + index_length
+        self._groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for block in self.index['blocks']:
+            self._groups.setdefault((block['kind'], block['level'], block['type']), []).append(block)
+
+    @property
+    def name(self) -> str:
+        """Pack name from the source metadata."""
+        return self.index.get('name', self.path.stem)
+
+    def groups(self) -> List[Tuple[str, str, str]]:
+        """All (kind, level, type) groups in the pack."""
+        return list(self._groups)
+
+    def count(self, kind: str, level: str, type_: str) -> int:
+        """Number of records in a group, read from the index."""
+        return sum(block['count'] for block in self._groups.get((kind, level, type_), []))
+
+    def records(
+        self,
+        kind: str,
+        level: Optional[str] = None,
+        type_: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Decode the records of a kind, optionally only one level and/or type."""
+        for (block_kind, block_level, block_type), blocks in self._groups.items():
+            if block_kind != kind or level not in (None, block_level) or type_ not in (None, block_type):
+                continue
+            for block in blocks:
+                start = self._body + block['offset']
+                data = zlib.decompress(self._mmap[start:start + block['length']])
+                for line in data.decode('utf-8').splitlines():
+                    yield json.loads(line)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._mmap.close()
@@ -2,9 +2,11 @@
 Exam handler.
 Manages Goethe-style exam simulations.
 """
+import asyncio
 import logging
+from typing import Optional, List, Tuple
 from uuid import uuid4
-from telegram import Update
+from telegram import Update, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
@@ -14,10 +16,15 @@ from telegram.ext import (
     filters
 )
 
+from bot.config import Config
 from bot.services.database import db
 from bot.services.ai_tutor import ai_tutor
 from bot.services.exam_engine import exam_engine
 from bot.services.speech import speech_service
+from bot.services.models import Answer, ExamQuestion, Evaluation
+from bot.services.mock_exam import MockExamSession
+from bot.services.evaluation_queue import evaluation_queue, EvaluationJob
+from bot.services.adaptive import adaptive_engine, AdaptiveExam
 from bot.middleware.subscription import require_subscription
 from bot.utils.keyboards import Keyboards
 from bot.utils.formatters import Formatters
@@ -25,7 +32,7 @@ from bot.utils.formatters import Formatters
 logger = logging.getLogger(__name__)
 
 # Conversation states
-SELECTING_EXAM, ANSWERING_OBJECTIVE, WRITING_RESPONSE, SPEAKING_RESPONSE, REVIEWING_RESULTS = range(5)
+SELECTING_EXAM, ANSWERING_OBJECTIVE, WRITING_RESPONSE, SPEAKING_RESPONSE, REVIEWING_RESULTS, MOCK_BREAK = range(6)
 
 
 async def exam_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -78,17 +85,12 @@ async def exam_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     # Extract exam type
     exam_type = data.replace('exam_', '')
     
-    if exam_type == 'full':
-        await query.edit_message_text(
-            "Full Mock Exam coming soon!\n"
-            "For now, please select individual exam types.",
-            reply_markup=Keyboards.exam_menu()
-        )
-        return SELECTING_EXAM
-    
     # Get user data
     user_data = await db.get_user(user.id)
-    level = user_data.get('current_level', 'A1') if user_data else 'A1'
+    level = user_data.current_level if user_data else 'A1'
+    
+    if exam_type == 'full':
+        return await start_mock_exam(query, context, level)
     
     # Initialize exam session
     context.user_data['exam_type'] = exam_type
@@ -96,8 +98,18 @@ async def exam_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     context.user_data['answers'] = []
     context.user_data['current_question'] = 0
     
-    # Get questions
-    questions = await exam_engine.get_exam_questions(level, exam_type)
+    # Get questions: adaptive exams pick one at a time, starting near the user's ability
+    adaptive = None
+    if Config.ADAPTIVE_EXAMS and exam_type not in ['schreiben', 'sprechen']:
+        adaptive = await adaptive_engine.start_exam(
+            user.id, level, exam_type, exam_engine.QUESTION_COUNTS.get(exam_type, 5)
+        )
+    
+    if adaptive:
+        context.user_data['adaptive_exam'] = adaptive
+        questions = [adaptive.next_question()]
+    else:
+        questions = await exam_engine.get_exam_questions(level, exam_type)
     
     if not questions:
         await query.edit_message_text(
@@ -119,38 +131,188 @@ async def exam_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     if exam_type in ['schreiben', 'sprechen']:
         return await start_subjective_exam(query, context)
     else:
+        total = adaptive.max_questions if adaptive else None
+        context.user_data['rendered_questions'] = render_objective_questions(questions, total=total)
         return await show_objective_question(query, context)
 
 
+async def start_mock_exam(query, context: ContextTypes.DEFAULT_TYPE, level: str) -> int:
+    """Start the full mock exam: every section in order, one weighted report."""
+    session = MockExamSession(level, user_id=query.from_user.id)
+    session.start()  # Sections load while the attempt is created
+    
+    context.user_data['mock_exam'] = session
+    context.user_data['level'] = level
+    
+    attempt = await db.create_exam_attempt(query.from_user.id, 'full', level)
+    if attempt:
+        context.user_data['attempt_id'] = attempt.get('id')
+    
+    return await start_mock_section(query, context)
+
+
+async def start_mock_section(query, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Show the first question of the mock exam's current section."""
+    session: MockExamSession = context.user_data['mock_exam']
+    
+    questions = []
+    while not session.is_finished:
+        questions = await session.questions()
+        if questions:
+            break
+        logger.warning(f"No {session.section} questions for mock exam, skipping section")
+        session.skip_section()
+    
+    if session.is_finished:
+        return await show_mock_results(query, context)
+    
+    # The single-section flows run unchanged on the section's questions
+    context.user_data['exam_type'] = session.section
+    context.user_data['questions'] = questions
+    context.user_data['total_questions'] = len(questions)
+    context.user_data['answers'] = []
+    context.user_data['current_question'] = 0
+    
+    if session.section in MockExamSession.SUBJECTIVE_SECTIONS:
+        return await start_subjective_exam(query, context)
+    
+    context.user_data['rendered_questions'] = render_objective_questions(questions)
+    return await show_objective_question(query, context)
+
+
+async def mock_continue(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Continue with the next mock exam section."""
+    query = update.callback_query
+    await query.answer()
+    
+    if 'mock_exam' not in context.user_data:
+        return await cancel_exam(update, context)
+    
+    return await start_mock_section(query, context)
+
+
+async def show_mock_break(query, context: ContextTypes.DEFAULT_TYPE, summary: str) -> int:
+    """Pause between sections, or show the report after the last one."""
+    session: MockExamSession = context.user_data['mock_exam']
+    
+    if session.is_finished:
+        return await show_mock_results(query, context, summary)
+    
+    await query.edit_message_text(
+        Formatters.mock_exam_break(summary, session.index + 1, len(session.SECTIONS), session.section),
+        parse_mode='Markdown',
+        reply_markup=Keyboards.continue_exit()
+    )
+    return MOCK_BREAK
+
+
+async def show_mock_results(query, context: ContextTypes.DEFAULT_TYPE, summary: str = '') -> int:
+    """Wait for background evaluations and show the weighted mock exam report."""
+    user = query.from_user
+    session: MockExamSession = context.user_data['mock_exam']
+    attempt_id = context.user_data.get('attempt_id')
+    
+    if session.has_pending_evaluations:
+        await query.edit_message_text("Calculating your results... / Ergebnisse werden berechnet...")
+    
+    report = await session.finish()
+    
+    if attempt_id:
+        # Without every evaluation the score is partial: keep the answers, leave the attempt open
+        evaluated = not report['unevaluated']
+        await db.update_exam_attempt(
+            attempt_id,
+            answers=session.answers,
+            score=report['score'] if evaluated else None,
+            is_completed=evaluated
+        )
+    
+    # One progress entry per section so skill statistics include the mock exam
+    await asyncio.gather(*(
+        db.save_progress(
+            user_id=user.id,
+            skill=section,
+            activity_type='mock_exam',
+            score=score,
+            weak_areas=session.weak_areas.get(section, [])[:3]
+        )
+        for section, score in report['section_scores'].items()
+    ))
+    
+    formatted = Formatters.mock_exam_results(
+        section_scores=report['section_scores'],
+        score=report['score'],
+        passed=report['passed'],
+        weak_sections=report['weak_sections'],
+        unevaluated=report['unevaluated'],
+        skipped=report['skipped']
+    )
+    if summary:
+        formatted = f"{summary}\n{formatted}"
+    
+    await query.edit_message_text(
+        formatted,
+        parse_mode='Markdown',
+        reply_markup=Keyboards.view_results()
+    )
+    
+    context.user_data.clear()
+    return ConversationHandler.END
+
+
+def render_objective_questions(
+    questions: List[ExamQuestion],
+    start: int = 0,
+    total: Optional[int] = None
+) -> List[Tuple[str, InlineKeyboardMarkup]]:
+    """Format every question and its options keyboard once, at exam start."""
+    total = total or len(questions)
+    rendered = []
+    for i, question in enumerate(questions, start):
+        passage = question.data.get('passage', '')
+        options = question.data.get('options', ['A', 'B', 'C', 'D'])
+        rendered.append((
+            Formatters.exam_question(i + 1, total, question.question_text, passage),
+            Keyboards.mcq_options(options)
+        ))
+    return rendered
+
+
+def extend_adaptive_exam(context: ContextTypes.DEFAULT_TYPE, adaptive: AdaptiveExam) -> None:
+    """Queue the next question of an adaptive exam, unless its estimate has converged."""
+    question = adaptive.next_question()
+    if question is None:
+        return
+    
+    questions = context.user_data['questions']
+    context.user_data['rendered_questions'].extend(
+        render_objective_questions([question], start=len(questions), total=adaptive.max_questions)
+    )
+    questions.append(question)
+    context.user_data['total_questions'] = len(questions)
+
+
 async def show_objective_question(query, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Display an objective (MCQ) question."""
     current = context.user_data.get('current_question', 0)
     questions = context.user_data.get('questions', [])
-    total = context.user_data.get('total_questions', 0)
     
     if current >= len(questions):
         # All questions answered, show results
         return await show_exam_results(query, context)
     
-    question = questions[current]
-    question_data = question.get('question_data', {})
-    
-    # Format question text
-    question_text = question.get('question_text', '')
-    passage = question_data.get('passage', '')
-    
-    formatted = Formatters.exam_question(current + 1, total, question_text, passage)
-    
-    # Get options
-    options = question_data.get('options', ['A', 'B', 'C', 'D'])
+    rendered = context.user_data.get('rendered_questions')
+    if not rendered:
+        rendered = context.user_data['rendered_questions'] = render_objective_questions(questions)
+    formatted, keyboard = rendered[current]
     
     # Store current question data for answer checking
-    context.user_data['current_question_data'] = question
+    context.user_data['current_question_data'] = questions[current]
     
     await query.edit_message_text(
         formatted,
         parse_mode='Markdown',
-        reply_markup=Keyboards.mcq_options(options)
+        reply_markup=keyboard
     )
     
     return ANSWERING_OBJECTIVE
@@ -170,29 +332,53 @@ async def handle_objective_answer(update: Update, context: ContextTypes.DEFAULT_
     user_answer = data.replace('answer_', '')
     
     # Get current question
-    question = context.user_data.get('current_question_data', {})
+    question = context.user_data.get('current_question_data')
+    if question is None:
+        return await cancel_exam(update, context)
     
     # Check answer
     is_correct, explanation = exam_engine.check_answer(question, user_answer)
     
     # Store answer
     answers = context.user_data.get('answers', [])
-    answers.append({
-        'question_id': question.get('id'),
-        'user_answer': user_answer,
-        'correct_answer': question.get('correct_answer', ''),
-        'is_correct': is_correct,
-        'topic': question.get('question_data', {}).get('topic', context.user_data.get('exam_type'))
-    })
+    answers.append(Answer(
+        question_id=question.id,
+        user_answer=user_answer,
+        correct_answer=question.correct_answer,
+        is_correct=is_correct,
+        topic=question.topic
+    ))
     context.user_data['answers'] = answers
     
+    adaptive: Optional[AdaptiveExam] = context.user_data.get('adaptive_exam')
+    if adaptive:
+        adaptive.record(question, is_correct)
+        extend_adaptive_exam(context, adaptive)
+    
+    # Move to next question
+    current = context.user_data.get('current_question', 0) + 1
+    context.user_data['current_question'] = current
+    
+    if Config.EXAM_FAST_FEEDBACK:
+        # Feedback and the next question (or the results) in a single edit
+        feedback = Formatters.answer_feedback(is_correct, explanation)
+        questions = context.user_data.get('questions', [])
+        if current >= len(questions):
+            return await show_exam_results(query, context, feedback=feedback)
+        
+        formatted, keyboard = context.user_data['rendered_questions'][current]
+        context.user_data['current_question_data'] = questions[current]
+        await query.edit_message_text(
+            f"{feedback}\n\n{formatted}",
+            parse_mode='Markdown',
+            reply_markup=keyboard
+        )
+        return ANSWERING_OBJECTIVE
+    
     # Show feedback
     feedback_emoji = "" if is_correct else ""
     feedback = f"{feedback_emoji} {'Richtig!' if is_correct else 'Falsch.'}\n\n{explanation}"
     
-    # Move to next question
-    context.user_data['current_question'] = context.user_data.get('current_question', 0) + 1
-    
     await query.edit_message_text(
         feedback,
         reply_markup=Keyboards.next_question()
@@ -229,10 +415,10 @@ async def start_subjective_exam(query, context: ContextTypes.DEFAULT_TYPE) -> in
         return SELECTING_EXAM
     
     question = questions[0]
-    question_data = question.get('question_data', {})
+    question_data = question.data
     context.user_data['current_question_data'] = question
     
-    prompt = question.get('question_text', '') or question_data.get('question_text', '')
+    prompt = question.prompt
     requirements = question_data.get('requirements', [])
     word_count = question_data.get('word_count', {'min': 50, 'max': 100})
     
@@ -321,17 +507,23 @@ async def handle_speaking_input(update: Update, context: ContextTypes.DEFAULT_TY
     
     if message.voice:
         if speech_service.is_available:
-            await message.reply_text("Processing your voice message...")
+            status = await message.reply_text("Processing your voice message...")
             
-            transcribed = await speech_service.transcribe_telegram_voice(
+            async def show_partial(text: str) -> None:
+                await status.edit_text(f"Processing your voice message...\n\n\"{text}...\"")
+            
+            transcript = await speech_service.transcribe_speech(
                 message.voice,
-                context.bot
+                context.bot,
+                tier='accurate',
+                on_partial=show_partial
             )
             
-            if transcribed:
-                context.user_data['speaking_response'] = transcribed
-                await message.reply_text(
-                    f"Transcribed: \"{transcribed}\"\n\n"
+            if transcript:
+                context.user_data['speaking_response'] = transcript.text
+                context.user_data['speaking_metrics'] = transcript.metrics
+                await status.edit_text(
+                    f"Transcribed: \"{transcript.text}\"\n\n"
                     "Click Submit to get your evaluation.",
                     reply_markup=Keyboards.submit_cancel()
                 )
@@ -347,6 +539,7 @@ async def handle_speaking_input(update: Update, context: ContextTypes.DEFAULT_TY
             )
     else:
         context.user_data['speaking_response'] = message.text
+        context.user_data['speaking_metrics'] = None
         await message.reply_text(
             "Response received. Click Submit to get your evaluation.",
             reply_markup=Keyboards.submit_cancel()
@@ -363,34 +556,76 @@ async def submit_subjective(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user = update.effective_user
     exam_type = context.user_data.get('exam_type')
     level = context.user_data.get('level', 'A1')
-    question = context.user_data.get('current_question_data', {})
-    prompt = question.get('question_text', '') or question.get('question_data', {}).get('question_text', '')
+    question = context.user_data.get('current_question_data')
+    if question is None:
+        return await cancel_exam(update, context)
+    prompt = question.prompt
+    
+    if exam_type == 'schreiben':
+        user_text = ' '.join(context.user_data.get('writing_buffer', []))
+        metrics = None
+    else:
+        user_text = context.user_data.get('speaking_response', '')
+        metrics = context.user_data.get('speaking_metrics')
+    
+    session: Optional[MockExamSession] = context.user_data.get('mock_exam')
+    if session:
+        # Evaluated in the background while the next section runs
+        session.complete_subjective(question, user_text, metrics)
+        return await show_mock_break(query, context, f"*{exam_type.capitalize()} submitted.*")
+    
+    if evaluation_queue.is_running:
+        # Evaluated by the background workers; the result arrives as a new message
+        evaluation_queue.submit(
+            user_id=user.id,
+            chat_id=query.message.chat_id,
+            exam_type=exam_type,
+            level=level,
+            prompt=prompt,
+            question_id=question.id,
+            attempt_id=context.user_data.get('attempt_id'),
+            user_text=user_text,
+            metrics=metrics
+        )
+        await query.edit_message_text(
+            "Response submitted! / Antwort abgegeben!\n\n"
+            "Your evaluation will be sent to you here in a moment.",
+            reply_markup=Keyboards.back_to_menu()
+        )
+        context.user_data.clear()
+        return ConversationHandler.END
     
     await query.edit_message_text("Evaluating your response... / Bewertung lauft...")
     
     if exam_type == 'schreiben':
-        buffer = context.user_data.get('writing_buffer', [])
-        user_text = ' '.join(buffer)
-        
-        evaluation = await ai_tutor.evaluate_writing(user_text, prompt, level)
+        evaluation = await ai_tutor.evaluate_writing(user_text, prompt, level, user_id=user.id)
         formatted_result = Formatters.writing_evaluation(evaluation)
     else:
-        user_text = context.user_data.get('speaking_response', '')
-        evaluation = await ai_tutor.evaluate_speaking(user_text, prompt, level)
+        evaluation = await ai_tutor.evaluate_speaking(user_text, prompt, level, metrics, user_id=user.id)
         formatted_result = Formatters.speaking_evaluation(evaluation)
     
+    if evaluation.failed:
+        # Placeholder zeros: leave the attempt open and record no progress
+        await query.edit_message_text(
+            "Sorry, we couldn't evaluate your response right now.\n"
+            "Please submit it again later.",
+            reply_markup=Keyboards.back_to_menu()
+        )
+        context.user_data.clear()
+        return ConversationHandler.END
+    
     # Save results
-    score = evaluation.get('overall_score', 0)
+    score = evaluation.overall_score
     attempt_id = context.user_data.get('attempt_id')
     
     if attempt_id:
         await db.update_exam_attempt(
             attempt_id,
-            answers=[{
-                'question_id': question.get('id'),
-                'user_response': user_text,
-                'evaluation': evaluation
-            }],
+            answers=[Answer(
+                question_id=question.id,
+                user_answer=user_text,
+                evaluation=evaluation
+            )],
             score=score,
             is_completed=True
         )
@@ -401,7 +636,7 @@ async def submit_subjective(update: Update, context: ContextTypes.DEFAULT_TYPE)
         skill=exam_type,
         activity_type='exam',
         score=score,
-        weak_areas=evaluation.get('suggestions', [])[:3]
+        weak_areas=list(evaluation.suggestions[:3])
     )
     
     await query.edit_message_text(
@@ -416,8 +651,38 @@ async def submit_subjective(update: Update, context: ContextTypes.DEFAULT_TYPE)
     return ConversationHandler.END
 
 
-async def show_exam_results(query, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Show final exam results for objective exams."""
+async def deliver_evaluation(bot, job: EvaluationJob, evaluation: Optional[Evaluation]) -> None:
+    """Send a finished background evaluation to the student."""
+    if evaluation is None:
+        await bot.send_message(
+            job.chat_id,
+            "Sorry, we couldn't evaluate your response right now.\n"
+            "Please submit it again later.",
+            reply_markup=Keyboards.back_to_menu()
+        )
+        return
+    
+    if job.exam_type == 'schreiben':
+        formatted_result = Formatters.writing_evaluation(evaluation)
+    else:
+        formatted_result = Formatters.speaking_evaluation(evaluation)
+    
+    await bot.send_message(
+        job.chat_id,
+        formatted_result,
+        parse_mode='Markdown',
+        reply_markup=Keyboards.view_results()
+    )
+
+
+async def show_exam_results(query, context: ContextTypes.DEFAULT_TYPE, feedback: str = '') -> int:
+    """Show final exam results for objective exams, optionally below the last answer's feedback."""
+    session: Optional[MockExamSession] = context.user_data.get('mock_exam')
+    if session:
+        result = session.complete_objective(context.user_data.get('answers', []))
+        summary = f"*{result['correct_answers']}/{result['total_questions']} correct.*"
+        return await show_mock_break(query, context, f"{feedback}\n\n{summary}" if feedback else summary)
+    
     user = query.from_user
     exam_type = context.user_data.get('exam_type', 'unknown')
     answers = context.user_data.get('answers', [])
@@ -426,6 +691,13 @@ async def show_exam_results(query, context: ContextTypes.DEFAULT_TYPE) -> int:
     # Calculate score
     result = exam_engine.calculate_score(answers, exam_type)
     
+    adaptive: Optional[AdaptiveExam] = context.user_data.get('adaptive_exam')
+    if adaptive:
+        # Questions were matched to the student, so score the ability rather than the hit rate
+        await adaptive_engine.finish_exam(user.id, exam_type, adaptive)
+        result['score'] = adaptive.score()
+        result['passed'] = result['score'] >= 60
+    
     # Update attempt in database
     if attempt_id:
         await db.update_exam_attempt(
@@ -453,6 +725,8 @@ async def show_exam_results(query, context: ContextTypes.DEFAULT_TYPE) -> int:
         passed=result['passed'],
         weak_areas=result['weak_areas']
     )
+    if feedback:
+        formatted = f"{feedback}\n{formatted}"
     
     await query.edit_message_text(
         formatted,
@@ -468,6 +742,10 @@ async def show_exam_results(query, context: ContextTypes.DEFAULT_TYPE) -> int:
 
 async def cancel_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel the current exam."""
+    session: Optional[MockExamSession] = context.user_data.get('mock_exam')
+    if session:
+        session.cancel()
+    
     if update.callback_query:
         query = update.callback_query
         await query.answer()
@@ -511,6 +789,10 @@ exam_conversation_handler = ConversationHandler(
             MessageHandler(filters.VOICE, handle_speaking_input),
             CallbackQueryHandler(submit_subjective, pattern='^submit$'),
             CallbackQueryHandler(cancel_exam, pattern='^cancel$')
+        ],
+        MOCK_BREAK: [
+            CallbackQueryHandler(mock_continue, pattern='^continue$'),
+            CallbackQueryHandler(cancel_exam, pattern='^exit$')
         ]
     },
     fallbacks=[
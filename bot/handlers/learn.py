@@ -2,6 +2,7 @@
 Learning/tutoring conversation handler.
 Manages AI-powered German tutoring sessions.
 """
+import time
 import logging
 from uuid import uuid4
 from telegram import Update
@@ -17,6 +18,10 @@ from telegram.ext import (
 from bot.services.database import db
 from bot.services.ai_tutor import ai_tutor
 from bot.services.speech import speech_service
+from bot.services.conversation_cache import conversation_cache, summarize_history
+from bot.services.vocabulary import vocabulary_scheduler
+from bot.services.lesson_catalog import lesson_catalog
+from bot.config import Config
 from bot.middleware.subscription import require_subscription, get_subscription_warning
 from bot.utils.keyboards import Keyboards
 from bot.utils.formatters import Formatters
@@ -24,7 +29,7 @@ from bot.utils.formatters import Formatters
 logger = logging.getLogger(__name__)
 
 # Conversation states
-SELECTING_SKILL, IN_CONVERSATION = range(2)
+SELECTING_SKILL, IN_CONVERSATION, REVIEWING, BROWSING_LESSONS = range(4)
 
 
 async def learn_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -79,15 +84,50 @@ async def skill_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     # Get user data
     user_data = await db.get_user(user.id)
-    level = user_data.get('current_level', 'A1') if user_data else 'A1'
-    preferred_lang = user_data.get('preferred_lang', 'english') if user_data else 'english'
+    level = user_data.current_level if user_data else 'A1'
+    preferred_lang = user_data.preferred_lang if user_data else 'english'
+    
+    if skill == 'review':
+        # Flashcards from the bundled word list, scheduled locally (no AI calls)
+        context.user_data['review'] = {'level': level, 'reviewed': 0, 'remembered': 0}
+        return await show_review_card(query, context)
+    
+    if skill == 'lessons':
+        # Static lesson content comes from the in-memory catalog (no AI calls)
+        context.user_data['level'] = level
+        context.user_data['preferred_lang'] = preferred_lang
+        return await show_lesson_skills(query, context)
+    
+    if skill == 'continue':
+        # Resume the latest session from the warm cache (hydrated from the database on a miss)
+        cached = await conversation_cache.load(user.id)
+        if not cached or not cached.messages:
+            await query.edit_message_text(
+                "No recent session to continue.\n"
+                "Choose what you'd like to practice:",
+                reply_markup=Keyboards.learn_menu()
+            )
+            return SELECTING_SKILL
+        
+        recent = list(cached.messages)
+        keep = Config.RESUME_VERBATIM_MESSAGES
+        session_id = cached.session_id
+        skill = cached.skill
+        history = recent[-keep:]
+        session_summary = summarize_history(recent[:-keep]) or None
+    else:
+        session_id = str(uuid4())
+        history = []
+        session_summary = None
+        conversation_cache.start(user.id, session_id, skill)
     
     # Store session data
-    context.user_data['session_id'] = str(uuid4())
+    context.user_data['session_id'] = session_id
     context.user_data['skill'] = skill
     context.user_data['level'] = level
     context.user_data['preferred_lang'] = preferred_lang
-    context.user_data['conversation_history'] = []
+    context.user_data['conversation_history'] = history
+    context.user_data['session_summary'] = session_summary
     
     # Get user's weak areas for context
     stats = await db.get_user_statistics(user.id)
@@ -148,6 +188,16 @@ async def skill_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     intro = skill_intros.get(skill, skill_intros['conversation'])
     
+    if history:
+        last_reply = next((m['content'] for m in reversed(history) if m['role'] == 'assistant'), '')
+        intro = (
+            "Continuing your last session\n"
+            "Wir machen weiter!\n\n"
+            f"Level: {level}"
+        )
+        if last_reply:
+            intro += f"\n\nLast time:\n{last_reply[:500]}"
+    
     await query.edit_message_text(
         intro + "\n\nType /cancel to exit.",
         reply_markup=Keyboards.end_conversation()
@@ -165,16 +215,21 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if message.voice:
         # Handle voice message
         if speech_service.is_available:
-            await message.reply_text("Processing your voice message... / Verarbeite Sprachnachricht...")
+            status = await message.reply_text("Processing your voice message... / Verarbeite Sprachnachricht...")
+            
+            async def show_partial(text: str) -> None:
+                await status.edit_text(f"Listening... / Ich hore zu...\n\n\"{text}...\"")
             
             transcribed = await speech_service.transcribe_telegram_voice(
                 message.voice,
-                context.bot
+                context.bot,
+                tier='fast',
+                on_partial=show_partial
             )
             
             if transcribed:
                 user_text = transcribed
-                await message.reply_text(f"I heard: \"{transcribed}\"")
+                await status.edit_text(f"I heard: \"{transcribed}\"")
             else:
                 await message.reply_text(
                     "Sorry, I couldn't transcribe your voice message. Please try again or type your message."
@@ -195,6 +250,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     preferred_lang = context.user_data.get('preferred_lang', 'english')
     weak_areas = context.user_data.get('weak_areas', [])
     history = context.user_data.get('conversation_history', [])
+    session_summary = context.user_data.get('session_summary')
     
     # Save user message to history
     history.append({'role': 'user', 'content': user_text})
@@ -203,22 +259,30 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await context.bot.send_chat_action(chat_id=message.chat_id, action='typing')
     
     # Get AI response
+    started = time.monotonic()
     response = await ai_tutor.chat(
         user_message=user_text,
         conversation_history=history,
         level=level,
         preferred_lang=preferred_lang,
         skill_focus=skill if skill != 'conversation' else None,
-        weak_areas=weak_areas
+        weak_areas=weak_areas,
+        session_summary=session_summary,
+        user_id=user.id
     )
     
+    context.user_data['llm_calls'] = context.user_data.get('llm_calls', 0) + 1
+    context.user_data['llm_seconds'] = context.user_data.get('llm_seconds', 0.0) + time.monotonic() - started
+    
     # Save AI response to history
     history.append({'role': 'assistant', 'content': response})
     context.user_data['conversation_history'] = history
     
     # Save to database for long-term memory
-    await db.save_conversation(user.id, session_id, 'user', user_text)
-    await db.save_conversation(user.id, session_id, 'assistant', response)
+    await db.save_conversation(user.id, session_id, 'user', user_text, skill=skill)
+    await db.save_conversation(user.id, session_id, 'assistant', response, skill=skill)
+    conversation_cache.append(user.id, session_id, skill, 'user', user_text)
+    conversation_cache.append(user.id, session_id, skill, 'assistant', response)
     
     # Add subscription warning if needed
     warning = get_subscription_warning(context)
@@ -262,6 +326,12 @@ async def end_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         'skill': context.user_data.get('skill'),
         'messages': messages_count
     }
+    llm_calls = context.user_data.get('llm_calls', 0)
+    logger.info(
+        f"Session {session_data['session_id']} ({session_data['skill']}, "
+        f"lesson {context.user_data.get('lesson_id') or '-'}): {messages_count} messages, {llm_calls} AI calls, "
+        f"avg reply {context.user_data.get('llm_seconds', 0.0) / llm_calls if llm_calls else 0:.2f}s"
+    )
     context.user_data.clear()
     
     await query.edit_message_text(
@@ -275,6 +345,198 @@ async def end_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     return ConversationHandler.END
 
 
+async def show_lesson_skills(query, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """List the skills that have lessons at the user's level."""
+    level = context.user_data.get('level', 'A1')
+    counts = await lesson_catalog.skills(level)
+    
+    if not counts:
+        await query.edit_message_text(
+            f"No lessons for level {level} yet.\n"
+            "Choose what you'd like to practice:",
+            reply_markup=Keyboards.learn_menu()
+        )
+        return SELECTING_SKILL
+    
+    await query.edit_message_text(
+        f"Lessons / Lektionen ({level})\n\n"
+        "Choose a skill:",
+        reply_markup=Keyboards.lesson_skills(counts)
+    )
+    return BROWSING_LESSONS
+
+
+async def browse_lessons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Navigate the lesson catalog: skills, lesson lists and single lessons."""
+    query = update.callback_query
+    await query.answer()
+    
+    data = query.data
+    level = context.user_data.get('level', 'A1')
+    
+    if data == 'lessons_menu':
+        await query.edit_message_text(
+            "Learning Center / Lernzentrum\n\n"
+            "Choose what you'd like to practice:",
+            reply_markup=Keyboards.learn_menu()
+        )
+        return SELECTING_SKILL
+    
+    if data.startswith('lessons_skill_'):
+        skill = data.replace('lessons_skill_', '')
+        lessons = await lesson_catalog.lessons(level, skill)
+        if lessons:
+            await query.edit_message_text(
+                f"{skill.capitalize()} lessons ({level}):",
+                reply_markup=Keyboards.lesson_list(lessons)
+            )
+            return BROWSING_LESSONS
+    
+    if data.startswith('lesson_open_'):
+        lesson = await lesson_catalog.get(data.replace('lesson_open_', ''))
+        if lesson:
+            context.user_data['lesson_id'] = str(lesson['id'])
+            await query.edit_message_text(
+                Formatters.lesson_content(lesson),
+                parse_mode='Markdown',
+                reply_markup=Keyboards.lesson_actions(lesson['skill'])
+            )
+            return BROWSING_LESSONS
+    
+    return await show_lesson_skills(query, context)
+
+
+async def start_lesson_practice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Continue an opened lesson as a tutoring session seeded with the lesson."""
+    query = update.callback_query
+    await query.answer()
+    
+    user = update.effective_user
+    lesson = await lesson_catalog.get(context.user_data.get('lesson_id', ''))
+    if lesson is None:
+        return await show_lesson_skills(query, context)
+    
+    content = lesson.get('content') or {}
+    practice = content.get('practice') or "Let's practice what you just learned. Write your first sentence!"
+    opener = f"{lesson['title']}\n\n{practice}"
+    
+    session_id = str(uuid4())
+    skill = lesson['skill']
+    conversation_cache.start(user.id, session_id, skill)
+    conversation_cache.append(user.id, session_id, skill, 'assistant', opener)
+    await db.save_conversation(user.id, session_id, 'assistant', opener, skill=skill)
+    
+    context.user_data['session_id'] = session_id
+    context.user_data['skill'] = skill
+    context.user_data['conversation_history'] = [{'role': 'assistant', 'content': opener}]
+    context.user_data['session_summary'] = (
+        f"The student just read the lesson \"{lesson['title']}\" ({lesson.get('topic') or skill}): "
+        f"{content.get('explanation', '')}"
+    )
+    
+    stats = await db.get_user_statistics(user.id)
+    context.user_data['weak_areas'] = stats.get('weak_areas', [])
+    
+    await query.edit_message_text(
+        opener + "\n\nType /cancel to exit.",
+        reply_markup=Keyboards.end_conversation()
+    )
+    return IN_CONVERSATION
+
+
+async def show_review_card(query, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Show the front of the next due flashcard, or finish when none are left."""
+    user_id = query.from_user.id
+    review = context.user_data['review']
+    
+    due = await vocabulary_scheduler.next_card(user_id, review['level'])
+    if due is None:
+        return await finish_review(query, context, finished=True)
+    
+    card, word = due
+    review['word'] = card.word
+    await query.edit_message_text(
+        Formatters.vocabulary_card(
+            word.german,
+            review['level'],
+            await vocabulary_scheduler.due_count(user_id, review['level'])
+        ),
+        reply_markup=Keyboards.review_reveal()
+    )
+    return REVIEWING
+
+
+async def reveal_review_card(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Show the back of the current flashcard with the grade buttons."""
+    query = update.callback_query
+    await query.answer()
+    
+    review = context.user_data.get('review')
+    word = vocabulary_scheduler.words.get(review['word']) if review else None
+    if word is None:
+        return await finish_review(query, context, finished=False)
+    
+    await query.edit_message_text(
+        Formatters.vocabulary_card(
+            word.german,
+            review['level'],
+            await vocabulary_scheduler.due_count(query.from_user.id, review['level']),
+            english=word.english,
+            example=word.example
+        ),
+        reply_markup=Keyboards.review_grades()
+    )
+    return REVIEWING
+
+
+async def grade_review_card(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Reschedule the current flashcard with the chosen grade and show the next one."""
+    query = update.callback_query
+    await query.answer()
+    
+    review = context.user_data.get('review')
+    if not review or 'word' not in review:
+        return await finish_review(query, context, finished=False)
+    
+    grade = int(query.data.replace('review_grade_', ''))
+    await vocabulary_scheduler.review(query.from_user.id, review['level'], review.pop('word'), grade)
+    review['reviewed'] += 1
+    if grade >= 3:
+        review['remembered'] += 1
+    
+    return await show_review_card(query, context)
+
+
+async def end_review(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Stop a vocabulary review session."""
+    query = update.callback_query
+    await query.answer()
+    return await finish_review(query, context, finished=False)
+
+
+async def finish_review(query, context: ContextTypes.DEFAULT_TYPE, finished: bool) -> int:
+    """Save the review session as progress and return to the main menu."""
+    review = context.user_data.get('review') or {}
+    reviewed = review.get('reviewed', 0)
+    remembered = review.get('remembered', 0)
+    
+    if reviewed:
+        await db.save_progress(
+            user_id=query.from_user.id,
+            skill='vokabular',
+            activity_type='review',
+            score=round(remembered * 100 / reviewed, 1)
+        )
+    
+    context.user_data.clear()
+    
+    await query.edit_message_text(
+        Formatters.vocabulary_review_summary(reviewed, remembered, finished),
+        reply_markup=Keyboards.main_menu()
+    )
+    return ConversationHandler.END
+
+
 async def cancel_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel the tutoring conversation via /cancel command."""
     context.user_data.clear()
@@ -303,6 +565,15 @@ learn_conversation_handler = ConversationHandler(
             MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message),
             MessageHandler(filters.VOICE, handle_message),
             CallbackQueryHandler(end_conversation, pattern='^end_conversation$')
+        ],
+        BROWSING_LESSONS: [
+            CallbackQueryHandler(start_lesson_practice, pattern='^lesson_practice$'),
+            CallbackQueryHandler(browse_lessons, pattern='^lessons?_')
+        ],
+        REVIEWING: [
+            CallbackQueryHandler(reveal_review_card, pattern='^review_show$'),
+            CallbackQueryHandler(grade_review_card, pattern=r'^review_grade_\d$'),
+            CallbackQueryHandler(end_review, pattern='^review_end$')
         ]
     },
     fallbacks=[
@@ -84,7 +84,7 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         # Get user stats
         user_data = await db.get_user(user.id)
         stats = await db.get_user_statistics(user.id)
-        level = user_data.get('current_level', 'A1') if user_data else 'A1'
+        level = user_data.current_level if user_data else 'A1'
         
         await query.edit_message_text(
             Formatters.progress_summary(stats, level),
@@ -125,7 +125,7 @@ async def settings_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     if data == 'settings_level':
         user_data = await db.get_user(user.id)
-        current_level = user_data.get('current_level', 'A1') if user_data else 'A1'
+        current_level = user_data.current_level if user_data else 'A1'
         
         context.user_data['changing_level'] = True
         await query.edit_message_text(
@@ -136,7 +136,7 @@ async def settings_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     elif data == 'settings_lang':
         user_data = await db.get_user(user.id)
-        current_lang = user_data.get('preferred_lang', 'english') if user_data else 'english'
+        current_lang = user_data.preferred_lang if user_data else 'english'
         
         context.user_data['changing_lang'] = True
         await query.edit_message_text(
@@ -13,6 +13,9 @@ from bot.utils.formatters import Formatters
 
 logger = logging.getLogger(__name__)
 
+# Exam attempts shown per history page
+HISTORY_PAGE_SIZE = 10
+
 
 @require_subscription
 async def progress_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -21,7 +24,7 @@ async def progress_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     
     # Get user data
     user_data = await db.get_user(user.id)
-    level = user_data.get('current_level', 'A1') if user_data else 'A1'
+    level = user_data.current_level if user_data else 'A1'
     
     # Get statistics
     stats = await db.get_user_statistics(user.id)
@@ -64,27 +67,14 @@ async def progress_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
     
     elif data == 'view_history':
-        # Get exam history
-        attempts = await db.get_exam_attempts(user.id, limit=10)
-        
-        if attempts:
-            message = "*Recent Exam History*\n\n"
-            for attempt in attempts[:10]:
-                exam_type = attempt.get('exam_type', 'Unknown').capitalize()
-                score = attempt.get('score', 0)
-                date = attempt.get('completed_at', '')[:10] if attempt.get('completed_at') else 'N/A'
-                
-                emoji = "" if score >= 60 else ""
-                message += f"{emoji} {exam_type}: {score:.0f}% ({date})\n"
+        await show_history_page(query, context, user.id)
+    
+    elif data in ('history_older', 'history_newer'):
+        first, last = context.user_data.get('history_cursors', (None, None))
+        if data == 'history_older':
+            await show_history_page(query, context, user.id, cursor=last)
         else:
-            message = "No exam history yet.\n" \
-                      "Take some exams to see your history here!"
-        
-        await query.edit_message_text(
-            message,
-            parse_mode='Markdown',
-            reply_markup=Keyboards.progress_actions()
-        )
+            await show_history_page(query, context, user.id, cursor=first, newer=True)
     
     elif data == 'menu_main':
         await query.edit_message_text(
@@ -93,6 +83,53 @@ async def progress_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
 
 
+async def show_history_page(query, context: ContextTypes.DEFAULT_TYPE, user_id: int, cursor=None, newer: bool = False) -> None:
+    """Show one page of exam history with Older/Newer navigation."""
+    attempts, has_more = await db.get_exam_history_page(user_id, cursor=cursor, newer=newer, limit=HISTORY_PAGE_SIZE)
+    
+    if not attempts and cursor is not None:
+        # Nothing left past the cursor (stale buttons or deleted attempts): start over from the newest page
+        await show_history_page(query, context, user_id)
+        return
+    
+    if not attempts:
+        context.user_data.pop('history_cursors', None)
+        await query.edit_message_text(
+            "No exam history yet.\n"
+            "Take some exams to see your history here!",
+            reply_markup=Keyboards.progress_actions()
+        )
+        return
+    
+    # Remember page boundaries so navigation buttons stay within Telegram's callback_data limit
+    context.user_data['history_cursors'] = (
+        (attempts[0]['completed_at'], attempts[0]['id']),
+        (attempts[-1]['completed_at'], attempts[-1]['id'])
+    )
+    
+    message = "*Exam History*\n\n"
+    for attempt in attempts:
+        exam_type = attempt.get('exam_type', 'Unknown').capitalize()
+        score = attempt.get('score') or 0
+        date = attempt.get('completed_at', '')[:10] if attempt.get('completed_at') else 'N/A'
+        
+        emoji = "" if score >= 60 else ""
+        message += f"{emoji} {exam_type}: {score:.0f}% ({date})\n"
+    
+    if cursor is None:
+        has_older, has_newer = has_more, False
+    elif newer:
+        has_older, has_newer = True, has_more
+    else:
+        has_older, has_newer = has_more, True
+    
+    await query.edit_message_text(
+        message,
+        parse_mode='Markdown',
+        reply_markup=Keyboards.history_navigation(has_older, has_newer)
+    )
+
+
 # Export handlers
 progress_handler = CommandHandler('progress', progress_command)
-progress_callback_handler = CallbackQueryHandler(progress_callback, pattern='^(practice_weak|view_history)$')
+progress_callback_handler = CallbackQueryHandler(progress_callback, pattern='^(practice_weak|view_history|history_older|history_newer)$')
@@ -33,8 +33,8 @@ async def _start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         if existing_user:
             # Existing user - show welcome back message
-            level = existing_user.get('current_level', 'A1')
-            name = existing_user.get('first_name') or user.first_name or 'Student'
+            level = existing_user.current_level
+            name = existing_user.first_name or user.first_name or 'Student'
             
             # Check subscription
             is_active, expiry_date = await db.check_subscription(user_id)
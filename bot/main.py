@@ -2,8 +2,10 @@
 EthioGerman Language School - Telegram AI Tutor Bot
 Main entry point.
 """
+import json
 import logging
 import sys
+from functools import partial
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -20,11 +22,20 @@ from telegram.ext import (
 )
 
 from bot.config import Config
+
+# Fail fast on missing settings, before the services below connect to anything
+Config.validate()
+
 from bot.handlers.start import start_handler, help_handler, cancel_handler
 from bot.handlers.menu import menu_handler, menu_callback_handler, settings_callback_handler
 from bot.handlers.learn import learn_conversation_handler
-from bot.handlers.exam import exam_conversation_handler
+from bot.handlers.exam import exam_conversation_handler, deliver_evaluation
 from bot.handlers.progress import progress_handler, progress_callback_handler
+from bot.services.evaluation_queue import evaluation_queue
+from bot.services.circuit_breaker import circuit_stats
+from bot.services.llm_scheduler import llm_scheduler
+from bot.services.model_router import model_router
+from bot.services.lesson_catalog import lesson_catalog
 
 # Configure logging
 logging.basicConfig(
@@ -58,12 +69,30 @@ async def error_handler(update: object, context) -> None:
             pass
 
 
+async def post_init(application: Application) -> None:
+    """Load the lesson catalog and start background workers once the event loop is running."""
+    # Sessions arriving while the first load is in flight would see an empty catalog
+    await lesson_catalog.refresh(force=True)
+    evaluation_queue.start(partial(deliver_evaluation, application.bot))
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stop background workers."""
+    await evaluation_queue.stop()
+
+
 def main() -> None:
     """Start the bot."""
     logger.info("Starting EthioGerman Language School Bot...")
     
     # Create application
-    application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(Config.TELEGRAM_BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Add conversation handlers (must be added before other handlers)
     application.add_handler(learn_conversation_handler)
@@ -99,6 +128,22 @@ def main() -> None:
         await update.message.reply_text("Pong!")
     application.add_handler(CommandHandler('ping', ping))
     
+    # Backend health for admins: circuit breakers, LLM queue, model routing, evaluation queue
+    async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if update.effective_user.id not in Config.ADMIN_USER_IDS:
+            return
+        sections = {
+            'circuits': circuit_stats(),
+            'llm_scheduler': llm_scheduler.stats(),
+            'model_router': model_router.stats(),
+            'evaluation_queue': evaluation_queue.stats()
+        }
+        logger.info(f"Status: {json.dumps(sections, default=str)}")
+        await update.message.reply_text('\n\n'.join(
+            f"{name}:\n{json.dumps(stats, indent=1, default=str)}" for name, stats in sections.items()
+        ))
+    application.add_handler(CommandHandler('status', status))
+    
     # Start the bot
     logger.info("Bot is running. Press Ctrl+C to stop.")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
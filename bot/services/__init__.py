@@ -1,6 +1,41 @@
-from .database import DatabaseService
-from .ai_tutor import AITutorService
-from .exam_engine import ExamEngine
-from .speech import SpeechService
+"""
+Service classes, imported on first access: most service modules create their
+shared instance (database client, models, queues) at import, and processes
+like the speech worker import a single service without starting the others.
+"""
+from importlib import import_module
 
-__all__ = ['DatabaseService', 'AITutorService', 'ExamEngine', 'SpeechService']
+_EXPORTS = {
+    'DatabaseService': 'database',
+    'AITutorService': 'ai_tutor',
+    'ExamEngine': 'exam_engine',
+    'SpeechService': 'speech',
+    'ConversationCache': 'conversation_cache',
+    'MockExamSession': 'mock_exam',
+    'EvaluationQueue': 'evaluation_queue',
+    'VocabularyScheduler': 'vocabulary',
+    'ContentLibrary': 'content_library',
+    'LessonCatalog': 'lesson_catalog',
+    'LLMScheduler': 'llm_scheduler',
+    'ModelRouter': 'model_router',
+    'CircuitBreaker': 'circuit_breaker',
+    'CircuitOpenError': 'circuit_breaker',
+    'User': 'models',
+    'ExamQuestion': 'models',
+    'Answer': 'models',
+    'Evaluation': 'models',
+    'ProgressEntry': 'models',
+    'SpeechMetrics': 'models',
+    'Transcript': 'models',
+    'VocabularyCard': 'models',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the service module that defines a name on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f'.{module}', __name__), name)
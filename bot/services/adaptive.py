@@ -0,0 +1,213 @@
+"""
+Adaptive difficulty for objective exams.
+A Rasch (1PL IRT) model with Elo-style incremental calibration: each student has
+an ability per skill and each stored question a difficulty, both in logits.
+Every answer sharpens the ability estimate, the next question is the one whose
+difficulty is closest to it, and the exam ends early once the estimate is precise.
+"""
+import math
+import time
+import random
+import logging
+from bisect import bisect_left, insort
+from typing import Optional, List, Dict, Set, Tuple
+
+from bot.config import Config
+from bot.services.database import db
+from bot.services.content_library import content_library
+from bot.services.models import ExamQuestion
+
+logger = logging.getLogger(__name__)
+
+# Ability grid for the posterior, -4 to +4 logits
+GRID = [i / 10 for i in range(-40, 41)]
+
+
+def p_correct(ability: float, difficulty: float) -> float:
+    """Probability of a correct answer under the Rasch model."""
+    return 1 / (1 + math.exp(difficulty - ability))
+
+
+class ItemBank:
+    """Stored questions of one level and exam type, sorted by difficulty."""
+
+    def __init__(self, questions: List[ExamQuestion]):
+        self.loaded_at = time.monotonic()
+        self._difficulty: Dict[str, float] = {q.id: q.logit_difficulty for q in questions}
+        self._questions: Dict[str, ExamQuestion] = {q.id: q for q in questions}
+        self._index: List[Tuple[float, str]] = sorted((d, qid) for qid, d in self._difficulty.items())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def difficulty(self, question_id: str) -> float:
+        """Current difficulty estimate of a question."""
+        return self._difficulty[question_id]
+
+    def question(self, question_id: str) -> ExamQuestion:
+        """Question by ID."""
+        return self._questions[question_id]
+
+    def nearest(self, target: float, exclude: Set[str], spread: int = 3) -> Optional[ExamQuestion]:
+        """
+        Pick one of the `spread` unused questions closest to the target difficulty.
+        Binary search plus a walk outwards over used questions; the random pick
+        among close candidates keeps students from all seeing the same items.
+        """
+        hi = bisect_left(self._index, (target, ''))
+        lo = hi - 1
+        candidates: List[str] = []
+
+        while len(candidates) < spread and (lo >= 0 or hi < len(self._index)):
+            take_low = hi >= len(self._index) or (
+                lo >= 0 and target - self._index[lo][0] <= self._index[hi][0] - target
+            )
+            if take_low:
+                qid = self._index[lo][1]
+                lo -= 1
+            else:
+                qid = self._index[hi][1]
+                hi += 1
+            if qid not in exclude:
+                candidates.append(qid)
+
+        if not candidates:
+            return None
+        return self._questions[random.choice(candidates)]
+
+    def adjust(self, question_id: str, delta: float) -> None:
+        """Move a question to its updated difficulty."""
+        old = self._difficulty.get(question_id)
+        if old is None:
+            return
+        self._index.pop(bisect_left(self._index, (old, question_id)))
+        self._difficulty[question_id] = old + delta
+        insort(self._index, (old + delta, question_id))
+
+    def expected_score(self, ability: float) -> float:
+        """Expected percentage correct over the whole bank."""
+        return 100 * sum(p_correct(ability, d) for d, _ in self._index) / len(self._index)
+
+
+class AdaptiveExam:
+    """Ability posterior and question selection for one exam."""
+
+    def __init__(self, bank: ItemBank, prior_mean: float, prior_sd: float, max_questions: int):
+        self.bank = bank
+        self.max_questions = max_questions
+        self.used: Set[str] = set()
+        # (question_id, correct, p_correct before answering)
+        self.responses: List[Tuple[str, bool, float]] = []
+
+        weights = [math.exp(-((g - prior_mean) ** 2) / (2 * prior_sd ** 2)) for g in GRID]
+        total = sum(weights)
+        self._posterior = [w / total for w in weights]
+
+    @property
+    def ability(self) -> float:
+        """Posterior mean ability (EAP estimate)."""
+        return sum(g * w for g, w in zip(GRID, self._posterior))
+
+    @property
+    def standard_error(self) -> float:
+        """Posterior standard deviation of the ability."""
+        mean = self.ability
+        return math.sqrt(sum((g - mean) ** 2 * w for g, w in zip(GRID, self._posterior)))
+
+    @property
+    def is_finished(self) -> bool:
+        """True at the question limit, or once the estimate has converged."""
+        answered = len(self.responses)
+        if answered >= self.max_questions:
+            return True
+        return answered >= Config.ADAPTIVE_MIN_QUESTIONS and self.standard_error <= Config.ADAPTIVE_TARGET_SE
+
+    def next_question(self) -> Optional[ExamQuestion]:
+        """The most informative unused question, or None if the exam is over."""
+        if self.is_finished:
+            return None
+        question = self.bank.nearest(self.ability, self.used)
+        if question is not None:
+            self.used.add(question.id)
+        return question
+
+    def record(self, question: ExamQuestion, is_correct: bool) -> None:
+        """Update the posterior with one answer."""
+        difficulty = self.bank.difficulty(question.id)
+        self.responses.append((question.id, is_correct, p_correct(self.ability, difficulty)))
+
+        posterior = [
+            w * (p_correct(g, difficulty) if is_correct else 1 - p_correct(g, difficulty))
+            for g, w in zip(GRID, self._posterior)
+        ]
+        total = sum(posterior)
+        self._posterior = [w / total for w in posterior]
+
+    def score(self) -> float:
+        """Exam score: expected percentage correct over the bank at the estimated ability."""
+        return round(self.bank.expected_score(self.ability), 1)
+
+
+class AdaptiveEngine:
+    """Loads question banks and stores ability/difficulty estimates."""
+
+    def __init__(self):
+        self._banks: Dict[Tuple[str, str], ItemBank] = {}
+
+    async def _bank(self, level: str, exam_type: str) -> ItemBank:
+        """Get the cached item bank (stored plus bundled questions), reloading it after ADAPTIVE_BANK_TTL."""
+        key = (level, exam_type)
+        bank = self._banks.get(key)
+        if bank is None or time.monotonic() - bank.loaded_at > Config.ADAPTIVE_BANK_TTL:
+            questions = await db.get_exam_questions(level, exam_type, limit=Config.ADAPTIVE_BANK_SIZE)
+            stored = {q.id for q in questions}
+            questions += [q for q in content_library.questions(level, exam_type) if q.id not in stored]
+            bank = self._banks[key] = ItemBank(questions)
+        return bank
+
+    async def start_exam(
+        self,
+        user_id: int,
+        level: str,
+        exam_type: str,
+        max_questions: int
+    ) -> Optional[AdaptiveExam]:
+        """
+        Start an adaptive exam from the user's stored ability.
+
+        Returns:
+            AdaptiveExam, or None if the question bank is too small
+        """
+        bank = await self._bank(level, exam_type)
+        if len(bank) < Config.ADAPTIVE_MIN_BANK:
+            return None
+
+        ability, responses = await db.get_user_ability(user_id, exam_type) or (0.0, 0)
+        prior_sd = max(Config.ADAPTIVE_PRIOR_MIN_SD, 1 / math.sqrt(1 + responses / 5))
+        return AdaptiveExam(bank, ability, prior_sd, max_questions)
+
+    async def finish_exam(self, user_id: int, exam_type: str, exam: AdaptiveExam) -> None:
+        """Store the new ability and apply Elo steps to the answered questions."""
+        if not exam.responses:
+            return
+
+        previous = await db.get_user_ability(user_id, exam_type)
+        responses = (previous[1] if previous else 0) + len(exam.responses)
+        await db.save_user_ability(user_id, exam_type, round(exam.ability, 3), responses)
+
+        deltas: Dict[str, float] = {}
+        for question_id, correct, expected in exam.responses:
+            question = exam.bank.question(question_id)
+            k = Config.ADAPTIVE_ITEM_K / (1 + question.irt_responses / 20)
+            deltas[question_id] = round(k * (expected - (1.0 if correct else 0.0)), 4)
+            exam.bank.adjust(question_id, deltas[question_id])
+
+        await db.update_question_difficulties(deltas)
+        logger.info(
+            f"User {user_id} {exam_type} ability {exam.ability:+.2f} "
+            f"(SE {exam.standard_error:.2f}, {len(exam.responses)} questions)"
+        )
+
+
+# Singleton instance
+adaptive_engine = AdaptiveEngine()
@@ -2,13 +2,18 @@
 AI Tutor service using OpenRouter API with Llama 3.3 70B model.
 Handles German language tutoring, evaluation, and feedback.
 """
+import time
 import httpx
 import json
 import logging
+from dataclasses import replace
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
 from bot.config import Config
+from bot.services.models import Evaluation, SpeechMetrics
+from bot.services.model_router import model_router
+from bot.services.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -22,20 +27,65 @@ class AITutorService:
     def __init__(self):
         self.api_url = Config.OPENROUTER_API_URL
         self.api_key = Config.OPENROUTER_API_KEY
-        self.model = Config.AI_MODEL
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json',
             'HTTP-Referer': 'https://ethiogerman-school.com',
             'X-Title': 'EthioGerman Language School Bot'
         }
+        self.breaker = CircuitBreaker('openrouter', Config.LLM_SLOW_CALL_SECONDS)
+    
+    async def _request(
+        self,
+        payload: Dict[str, Any],
+        timeout: float,
+        task: str,
+        user_id: Optional[int] = None
+    ) -> httpx.Response:
+        """
+        Send a chat completion request to the task's models through the model router.
+        The whole request (failovers and hedges included) is one call for the
+        OpenRouter circuit breaker: a transport error or 5xx result counts as a
+        failure, and the returned attempt's own latency decides whether it was slow.
+        
+        Raises:
+            CircuitOpenError: OpenRouter is failing and the request was not sent
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.name)
+        
+        latencies: Dict[int, float] = {}
+        
+        async def post(model: str, timeout: float) -> httpx.Response:
+            started = time.monotonic()
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(self.api_url, headers=self.headers, json={**payload, 'model': model})
+            latencies[id(response)] = time.monotonic() - started
+            return response
+        
+        try:
+            response = await model_router.request(task, post, timeout, user_id=user_id)
+        except httpx.HTTPError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or failed on our side: no verdict on OpenRouter
+            self.breaker.release()
+            raise
+        
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success(latencies.get(id(response), 0.0))
+        return response
     
     def _get_system_prompt(
         self,
         level: str = 'A1',
         preferred_lang: str = 'english',
         skill_focus: Optional[str] = None,
-        weak_areas: Optional[List[str]] = None
+        weak_areas: Optional[List[str]] = None,
+        session_summary: Optional[str] = None
     ) -> str:
         """Generate system prompt for the AI tutor."""
         
@@ -77,6 +127,12 @@ CONVERSATION STYLE:
 
 You are a PAID German tutor AI - maintain professional quality in all responses."""
 
+        if session_summary:
+            prompt += f"""
+
+EARLIER IN THIS SESSION (summary, continue from here):
+{session_summary}"""
+
         return prompt
     
     async def chat(
@@ -86,7 +142,9 @@ You are a PAID German tutor AI - maintain professional quality in all responses.
         level: str = 'A1',
         preferred_lang: str = 'english',
         skill_focus: Optional[str] = None,
-        weak_areas: Optional[List[str]] = None
+        weak_areas: Optional[List[str]] = None,
+        session_summary: Optional[str] = None,
+        user_id: Optional[int] = None
     ) -> str:
         """
         Send a message to the AI tutor and get a response.
@@ -98,6 +156,8 @@ You are a PAID German tutor AI - maintain professional quality in all responses.
             preferred_lang: User's preferred explanation language
             skill_focus: Current skill being practiced
             weak_areas: User's known weak areas
+            session_summary: Digest of earlier turns when resuming a session
+            user_id: Telegram user ID, used to share the request rate fairly
         
         Returns:
             AI tutor's response
@@ -107,7 +167,8 @@ You are a PAID German tutor AI - maintain professional quality in all responses.
                 level=level,
                 preferred_lang=preferred_lang,
                 skill_focus=skill_focus,
-                weak_areas=weak_areas
+                weak_areas=weak_areas,
+                session_summary=session_summary
             )
             
             # Build messages array
@@ -124,26 +185,33 @@ You are a PAID German tutor AI - maintain professional quality in all responses.
             messages.append({'role': 'user', 'content': user_message})
             
             # Make API request
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={
-                        'model': self.model,
-                        'messages': messages,
-                        'temperature': 0.7,
-                        'max_tokens': 800,
-                        'top_p': 0.9
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
-                    return "Entschuldigung, es gab einen technischen Fehler. Bitte versuchen Sie es erneut. (Sorry, there was a technical error. Please try again.)"
-                
-                data = response.json()
-                return data['choices'][0]['message']['content']
+            response = await self._request(
+                {
+                    'messages': messages,
+                    'temperature': 0.7,
+                    'max_tokens': 800,
+                    'top_p': 0.9
+                },
+                timeout=60.0,
+                task='chat',
+                user_id=user_id
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
+                return "Entschuldigung, es gab einen technischen Fehler. Bitte versuchen Sie es erneut. (Sorry, there was a technical error. Please try again.)"
+            
+            data = response.json()
+            usage = data.get('usage') or {}
+            logger.info(
+                f"Chat tokens: prompt={usage.get('prompt_tokens')} "
+                f"completion={usage.get('completion_tokens')} history={len(messages) - 2}"
+            )
+            return data['choices'][0]['message']['content']
         
+        except CircuitOpenError:
+            logger.warning("AI chat skipped: OpenRouter circuit is open")
+            return "Der Tutor ist gerade nicht erreichbar. Bitte versuchen Sie es in einer Minute erneut. (The tutor is unavailable right now. Please try again in a minute.)"
         except httpx.TimeoutException:
             logger.error("OpenRouter API timeout")
             return "Die Anfrage hat zu lange gedauert. Bitte versuchen Sie es erneut. (The request took too long. Please try again.)"
@@ -156,13 +224,14 @@ You are a PAID German tutor AI - maintain professional quality in all responses.
         user_text: str,
         prompt: str,
         level: str,
-        rubric: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        rubric: Optional[Dict[str, Any]] = None,
+        user_id: Optional[int] = None
+    ) -> Evaluation:
         """
         Evaluate a writing (Schreiben) submission.
         
         Returns:
-            Dictionary with scores, feedback, and corrections
+            Evaluation with scores, feedback, and corrections
         """
         try:
             evaluation_prompt = f"""You are evaluating a German writing submission for a {level} level student.
@@ -198,36 +267,35 @@ Please provide your evaluation in the following JSON format:
 
 Be constructive and encouraging while being accurate. Provide explanations suitable for a {level} learner."""
 
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={
-                        'model': self.model,
-                        'messages': [
-                            {'role': 'system', 'content': 'You are a German language examiner. Respond only with valid JSON.'},
-                            {'role': 'user', 'content': evaluation_prompt}
-                        ],
-                        'temperature': 0.3,
-                        'max_tokens': 1500
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"OpenRouter API error: {response.status_code}")
-                    return self._default_evaluation()
-                
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                
-                # Parse JSON from response
-                # Try to extract JSON if wrapped in markdown
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0]
-                elif '```' in content:
-                    content = content.split('```')[1].split('```')[0]
-                
-                return json.loads(content.strip())
+            response = await self._request(
+                {
+                    'messages': [
+                        {'role': 'system', 'content': 'You are a German language examiner. Respond only with valid JSON.'},
+                        {'role': 'user', 'content': evaluation_prompt}
+                    ],
+                    'temperature': 0.3,
+                    'max_tokens': 1500
+                },
+                timeout=90.0,
+                task='evaluation',
+                user_id=user_id
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"OpenRouter API error: {response.status_code}")
+                return self._default_evaluation()
+            
+            data = response.json()
+            content = data['choices'][0]['message']['content']
+            
+            # Parse JSON from response
+            # Try to extract JSON if wrapped in markdown
+            if '```json' in content:
+                content = content.split('```json')[1].split('```')[0]
+            elif '```' in content:
+                content = content.split('```')[1].split('```')[0]
+            
+            return Evaluation.from_dict(json.loads(content.strip()))
         
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error in evaluation: {e}")
@@ -240,8 +308,10 @@ Be constructive and encouraging while being accurate. Provide explanations suita
         self,
         transcribed_text: str,
         prompt: str,
-        level: str
-    ) -> Dict[str, Any]:
+        level: str,
+        metrics: Optional[SpeechMetrics] = None,
+        user_id: Optional[int] = None
+    ) -> Evaluation:
         """
         Evaluate a speaking (Sprechen) submission.
         
@@ -249,11 +319,26 @@ Be constructive and encouraging while being accurate. Provide explanations suita
             transcribed_text: Text transcribed from voice message
             prompt: The speaking task prompt
             level: User's CEFR level
+            metrics: Fluency measurements from the recording, if it was a voice message
+            user_id: Telegram user ID, used to share the request rate fairly
         
         Returns:
-            Dictionary with scores, feedback, and corrections
+            Evaluation with scores, feedback, and corrections
         """
         try:
+            if metrics:
+                fluency_basis = "based on the measurements above"
+                measurements = f"""
+MEASURED FLUENCY (from audio timestamps, treat as facts):
+- Speech rate: {metrics.words_per_minute:.0f} words/min ({metrics.articulation_rate:.0f} excluding pauses)
+- Pauses: {metrics.pause_count} (long: {metrics.long_pause_count}), mean {metrics.mean_pause:.1f}s, longest {metrics.max_pause:.1f}s
+- Time spent pausing: {metrics.pause_ratio:.0%} of {metrics.duration:.0f}s
+- Unclear words (low recognition confidence): {', '.join(metrics.low_confidence_words) or 'none'}
+"""
+            else:
+                fluency_basis = "based on transcription"
+                measurements = ""
+            
             evaluation_prompt = f"""You are evaluating a German speaking submission (transcribed from audio) for a {level} level student.
 
 SPEAKING TASK:
@@ -261,12 +346,12 @@ SPEAKING TASK:
 
 TRANSCRIBED RESPONSE:
 {transcribed_text}
-
+{measurements}
 EVALUATION CRITERIA:
 1. Grammar (25%): Correct use of grammar appropriate for {level} level
 2. Vocabulary (25%): Range and appropriateness of vocabulary
 3. Task Completion (25%): How well the response addresses the prompt
-4. Fluency (25%): Natural flow and expression (based on transcription)
+4. Fluency (25%): Natural flow and expression ({fluency_basis})
 
 Please provide your evaluation in the following JSON format:
 {{
@@ -287,35 +372,35 @@ Please provide your evaluation in the following JSON format:
 
 Be constructive and encouraging. Consider that this is transcribed speech, so some errors might be transcription artifacts."""
 
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={
-                        'model': self.model,
-                        'messages': [
-                            {'role': 'system', 'content': 'You are a German language examiner. Respond only with valid JSON.'},
-                            {'role': 'user', 'content': evaluation_prompt}
-                        ],
-                        'temperature': 0.3,
-                        'max_tokens': 1500
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"OpenRouter API error: {response.status_code}")
-                    return self._default_evaluation(speaking=True)
-                
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                
-                # Parse JSON from response
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0]
-                elif '```' in content:
-                    content = content.split('```')[1].split('```')[0]
-                
-                return json.loads(content.strip())
+            response = await self._request(
+                {
+                    'messages': [
+                        {'role': 'system', 'content': 'You are a German language examiner. Respond only with valid JSON.'},
+                        {'role': 'user', 'content': evaluation_prompt}
+                    ],
+                    'temperature': 0.3,
+                    'max_tokens': 1500
+                },
+                timeout=90.0,
+                task='evaluation',
+                user_id=user_id
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"OpenRouter API error: {response.status_code}")
+                return self._default_evaluation(speaking=True)
+            
+            data = response.json()
+            content = data['choices'][0]['message']['content']
+            
+            # Parse JSON from response
+            if '```json' in content:
+                content = content.split('```json')[1].split('```')[0]
+            elif '```' in content:
+                content = content.split('```')[1].split('```')[0]
+            
+            evaluation = Evaluation.from_dict(json.loads(content.strip()))
+            return replace(evaluation, speech_metrics=metrics)
         
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error in speaking evaluation: {e}")
@@ -328,7 +413,8 @@ Be constructive and encouraging. Consider that this is transcribed speech, so so
         self,
         level: str,
         exam_type: str,
-        topic: Optional[str] = None
+        topic: Optional[str] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Generate a new exam question dynamically.
@@ -337,6 +423,7 @@ Be constructive and encouraging. Consider that this is transcribed speech, so so
             level: CEFR level (A1, A2, B1)
             exam_type: Type of exam (lesen, horen, schreiben, sprechen, vokabular)
             topic: Optional topic focus
+            user_id: Telegram user ID if generated for a waiting user
         
         Returns:
             Dictionary with question data
@@ -388,41 +475,40 @@ Return JSON:
             
             prompt = type_prompts.get(exam_type, type_prompts['vokabular'])
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={
-                        'model': self.model,
-                        'messages': [
-                            {'role': 'system', 'content': 'You are a German exam question generator. Respond only with valid JSON.'},
-                            {'role': 'user', 'content': prompt}
-                        ],
-                        'temperature': 0.8,
-                        'max_tokens': 800
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"OpenRouter API error: {response.status_code}")
-                    return {}
-                
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                
-                # Parse JSON from response
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0]
-                elif '```' in content:
-                    content = content.split('```')[1].split('```')[0]
-                
-                return json.loads(content.strip())
+            response = await self._request(
+                {
+                    'messages': [
+                        {'role': 'system', 'content': 'You are a German exam question generator. Respond only with valid JSON.'},
+                        {'role': 'user', 'content': prompt}
+                    ],
+                    'temperature': 0.8,
+                    'max_tokens': 800
+                },
+                timeout=60.0,
+                task='generation',
+                user_id=user_id
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"OpenRouter API error: {response.status_code}")
+                return {}
+            
+            data = response.json()
+            content = data['choices'][0]['message']['content']
+            
+            # Parse JSON from response
+            if '```json' in content:
+                content = content.split('```json')[1].split('```')[0]
+            elif '```' in content:
+                content = content.split('```')[1].split('```')[0]
+            
+            return json.loads(content.strip())
         
         except Exception as e:
             logger.error(f"Error generating exam question: {e}")
             return {}
     
-    def _default_evaluation(self, speaking: bool = False) -> Dict[str, Any]:
+    def _default_evaluation(self, speaking: bool = False) -> Evaluation:
         """Return default evaluation when API fails."""
         result = {
             'scores': {
@@ -443,7 +529,7 @@ Return JSON:
             result['scores']['coherence'] = 0
             result['corrected_text'] = ''
         
-        return result
+        return replace(Evaluation.from_dict(result), failed=True)
 
 
 # Singleton instance
@@ -0,0 +1,163 @@
+"""
+Circuit breakers for the OpenRouter and Supabase backends.
+While a backend keeps failing or answering too slowly, its circuit opens and
+calls fail immediately with CircuitOpenError instead of waiting for timeouts;
+callers already turn errors into their degraded response. After a cool-down a
+few probe calls are let through (half-open) and the circuit closes once they
+succeed.
+"""
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Deque
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Every breaker by name, for metrics
+breakers: Dict[str, 'CircuitBreaker'] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a window of recent calls.
+
+    Callers ask allow() before a call and report its outcome with
+    record_success(latency), record_failure() or release() (no outcome, e.g.
+    cancelled). Successful calls slower than slow_call_seconds count as failures.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        window: int = Config.CIRCUIT_WINDOW,
+        min_calls: int = Config.CIRCUIT_MIN_CALLS,
+        failure_rate: float = Config.CIRCUIT_FAILURE_RATE,
+        reset_timeout: float = Config.CIRCUIT_RESET_TIMEOUT,
+        half_open_calls: int = Config.CIRCUIT_HALF_OPEN_CALLS
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failed or slow
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.trips = 0
+        breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit turns half-open once the reset timeout has passed."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = self._probe_successes = 0
+            logger.info(f"{self.name} circuit half-open, probing")
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go ahead; False means fail fast."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """Report a call that returned, and how long it took."""
+        self.calls += 1
+        if latency >= self.slow_call_seconds:
+            self.slow_calls += 1
+            self._record(failed=True)
+            return
+        if self._state == HALF_OPEN:
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._close()
+            return
+        self._record(failed=False)
+
+    def record_failure(self) -> None:
+        """Report a call that failed because of the backend."""
+        self.calls += 1
+        self.failures += 1
+        self._record(failed=True)
+
+    def release(self) -> None:
+        """Report a permitted call that ended without an outcome."""
+        if self._state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _record(self, failed: bool) -> None:
+        """Add an outcome to the window and open the circuit if too many failed."""
+        if self._state == HALF_OPEN:
+            if failed:
+                self._open()
+            return
+        self._outcomes.append(failed)
+        if (
+            self._state == CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Start failing fast."""
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.trips += 1
+        logger.warning(
+            f"{self.name} circuit open: {sum(self._outcomes)}/{len(self._outcomes)} recent calls failed or slow, "
+            f"failing fast for {self.reset_timeout:.0f}s"
+        )
+
+    def _close(self) -> None:
+        """Resume normal calls after successful probes."""
+        self._state = CLOSED
+        self._outcomes.clear()
+        logger.info(f"{self.name} circuit closed")
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for monitoring."""
+        return {
+            'state': self.state,
+            'recent_failure_rate': round(sum(self._outcomes) / len(self._outcomes), 2) if self._outcomes else 0.0,
+            'calls': self.calls,
+            'failures': self.failures,
+            'slow_calls': self.slow_calls,
+            'rejected': self.rejected,
+            'trips': self.trips
+        }
+
+
+def circuit_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of all circuit breakers."""
+    return {name: breaker.stats() for name, breaker in breakers.items()}
@@ -0,0 +1,93 @@
+"""
+Bundled content packs served from memory-mapped files.
+The question bank in the database starts out small, so exams used to fall back
+to AI generation; questions from content/*.egpack fill them instantly instead.
+Packs are rebuilt from their JSONL source when it is newer than the pack.
+"""
+import random
+import logging
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+from bot.config import Config
+from bot.content.pack import ContentPack, build_pack
+from bot.services.models import ExamQuestion
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = Path(__file__).parent.parent.parent / 'content'
+
+
+class ContentLibrary:
+    """All packs in the content directory, with decoded questions cached per level and type."""
+
+    def __init__(self, directory: Path = CONTENT_DIR):
+        self.directory = directory
+        self._packs: Optional[List[ContentPack]] = None
+        self._questions: Dict[Tuple[str, str], List[ExamQuestion]] = {}
+
+    @property
+    def packs(self) -> List[ContentPack]:
+        """Open packs, loading them on first use."""
+        if self._packs is None:
+            self._packs = self._load() if Config.CONTENT_PACKS_ENABLED else []
+        return self._packs
+
+    def _load(self) -> List[ContentPack]:
+        """Rebuild stale packs and map every pack in the directory."""
+        for source in sorted(self.directory.glob('*.jsonl')):
+            target = source.with_suffix('.egpack')
+            if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+                continue
+            try:
+                build_pack(source, target)
+                logger.info(f"Built content pack {target.name}")
+            except Exception as e:
+                logger.error(f"Error building content pack from {source}: {e}")
+
+        packs = []
+        for path in sorted(self.directory.glob('*.egpack')):
+            try:
+                pack = ContentPack(path)
+                packs.append(pack)
+                logger.info(f"Loaded content pack {pack.name} ({pack.index.get('records', 0)} records)")
+            except Exception as e:
+                logger.error(f"Error loading content pack {path}: {e}")
+        return packs
+
+    def questions(self, level: str, exam_type: str) -> List[ExamQuestion]:
+        """All bundled questions of a level and exam type."""
+        key = (level, exam_type)
+        questions = self._questions.get(key)
+        if questions is None:
+            questions = self._questions[key] = [
+                ExamQuestion.from_row(record)
+                for pack in self.packs
+                for record in pack.records('question', level, exam_type)
+            ]
+        return questions
+
+    def sample(self, level: str, exam_type: str, count: int, exclude: Set[str] = frozenset()) -> List[ExamQuestion]:
+        """Up to `count` random bundled questions whose IDs are not in `exclude`."""
+        candidates = [q for q in self.questions(level, exam_type) if q.id not in exclude]
+        return random.sample(candidates, min(count, len(candidates)))
+
+    def lessons(self, level: Optional[str] = None, skill: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bundled lessons as `lessons` table rows, optionally filtered by level and skill."""
+        return [
+            {
+                'id': record['id'],
+                'level': record['level'],
+                'skill': record['skill'],
+                'topic': record.get('topic'),
+                'title': record['title'],
+                'content': record.get('content') or {},
+                'is_active': True
+            }
+            for pack in self.packs
+            for record in pack.records('lesson', level, skill)
+        ]
+
+
+# Singleton instance
+content_library = ContentLibrary()
@@ -0,0 +1,120 @@
+"""
+Warm cache of recent tutoring sessions.
+Lets returning students continue their last session without re-reading
+the full history from the database on every turn.
+"""
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Optional, List, Dict
+
+from bot.config import Config
+from bot.services.database import db
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CachedSession:
+    """Most recent messages of a user's latest tutoring session."""
+    session_id: str
+    skill: str
+    messages: deque
+
+
+class ConversationCache:
+    """Per-user LRU cache holding a bounded window of the latest session."""
+
+    def __init__(
+        self,
+        max_users: int = Config.CONVERSATION_CACHE_SIZE,
+        window: int = Config.RESUME_HISTORY_WINDOW
+    ):
+        self.max_users = max_users
+        self.window = window
+        self._sessions: OrderedDict[int, CachedSession] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[CachedSession]:
+        """Get a cached session and mark it as recently used."""
+        session = self._sessions.get(user_id)
+        if session is not None:
+            self._sessions.move_to_end(user_id)
+        return session
+
+    def start(self, user_id: int, session_id: str, skill: str) -> CachedSession:
+        """Start caching a new session for the user, replacing the old one."""
+        session = CachedSession(session_id, skill, deque(maxlen=self.window))
+        self._put(user_id, session)
+        return session
+
+    def append(self, user_id: int, session_id: str, skill: str, role: str, content: str) -> None:
+        """Record a message of the user's current session."""
+        session = self.get(user_id)
+        if session is None or session.session_id != session_id:
+            session = self.start(user_id, session_id, skill)
+        session.messages.append({'role': role, 'content': content})
+
+    async def load(self, user_id: int) -> Optional[CachedSession]:
+        """
+        Get the user's latest session, hydrating it from the database once on a miss.
+
+        Returns:
+            The cached session or None if the user has no recent history
+        """
+        session = self.get(user_id)
+        if session is not None:
+            return session
+
+        since = datetime.now(timezone.utc) - timedelta(days=Config.RESUME_MAX_AGE_DAYS)
+        rows = await db.get_conversation_history(user_id, limit=self.window, since=since)
+        if not rows:
+            return None
+
+        # Keep only the latest session from the recent window; rows saved before
+        # migrations/0010_conversation_skill.sql have no skill
+        session_id = rows[-1].get('session_id')
+        skill = rows[-1].get('skill') or 'conversation'
+        session = CachedSession(str(session_id), skill, deque(maxlen=self.window))
+        for row in rows:
+            if row.get('session_id') == session_id:
+                session.messages.append({'role': row['role'], 'content': row['content']})
+
+        self._put(user_id, session)
+        logger.info(f"Hydrated {skill} session {session_id} for user {user_id} ({len(session.messages)} messages)")
+        return session
+
+    def _put(self, user_id: int, session: CachedSession) -> None:
+        """Insert a session, evicting the least recently used user if full."""
+        self._sessions[user_id] = session
+        self._sessions.move_to_end(user_id)
+        while len(self._sessions) > self.max_users:
+            self._sessions.popitem(last=False)
+
+
+def summarize_history(messages: List[Dict[str, str]], max_chars: int = 600) -> str:
+    """
+    Condense earlier turns into a short digest for the system prompt.
+    Keeps the most recent lines that fit into max_chars.
+    """
+    lines = []
+    for msg in messages:
+        text = ' '.join(msg.get('content', '').split())
+        if len(text) > 120:
+            text = text[:117] + '...'
+        speaker = 'Student' if msg.get('role') == 'user' else 'Tutor'
+        lines.append(f"{speaker}: {text}")
+
+    summary: List[str] = []
+    length = 0
+    for line in reversed(lines):
+        if length + len(line) + 1 > max_chars:
+            break
+        summary.append(line)
+        length += len(line) + 1
+
+    return '\n'.join(reversed(summary))
+
+
+# Singleton instance
+conversation_cache = ConversationCache()
@@ -5,10 +5,16 @@ Handles all CRUD operations for users, lessons, exams, progress, and conversatio
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
+import time
+import random
+import asyncio
 import logging
 
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 from bot.config import Config
+from bot.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from bot.services.models import User, ExamQuestion, Answer, ProgressEntry, VocabularyCard, parse_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +23,77 @@ class DatabaseService:
     """Service for all Supabase database operations."""
     
     def __init__(self):
-        self.client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        self.client: Client = create_client(
+            Config.SUPABASE_URL,
+            Config.SUPABASE_KEY,
+            options=ClientOptions(postgrest_client_timeout=Config.DB_TIMEOUT)
+        )
+        self.breaker = CircuitBreaker('supabase', Config.DB_SLOW_CALL_SECONDS)
+    
+    def _execute(self, query):
+        """
+        Execute a PostgREST query through the Supabase circuit breaker.
+        Network errors, timeouts, connection errors (PGRST000-PGRST003) and slow
+        queries count against Supabase; errors in the query itself do not.
+        
+        Raises:
+            CircuitOpenError: Supabase is failing and the query was not sent
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.name)
+        
+        started = time.monotonic()
+        try:
+            response = query.execute()
+        except Exception as e:
+            if isinstance(e, httpx.HTTPError) or self._is_transient(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success(time.monotonic() - started)
+            raise
+        
+        self.breaker.record_success(time.monotonic() - started)
+        return response
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """True for errors worth retrying: network errors, timeouts and PostgREST connection errors."""
+        return isinstance(error, httpx.TransportError) or str(getattr(error, 'code', '')).startswith('PGRST00')
+    
+    async def _write(self, query, deadline: Optional[float] = None):
+        """
+        Execute an idempotent write, retrying transient errors with jittered
+        exponential backoff. Writes must be safe to repeat (upserts keyed by a
+        client-generated ID, or updates setting fixed values), since a request
+        can succeed after its response was lost.
+        
+        Args:
+            query: PostgREST query builder
+            deadline: time.monotonic() by which to give up (default DB_WRITE_DEADLINE from now);
+                the public write methods take the same argument and pass it on
+        """
+        if deadline is None:
+            deadline = time.monotonic() + Config.DB_WRITE_DEADLINE
+        
+        for attempt in range(1, Config.DB_WRITE_ATTEMPTS + 1):
+            try:
+                return self._execute(query)
+            except Exception as e:
+                if attempt == Config.DB_WRITE_ATTEMPTS or not self._is_transient(e):
+                    raise
+                delay = random.uniform(0, min(Config.DB_RETRY_MAX_DELAY, Config.DB_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                logger.warning(f"Retrying database write in {delay:.2f}s after {e!r} (attempt {attempt})")
+                await asyncio.sleep(delay)
     
     # ==================== USER OPERATIONS ====================
     
-    async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+    async def get_user(self, user_id: int) -> Optional[User]:
         """Get user by Telegram ID."""
         try:
-            response = self.client.table('users').select('*').eq('id', user_id).execute()
-            return response.data[0] if response.data else None
+            response = self._execute(self.client.table('users').select('*').eq('id', user_id))
+            return User.from_row(response.data[0]) if response.data else None
         except Exception as e:
             logger.error(f"Error getting user {user_id}: {e}")
             return None
@@ -37,9 +105,10 @@ class DatabaseService:
         first_name: Optional[str] = None,
         last_name: Optional[str] = None,
         level: str = 'A1',
-        preferred_lang: str = 'english'
-    ) -> Optional[Dict[str, Any]]:
-        """Create a new user."""
+        preferred_lang: str = 'english',
+        deadline: Optional[float] = None
+    ) -> Optional[User]:
+        """Create a new user (an existing user with this ID is kept as it is)."""
         try:
             data = {
                 'id': user_id,
@@ -51,18 +120,24 @@ class DatabaseService:
                 'created_at': datetime.now(timezone.utc).isoformat(),
                 'last_active': datetime.now(timezone.utc).isoformat()
             }
-            response = self.client.table('users').insert(data).execute()
-            return response.data[0] if response.data else None
+            # Telegram ID is the key: a retried insert never overwrites the user
+            response = await self._write(
+                self.client.table('users').upsert(data, on_conflict='id', ignore_duplicates=True),
+                deadline=deadline
+            )
+            if not response.data:
+                return await self.get_user(user_id)
+            return User.from_row(response.data[0])
         except Exception as e:
             logger.error(f"Error creating user {user_id}: {e}")
             return None
     
-    async def update_user(self, user_id: int, **kwargs) -> Optional[Dict[str, Any]]:
+    async def update_user(self, user_id: int, **kwargs) -> Optional[User]:
         """Update user fields."""
         try:
             kwargs['last_active'] = datetime.now(timezone.utc).isoformat()
-            response = self.client.table('users').update(kwargs).eq('id', user_id).execute()
-            return response.data[0] if response.data else None
+            response = self._execute(self.client.table('users').update(kwargs).eq('id', user_id))
+            return User.from_row(response.data[0]) if response.data else None
         except Exception as e:
             logger.error(f"Error updating user {user_id}: {e}")
             return None
@@ -70,9 +145,9 @@ class DatabaseService:
     async def update_last_active(self, user_id: int) -> None:
         """Update user's last active timestamp."""
         try:
-            self.client.table('users').update({
+            self._execute(self.client.table('users').update({
                 'last_active': datetime.now(timezone.utc).isoformat()
-            }).eq('id', user_id).execute()
+            }).eq('id', user_id))
         except Exception as e:
             logger.error(f"Error updating last_active for user {user_id}: {e}")
     
@@ -86,15 +161,13 @@ class DatabaseService:
             if not user:
                 return False, None
             
-            expiry = user.get('subscription_expiry')
+            expiry = user.subscription_expiry
             if not expiry:
                 return False, None
             
             # Parse the expiry date
             if isinstance(expiry, str):
-                # Handle cases where the string might have 'Z' or offset
-                clean_expiry = expiry.replace('Z', '+00:00')
-                expiry_dt = datetime.fromisoformat(clean_expiry)
+                expiry_dt = parse_timestamp(expiry)
             else:
                 expiry_dt = expiry
             
@@ -125,21 +198,50 @@ class DatabaseService:
             if skill:
                 query = query.eq('skill', skill)
             
-            response = query.limit(limit).execute()
+            response = self._execute(query.limit(limit))
             return response.data or []
         except Exception as e:
             logger.error(f"Error getting lessons: {e}")
             return []
     
+    async def get_lesson_catalog(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        All active lessons, for the in-memory catalog.
+        Unlike get_lessons, returns None if the query failed, so the caller can
+        keep the lessons it already has.
+        """
+        try:
+            response = self._execute(self.client.table('lessons').select('*').eq('is_active', True).limit(limit))
+            return response.data or []
+        except Exception as e:
+            logger.error(f"Error loading lesson catalog: {e}")
+            return None
+    
     async def get_lesson_by_id(self, lesson_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific lesson by ID."""
         try:
-            response = self.client.table('lessons').select('*').eq('id', lesson_id).execute()
+            response = self._execute(self.client.table('lessons').select('*').eq('id', lesson_id))
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error getting lesson {lesson_id}: {e}")
             return None
     
+    async def get_lessons_version(self) -> Optional[str]:
+        """
+        Cheap change marker for the lessons table: row count and latest update.
+        See migrations/0008_lesson_catalog_version.sql.
+        """
+        try:
+            response = self._execute(self.client.table('lessons')\
+                .select('updated_at', count='exact')\
+                .order('updated_at', desc=True)\
+                .limit(1))
+            latest = response.data[0]['updated_at'] if response.data else None
+            return f"{response.count}:{latest}"
+        except Exception as e:
+            logger.error(f"Error getting lessons version: {e}")
+            return None
+    
     # ==================== EXAM QUESTIONS OPERATIONS ====================
     
     async def get_exam_questions(
@@ -148,7 +250,7 @@ class DatabaseService:
         exam_type: str,
         limit: int = 10,
         difficulty_range: Optional[tuple[int, int]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ExamQuestion]:
         """Get exam questions by level and type."""
         try:
             query = self.client.table('exam_questions').select('*')\
@@ -160,8 +262,8 @@ class DatabaseService:
                 query = query.gte('difficulty', difficulty_range[0])\
                             .lte('difficulty', difficulty_range[1])
             
-            response = query.limit(limit).execute()
-            return response.data or []
+            response = self._execute(query.limit(limit))
+            return [ExamQuestion.from_row(row) for row in response.data or []]
         except Exception as e:
             logger.error(f"Error getting exam questions: {e}")
             return []
@@ -171,7 +273,7 @@ class DatabaseService:
         level: str,
         exam_type: str,
         count: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ExamQuestion]:
         """Get random exam questions with difficulty distribution."""
         try:
             # Get questions from different difficulty ranges
@@ -197,11 +299,14 @@ class DatabaseService:
         skill: str,
         activity_type: str,
         score: float,
-        weak_areas: Optional[List[str]] = None
-    ) -> Optional[Dict[str, Any]]:
-        """Save user progress entry."""
+        weak_areas: Optional[List[str]] = None,
+        progress_id: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[ProgressEntry]:
+        """Save user progress entry (saving the same progress_id again overwrites it)."""
         try:
             data = {
+                'id': progress_id or str(uuid4()),  # idempotency key: retries upsert the same row
                 'user_id': user_id,
                 'skill': skill,
                 'activity_type': activity_type,
@@ -209,93 +314,125 @@ class DatabaseService:
                 'weak_areas': weak_areas or [],
                 'completed_at': datetime.now(timezone.utc).isoformat()
             }
-            response = self.client.table('user_progress').insert(data).execute()
-            return response.data[0] if response.data else None
+            response = await self._write(
+                self.client.table('user_progress').upsert(data, on_conflict='id'),
+                deadline=deadline
+            )
+            return ProgressEntry.from_row(response.data[0]) if response.data else None
         except Exception as e:
             logger.error(f"Error saving progress for user {user_id}: {e}")
             return None
     
+    async def get_user_ability(self, user_id: int, skill: str) -> Optional[tuple[float, int]]:
+        """
+        Get a user's ability estimate for a skill.
+        
+        Returns:
+            (ability in logits, number of answers it is based on) or None
+        """
+        try:
+            response = self._execute(self.client.table('user_abilities')\
+                .select('ability, responses')\
+                .eq('user_id', user_id)\
+                .eq('skill', skill))
+            if not response.data:
+                return None
+            row = response.data[0]
+            return float(row['ability']), int(row['responses'])
+        except Exception as e:
+            logger.error(f"Error getting ability for user {user_id}: {e}")
+            return None
+    
+    async def save_user_ability(self, user_id: int, skill: str, ability: float, responses: int) -> None:
+        """Store a user's ability estimate for a skill."""
+        try:
+            self._execute(self.client.table('user_abilities').upsert({
+                'user_id': user_id,
+                'skill': skill,
+                'ability': ability,
+                'responses': responses,
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }, on_conflict='user_id,skill'))
+        except Exception as e:
+            logger.error(f"Error saving ability for user {user_id}: {e}")
+    
+    async def update_question_difficulties(self, deltas: Dict[str, float]) -> None:
+        """
+        Apply Elo difficulty steps to exam questions in one call.
+        See migrations/0006_adaptive_difficulty.sql.
+        
+        Args:
+            deltas: Question ID -> change in logits
+        """
+        if not deltas:
+            return
+        try:
+            self._execute(self.client.rpc('update_question_difficulties', {
+                'p_updates': [{'id': qid, 'delta': delta} for qid, delta in deltas.items()]
+            }))
+        except Exception as e:
+            logger.error(f"Error updating question difficulties: {e}")
+    
     async def get_user_progress(
         self,
         user_id: int,
         skill: Optional[str] = None,
-        limit: int = 20
-    ) -> List[Dict[str, Any]]:
-        """Get user's progress history."""
+        limit: int = 20,
+        before: Optional[tuple[str, str]] = None
+    ) -> List[ProgressEntry]:
+        """
+        Get user's progress history, newest first.
+        Pass the (completed_at, id) of the last entry seen as `before` to get the next page.
+        """
         try:
             query = self.client.table('user_progress').select('*')\
-                .eq('user_id', user_id)\
-                .order('completed_at', desc=True)
+                .eq('user_id', user_id)
             
             if skill:
                 query = query.eq('skill', skill)
+            if before:
+                query = query.or_(self._keyset_filter(before, 'lt'))
             
-            response = query.limit(limit).execute()
-            return response.data or []
+            response = self._execute(query.order('completed_at', desc=True)\
+                .order('id', desc=True)\
+                .limit(limit))
+            return [ProgressEntry.from_row(row) for row in response.data or []]
         except Exception as e:
             logger.error(f"Error getting progress for user {user_id}: {e}")
             return []
     
     async def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
-        """Calculate user statistics from progress data."""
+        """
+        Get aggregated statistics over the user's full progress history.
+        Aggregation runs in Postgres (see migrations/0002_user_statistics.sql).
+        """
+        empty = {
+            'total_activities': 0,
+            'average_score': 0,
+            'skill_scores': {},
+            'weak_areas': [],
+            'strengths': []
+        }
         try:
-            progress = await self.get_user_progress(user_id, limit=100)
-            
-            if not progress:
-                return {
-                    'total_activities': 0,
-                    'average_score': 0,
-                    'skill_scores': {},
-                    'weak_areas': [],
-                    'strengths': []
-                }
-            
-            # Calculate statistics
-            skill_scores = {}
-            all_weak_areas = []
-            
-            for entry in progress:
-                skill = entry.get('skill', 'unknown')
-                score = entry.get('score', 0)
-                
-                if skill not in skill_scores:
-                    skill_scores[skill] = []
-                skill_scores[skill].append(score)
-                
-                if entry.get('weak_areas'):
-                    all_weak_areas.extend(entry['weak_areas'])
+            response = self._execute(self.client.rpc('get_user_statistics', {'p_user_id': user_id}))
+            stats = response.data
             
-            # Calculate averages
-            for skill in skill_scores:
-                scores = skill_scores[skill]
-                skill_scores[skill] = sum(scores) / len(scores) if scores else 0
-            
-            # Find most common weak areas
-            from collections import Counter
-            weak_area_counts = Counter(all_weak_areas)
-            top_weak_areas = [area for area, _ in weak_area_counts.most_common(5)]
-            
-            # Identify strengths (skills with avg > 75%)
-            strengths = [skill for skill, avg in skill_scores.items() if avg >= 75]
-            
-            all_scores = [e.get('score', 0) for e in progress]
+            if not stats or not stats.get('total_activities'):
+                return empty
             
             return {
-                'total_activities': len(progress),
-                'average_score': sum(all_scores) / len(all_scores) if all_scores else 0,
-                'skill_scores': skill_scores,
-                'weak_areas': top_weak_areas,
-                'strengths': strengths
+                'total_activities': stats['total_activities'],
+                'average_score': float(stats.get('average_score') or 0),
+                'skill_scores': {
+                    skill: float(score or 0)
+                    for skill, score in (stats.get('skill_scores') or {}).items()
+                },
+                'weak_areas': stats.get('weak_areas') or [],
+                'strengths': stats.get('strengths') or []
             }
         except Exception as e:
             logger.error(f"Error calculating statistics for user {user_id}: {e}")
-            return {
-                'total_activities': 0,
-                'average_score': 0,
-                'skill_scores': {},
-                'weak_areas': [],
-                'strengths': []
-            }
+            return empty
     
     # ==================== CONVERSATION HISTORY OPERATIONS ====================
     
@@ -304,18 +441,25 @@ class DatabaseService:
         user_id: int,
         session_id: str,
         role: str,
-        content: str
+        content: str,
+        skill: Optional[str] = None,
+        deadline: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
-        """Save a conversation message."""
+        """Save a conversation message (skill: what the session practices, restored on resume)."""
         try:
             data = {
+                'id': str(uuid4()),  # idempotency key (with timestamp, the partitioned table's key)
                 'user_id': user_id,
                 'session_id': session_id,
                 'role': role,
                 'content': content,
+                'skill': skill,
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
-            response = self.client.table('conversation_history').insert(data).execute()
+            response = await self._write(
+                self.client.table('conversation_history').upsert(data, on_conflict='id,timestamp'),
+                deadline=deadline
+            )
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error saving conversation for user {user_id}: {e}")
@@ -325,9 +469,13 @@ class DatabaseService:
         self,
         user_id: int,
         session_id: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        since: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
-        """Get conversation history for context."""
+        """
+        Get conversation history for context.
+        Passing `since` lets Postgres prune monthly partitions older than it.
+        """
         try:
             query = self.client.table('conversation_history').select('*')\
                 .eq('user_id', user_id)\
@@ -335,25 +483,72 @@ class DatabaseService:
             
             if session_id:
                 query = query.eq('session_id', session_id)
+            if since:
+                query = query.gte('timestamp', since.isoformat())
             
-            response = query.limit(limit).execute()
+            response = self._execute(query.limit(limit))
             # Reverse to get chronological order
             return list(reversed(response.data)) if response.data else []
         except Exception as e:
             logger.error(f"Error getting conversation history for user {user_id}: {e}")
             return []
     
+    # ==================== VOCABULARY OPERATIONS ====================
+    
+    async def get_vocabulary_cards(self, user_id: int, page_size: int = 1000) -> List[VocabularyCard]:
+        """Get all of a user's vocabulary cards, paging past the PostgREST row limit."""
+        cards: List[VocabularyCard] = []
+        try:
+            while True:
+                response = self._execute(self.client.table('vocabulary_cards').select('*')\
+                    .eq('user_id', user_id)\
+                    .order('due_at')\
+                    .order('word')\
+                    .range(len(cards), len(cards) + page_size - 1))
+                rows = response.data or []
+                cards.extend(VocabularyCard.from_row(row) for row in rows)
+                if len(rows) < page_size:
+                    return cards
+        except Exception as e:
+            logger.error(f"Error getting vocabulary cards for user {user_id}: {e}")
+            return cards
+    
+    async def save_vocabulary_cards(
+        self,
+        user_id: int,
+        cards: List[VocabularyCard],
+        only_new: bool = False,
+        batch_size: int = 500
+    ) -> None:
+        """
+        Upsert vocabulary cards in batches.
+        
+        Args:
+            only_new: Leave existing cards untouched (bulk loading from the word list)
+        """
+        try:
+            for start in range(0, len(cards), batch_size):
+                self._execute(self.client.table('vocabulary_cards').upsert(
+                    [card.to_row(user_id) for card in cards[start:start + batch_size]],
+                    on_conflict='user_id,word',
+                    ignore_duplicates=only_new
+                ))
+        except Exception as e:
+            logger.error(f"Error saving vocabulary cards for user {user_id}: {e}")
+    
     # ==================== EXAM ATTEMPTS OPERATIONS ====================
     
     async def create_exam_attempt(
         self,
         user_id: int,
         exam_type: str,
-        level: str
+        level: str,
+        deadline: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
         """Create a new exam attempt."""
         try:
             data = {
+                'id': str(uuid4()),  # idempotency key: retries upsert the same row
                 'user_id': user_id,
                 'exam_type': exam_type,
                 'level': level,
@@ -361,7 +556,10 @@ class DatabaseService:
                 'is_completed': False,
                 'answers': []
             }
-            response = self.client.table('exam_attempts').insert(data).execute()
+            response = await self._write(
+                self.client.table('exam_attempts').upsert(data, on_conflict='id'),
+                deadline=deadline
+            )
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error creating exam attempt for user {user_id}: {e}")
@@ -370,14 +568,15 @@ class DatabaseService:
     async def update_exam_attempt(
         self,
         attempt_id: str,
-        answers: List[Dict[str, Any]],
+        answers: List[Answer],
         score: Optional[float] = None,
-        is_completed: bool = False
+        is_completed: bool = False,
+        deadline: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
         """Update an exam attempt with answers and score."""
         try:
             data = {
-                'answers': answers,
+                'answers': [answer.to_dict() for answer in answers],
                 'is_completed': is_completed
             }
             
@@ -387,13 +586,60 @@ class DatabaseService:
             if score is not None:
                 data['score'] = score
             
-            response = self.client.table('exam_attempts').update(data)\
-                .eq('id', attempt_id).execute()
+            # Sets fixed values, so retrying is safe
+            response = await self._write(
+                self.client.table('exam_attempts').update(data).eq('id', attempt_id),
+                deadline=deadline
+            )
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error updating exam attempt {attempt_id}: {e}")
             return None
     
+    async def get_exam_history_page(
+        self,
+        user_id: int,
+        cursor: Optional[tuple[str, str]] = None,
+        newer: bool = False,
+        limit: int = 5
+    ) -> tuple[List[Dict[str, Any]], bool]:
+        """
+        Get one page of completed exam attempts, newest first.
+        Keyset pagination on (completed_at, id); only summary columns are fetched.
+        
+        Args:
+            user_id: Telegram user ID
+            cursor: (completed_at, id) of the row to page from
+            newer: Page towards newer attempts instead of older ones
+            limit: Page size
+        
+        Returns:
+            (attempts, has_more) where has_more tells if another page exists in that direction
+        """
+        try:
+            query = self.client.table('exam_attempts')\
+                .select('id, exam_type, level, score, completed_at')\
+                .eq('user_id', user_id)\
+                .eq('is_completed', True)
+            
+            if cursor:
+                query = query.or_(self._keyset_filter(cursor, 'gt' if newer else 'lt'))
+            
+            response = self._execute(query.order('completed_at', desc=not newer)\
+                .order('id', desc=not newer)\
+                .limit(limit + 1))
+            
+            rows = response.data or []
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if newer:
+                rows.reverse()
+            
+            return rows, has_more
+        except Exception as e:
+            logger.error(f"Error getting exam history for user {user_id}: {e}")
+            return [], False
+    
     async def get_exam_attempts(
         self,
         user_id: int,
@@ -410,11 +656,17 @@ class DatabaseService:
             if exam_type:
                 query = query.eq('exam_type', exam_type)
             
-            response = query.limit(limit).execute()
+            response = self._execute(query.limit(limit))
             return response.data or []
         except Exception as e:
             logger.error(f"Error getting exam attempts for user {user_id}: {e}")
             return []
+    
+    @staticmethod
+    def _keyset_filter(cursor: tuple[str, str], op: str, column: str = 'completed_at') -> str:
+        """Build a PostgREST `or` filter for (column, id) keyset pagination."""
+        value, row_id = cursor
+        return f'{column}.{op}."{value}",and({column}.eq."{value}",id.{op}.{row_id})'
 
 
 # Singleton instance
@@ -0,0 +1,328 @@
+"""
+Durable queue for writing and speaking evaluations.
+Submissions are stored in SQLite and evaluated by a pool of background workers,
+so exam handlers return immediately and no submission is lost on a restart.
+Transient examiner failures are retried with exponential backoff. Each job
+carries the key of the progress row it writes, so a job that runs again after a
+crash or restart overwrites its row instead of adding another. Jobs that failed
+for good are kept for EVALUATION_FAILED_RETENTION, then purged.
+"""
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import logging
+from uuid import uuid4
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+
+from bot.config import Config
+from bot.services.ai_tutor import ai_tutor
+from bot.services.database import db
+from bot.services.models import Answer, Evaluation, SpeechMetrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class EvaluationJob:
+    """A queued writing or speaking submission."""
+    id: int
+    user_id: int
+    chat_id: int
+    exam_type: str
+    level: str
+    prompt: str
+    question_id: Optional[str]
+    attempt_id: Optional[str]
+    user_text: str
+    metrics: Optional[SpeechMetrics]
+    attempts: int
+    progress_id: str  # idempotency key of the user_progress row
+
+
+class EvaluationQueue:
+    """SQLite-backed job queue with an asyncio worker pool."""
+
+    def __init__(
+        self,
+        path: str = Config.EVALUATION_QUEUE_PATH,
+        workers: int = Config.EVALUATION_WORKERS,
+        max_attempts: int = Config.EVALUATION_MAX_ATTEMPTS
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.completed = 0
+        self.failed = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS evaluation_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL,
+                exam_type TEXT NOT NULL,
+                level TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                question_id TEXT,
+                attempt_id TEXT,
+                user_text TEXT NOT NULL,
+                metrics TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                progress_id TEXT
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(evaluation_jobs)")}
+        if 'progress_id' not in columns:
+            # Queue files created before progress writes were keyed by job
+            self._conn.execute("ALTER TABLE evaluation_jobs ADD COLUMN progress_id TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_due ON evaluation_jobs(status, next_run_at)"
+        )
+        self._conn.commit()
+
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._deliver: Optional[Callable[[EvaluationJob, Optional[Evaluation]], Awaitable[Any]]] = None
+
+    @property
+    def is_running(self) -> bool:
+        """True once the workers have been started."""
+        return bool(self._tasks)
+
+    def submit(
+        self,
+        user_id: int,
+        chat_id: int,
+        exam_type: str,
+        level: str,
+        prompt: str,
+        question_id: Optional[str],
+        attempt_id: Optional[str],
+        user_text: str,
+        metrics: Optional[SpeechMetrics] = None
+    ) -> int:
+        """
+        Queue a submission for evaluation.
+
+        Returns:
+            Job ID
+        """
+        now = time.time()
+        cursor = self._conn.execute(
+            """
+            INSERT INTO evaluation_jobs
+                (user_id, chat_id, exam_type, level, prompt, question_id, attempt_id,
+                 user_text, metrics, next_run_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id, chat_id, exam_type, level, prompt, question_id, attempt_id,
+                user_text, json.dumps(metrics.to_dict()) if metrics else None, now, now
+            )
+        )
+        self._conn.commit()
+        self._wakeup.set()
+        logger.info(f"Queued {exam_type} evaluation job {cursor.lastrowid} for user {user_id}")
+        return cursor.lastrowid
+
+    def start(self, deliver: Callable[[EvaluationJob, Optional[Evaluation]], Awaitable[Any]]) -> None:
+        """
+        Start the worker pool (call from inside the running event loop).
+
+        Args:
+            deliver: Coroutine sending the result to the student (None if evaluation failed for good)
+        """
+        self._deliver = deliver
+
+        # Jobs interrupted by a restart are picked up again
+        recovered = self._conn.execute(
+            "UPDATE evaluation_jobs SET status = 'pending' WHERE status = 'running'"
+        ).rowcount
+        self._conn.commit()
+        if recovered:
+            logger.info(f"Recovered {recovered} interrupted evaluation jobs")
+        self.purge()
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are retried on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _claim(self) -> Optional[EvaluationJob]:
+        """Mark the oldest due job as running and return it."""
+        row = self._conn.execute(
+            """
+            SELECT id, user_id, chat_id, exam_type, level, prompt, question_id, attempt_id,
+                   user_text, metrics, attempts, progress_id
+            FROM evaluation_jobs
+            WHERE status = 'pending' AND next_run_at <= ?
+            ORDER BY next_run_at, id
+            LIMIT 1
+            """,
+            (time.time(),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        # The key is fixed on the first claim and reused by every retry
+        progress_id = row[11] or str(uuid4())
+        self._conn.execute(
+            "UPDATE evaluation_jobs SET status = 'running', attempts = attempts + 1, progress_id = ? WHERE id = ?",
+            (progress_id, row[0])
+        )
+        self._conn.commit()
+
+        metrics = SpeechMetrics.from_dict(json.loads(row[9])) if row[9] else None
+        return EvaluationJob(*row[:9], metrics, row[10] + 1, progress_id)
+
+    def _next_due_in(self) -> Optional[float]:
+        """Seconds until the next scheduled retry, or None if nothing is waiting."""
+        row = self._conn.execute(
+            "SELECT MIN(next_run_at) FROM evaluation_jobs WHERE status = 'pending'"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    async def _worker(self) -> None:
+        """Process due jobs until cancelled."""
+        while True:
+            # Claims run on the event loop thread, so workers never take the same job
+            self._wakeup.clear()
+            job = self._claim()
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_due_in())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Evaluation job {job.id} crashed: {e}")
+                await self._retry_or_fail(job, str(e))
+
+    async def _process(self, job: EvaluationJob) -> None:
+        """Evaluate one submission, store the result and deliver it."""
+        if job.exam_type == 'schreiben':
+            evaluation = await ai_tutor.evaluate_writing(job.user_text, job.prompt, job.level, user_id=job.user_id)
+        else:
+            evaluation = await ai_tutor.evaluate_speaking(
+                job.user_text, job.prompt, job.level, job.metrics, user_id=job.user_id
+            )
+
+        if evaluation.failed:
+            await self._retry_or_fail(job, "examiner unavailable")
+            return
+
+        # The database methods log their errors and return None; the job stays queued until both writes land
+        if job.attempt_id:
+            attempt = await db.update_exam_attempt(
+                job.attempt_id,
+                answers=[Answer(
+                    question_id=job.question_id,
+                    user_answer=job.user_text,
+                    evaluation=evaluation
+                )],
+                score=evaluation.overall_score,
+                is_completed=True
+            )
+            if attempt is None:
+                await self._retry_or_fail(job, "exam attempt not saved")
+                return
+
+        progress = await db.save_progress(
+            user_id=job.user_id,
+            skill=job.exam_type,
+            activity_type='exam',
+            score=evaluation.overall_score,
+            weak_areas=list(evaluation.suggestions[:3]),
+            progress_id=job.progress_id
+        )
+        if progress is None:
+            await self._retry_or_fail(job, "progress not saved")
+            return
+
+        self._conn.execute("DELETE FROM evaluation_jobs WHERE id = ?", (job.id,))
+        self._conn.commit()
+        self.completed += 1
+
+        await self._send(job, evaluation)
+
+    async def _retry_or_fail(self, job: EvaluationJob, error: str) -> None:
+        """Reschedule a failed job with backoff, or give up after max_attempts."""
+        if job.attempts < self.max_attempts:
+            delay = min(Config.EVALUATION_RETRY_MAX, Config.EVALUATION_RETRY_BASE * 2 ** (job.attempts - 1))
+            delay *= random.uniform(0.8, 1.2)
+            self._conn.execute(
+                "UPDATE evaluation_jobs SET status = 'pending', next_run_at = ?, last_error = ? WHERE id = ?",
+                (time.time() + delay, error, job.id)
+            )
+            self._conn.commit()
+            logger.warning(f"Evaluation job {job.id} failed ({error}), retry {job.attempts} in {delay:.0f}s")
+            return
+
+        self._conn.execute(
+            "UPDATE evaluation_jobs SET status = 'failed', last_error = ? WHERE id = ?",
+            (error, job.id)
+        )
+        self._conn.commit()
+        self.failed += 1
+        logger.error(f"Evaluation job {job.id} failed after {job.attempts} attempts: {error}")
+        self.purge()
+
+        await self._send(job, None)
+
+    async def _send(self, job: EvaluationJob, evaluation: Optional[Evaluation]) -> None:
+        """Deliver a result to the student, logging delivery errors."""
+        try:
+            await self._deliver(job, evaluation)
+        except Exception as e:
+            logger.error(f"Error delivering evaluation job {job.id} to user {job.user_id}: {e}")
+
+    def purge(self, retention: float = Config.EVALUATION_FAILED_RETENTION) -> int:
+        """
+        Delete failed jobs older than the retention period.
+
+        Returns:
+            Number of jobs deleted
+        """
+        purged = self._conn.execute(
+            "DELETE FROM evaluation_jobs WHERE status = 'failed' AND created_at < ?",
+            (time.time() - retention,)
+        ).rowcount
+        self._conn.commit()
+        if purged:
+            logger.info(f"Purged {purged} failed evaluation jobs")
+        return purged
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and outcome counters since startup."""
+        counts = dict(self._conn.execute(
+            "SELECT status, COUNT(*) FROM evaluation_jobs GROUP BY status"
+        ).fetchall())
+        return {
+            'pending': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'failed_total': counts.get('failed', 0),
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+
+# Singleton instance
+evaluation_queue = EvaluationQueue()
@@ -8,6 +8,8 @@ from uuid import uuid4
 
 from bot.services.database import db
 from bot.services.ai_tutor import ai_tutor
+from bot.services.content_library import content_library
+from bot.services.models import ExamQuestion, Answer
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +33,10 @@ class ExamEngine:
         level: str,
         exam_type: str,
         count: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ExamQuestion]:
         """
         Get questions for an exam.
-        Falls back to AI-generated questions if database is empty.
+        Falls back to bundled content packs, then AI-generated questions, if the database runs short.
         """
         if count is None:
             count = self.QUESTION_COUNTS.get(exam_type, 5)
@@ -42,6 +44,11 @@ class ExamEngine:
         # Try to get from database first
         questions = await db.get_random_exam_questions(level, exam_type, count)
         
+        # Then from the bundled packs (pack questions keep their IDs once imported)
+        if len(questions) < count:
+            taken = {q.id for q in questions}
+            questions.extend(content_library.sample(level, exam_type, count - len(questions), exclude=taken))
+        
         # If not enough questions, generate with AI
         if len(questions) < count:
             needed = count - len(questions)
@@ -51,29 +58,29 @@ class ExamEngine:
                 generated = await ai_tutor.generate_exam_question(level, exam_type)
                 if generated:
                     # Format as exam question
-                    questions.append({
-                        'id': str(uuid4()),
-                        'level': level,
-                        'exam_type': exam_type,
-                        'question_text': generated.get('question_text', ''),
-                        'question_data': generated,
-                        'correct_answer': generated.get('correct_answer', ''),
-                        'difficulty': 5,
-                        'generated': True  # Mark as AI-generated
-                    })
+                    questions.append(ExamQuestion(
+                        id=str(uuid4()),
+                        level=level,
+                        exam_type=exam_type,
+                        question_text=generated.get('question_text', ''),
+                        question_data=generated,
+                        correct_answer=generated.get('correct_answer', ''),
+                        difficulty=5,
+                        generated=True  # Mark as AI-generated
+                    ))
         
         return questions[:count]
     
     def calculate_score(
         self,
-        answers: List[Dict[str, Any]],
+        answers: List[Answer],
         exam_type: str
     ) -> Dict[str, Any]:
         """
         Calculate exam score from answers.
         
         Args:
-            answers: List of answer dictionaries with question_id, user_answer, correct_answer, is_correct
+            answers: List of answers with question_id, user_answer, correct_answer, is_correct
             exam_type: Type of exam
         
         Returns:
@@ -90,14 +97,14 @@ class ExamEngine:
             }
         
         total = len(answers)
-        correct = sum(1 for a in answers if a.get('is_correct', False))
+        correct = sum(1 for a in answers if a.is_correct)
         percentage = (correct / total * 100) if total > 0 else 0
         
         # Identify weak areas from wrong answers
         weak_areas = []
         for answer in answers:
-            if not answer.get('is_correct', False):
-                topic = answer.get('topic', exam_type)
+            if not answer.is_correct:
+                topic = answer.topic or exam_type
                 if topic not in weak_areas:
                     weak_areas.append(topic)
         
@@ -149,7 +156,7 @@ class ExamEngine:
     
     def check_answer(
         self,
-        question: Dict[str, Any],
+        question: ExamQuestion,
         user_answer: str
     ) -> tuple[bool, str]:
         """
@@ -158,7 +165,7 @@ class ExamEngine:
         Returns:
             (is_correct, explanation)
         """
-        correct_answer = question.get('correct_answer', '').strip().upper()
+        correct_answer = question.correct_answer.strip().upper()
         user_answer_clean = user_answer.strip().upper()
         
         # Handle different answer formats
@@ -171,8 +178,7 @@ class ExamEngine:
         is_correct = user_answer_clean == correct_answer
         
         # Get explanation from question data
-        question_data = question.get('question_data', {})
-        explanation = question_data.get('explanation', '')
+        explanation = question.data.get('explanation', '')
         
         if not explanation:
             if is_correct:
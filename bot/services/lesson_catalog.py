@@ -0,0 +1,94 @@
+"""
+In-memory lesson catalog.
+All active lessons (database plus bundled content packs) are loaded once and
+indexed by (level, skill, topic), so browsing and opening a lesson needs no
+database round trip. A cheap version check reloads the catalog when lessons change;
+while the database is unreachable the last loaded catalog stays in place.
+"""
+import time
+import logging
+from typing import Optional, List, Dict, Any, Tuple
+
+from bot.config import Config
+from bot.services.database import db
+from bot.services.content_library import content_library
+
+logger = logging.getLogger(__name__)
+
+
+class LessonCatalog:
+    """Lessons indexed by ID and by (level, skill, topic)."""
+
+    def __init__(self, check_interval: int = Config.LESSON_CATALOG_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lessons: Dict[str, Dict[str, Any]] = {}
+        self._index: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._version: Optional[str] = None
+        self._checked_at = float('-inf')
+
+    async def refresh(self, force: bool = False) -> None:
+        """Reload the catalog if the lessons table changed since the last load."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        version = await db.get_lessons_version()
+        if version is None and self._lessons:
+            # Database unreachable: keep serving the catalog we have
+            return
+        if not force and version is not None and version == self._version:
+            return
+
+        rows = await db.get_lesson_catalog(Config.LESSON_CATALOG_SIZE) if version is not None else None
+        if rows is None:
+            if self._lessons:
+                logger.warning("Lesson catalog reload failed, keeping the current catalog")
+                return
+            # Bundled lessons only; the next check loads the database once it answers
+            rows, version = [], None
+
+        lessons = {str(row['id']): row for row in rows}
+        # Bundled lessons fill in until the pack has been imported
+        for row in content_library.lessons():
+            lessons.setdefault(row['id'], row)
+
+        index: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for lesson in sorted(lessons.values(), key=lambda l: (l.get('topic') or '', l['title'])):
+            index.setdefault((lesson['level'], lesson['skill'], lesson.get('topic') or ''), []).append(lesson)
+
+        self._lessons, self._index, self._version = lessons, index, version
+        logger.info(f"Loaded lesson catalog: {len(lessons)} lessons (version {version})")
+
+    async def skills(self, level: str) -> Dict[str, int]:
+        """Skills with lessons at a level, and how many each has."""
+        await self.refresh()
+        counts: Dict[str, int] = {}
+        for (lesson_level, skill, _), lessons in self._index.items():
+            if lesson_level == level:
+                counts[skill] = counts.get(skill, 0) + len(lessons)
+        return counts
+
+    async def lessons(self, level: str, skill: str, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Lessons of a level and skill, optionally one topic, ordered by topic and title."""
+        await self.refresh()
+        if topic is not None:
+            return list(self._index.get((level, skill, topic), []))
+        return [
+            lesson
+            for (lesson_level, lesson_skill, _), lessons in sorted(self._index.items())
+            if lesson_level == level and lesson_skill == skill
+            for lesson in lessons
+        ]
+
+    async def get(self, lesson_id: str) -> Optional[Dict[str, Any]]:
+        """A lesson by ID, read from the database if it is not in the catalog yet."""
+        await self.refresh()
+        lesson = self._lessons.get(lesson_id)
+        if lesson is None:
+            lesson = await db.get_lesson_by_id(lesson_id)
+        return lesson
+
+
+# Singleton instance
+lesson_catalog = LessonCatalog()
@@ -0,0 +1,254 @@
+"""
+Central scheduler for OpenRouter requests.
+Interactive chat goes ahead of exam evaluation, which goes ahead of background
+question generation; within a class, users take turns so one student's burst
+cannot hold up everyone else. A token bucket keeps the request rate under the
+provider limit, and 429 responses (Retry-After / X-RateLimit-Reset) pause
+dispatching until the provider accepts requests again.
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Awaitable, Deque
+
+import httpx
+
+from bot.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, most urgent first
+PRIORITY_CHAT = 0
+PRIORITY_EVALUATION = 1
+PRIORITY_GENERATION = 2
+
+PRIORITY_NAMES = {PRIORITY_CHAT: 'chat', PRIORITY_EVALUATION: 'evaluation', PRIORITY_GENERATION: 'generation'}
+
+
+@dataclass(slots=True)
+class LLMRequest:
+    """A queued provider call."""
+    send: Callable[[], Awaitable[httpx.Response]]
+    priority: int
+    user_id: Optional[int]
+    future: asyncio.Future
+    enqueued_at: float
+    attempts: int = 0
+    task: Optional[asyncio.Task] = None
+
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Seconds to wait after a 429, from Retry-After or X-RateLimit-Reset (epoch ms)."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset:
+        try:
+            return max(0.0, int(reset) / 1000 - time.time())
+        except ValueError:
+            pass
+
+    return default
+
+
+class LLMScheduler:
+    """Priority queues with per-user round robin, a token bucket and a concurrency limit."""
+
+    def __init__(
+        self,
+        rate_per_minute: float = Config.LLM_RATE_PER_MINUTE,
+        burst: int = Config.LLM_BURST,
+        max_concurrency: int = Config.LLM_MAX_CONCURRENCY,
+        max_attempts: int = Config.LLM_MAX_ATTEMPTS
+    ):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # priority -> user -> requests; dict order is the round-robin order
+        self._queues: Dict[int, OrderedDict[Optional[int], Deque[LLMRequest]]] = {
+            priority: OrderedDict() for priority in PRIORITY_NAMES
+        }
+
+        self.dispatched = 0
+        self.rate_limited = 0
+        self._wait_total: Dict[int, float] = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self._wait_count: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+
+    async def submit(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        priority: int = PRIORITY_CHAT,
+        user_id: Optional[int] = None
+    ) -> httpx.Response:
+        """
+        Queue a provider call and wait for its response.
+
+        Args:
+            send: Coroutine function performing the HTTP request
+            priority: PRIORITY_CHAT, PRIORITY_EVALUATION or PRIORITY_GENERATION
+            user_id: Telegram user the request is for (None for system work)
+
+        Returns:
+            The provider response (a 429 only once max_attempts are used up)
+        """
+        request = LLMRequest(send, priority, user_id, asyncio.get_running_loop().create_future(), time.monotonic())
+        self._enqueue(request)
+        self._pump()
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            # Caller gave up: drop the request or stop it if it is already running
+            if request.task is not None:
+                request.task.cancel()
+            else:
+                self._remove(request)
+            raise
+
+    def _enqueue(self, request: LLMRequest, front: bool = False) -> None:
+        """Add a request to its user's queue within its priority class."""
+        users = self._queues[request.priority]
+        queue = users.get(request.user_id)
+        if queue is None:
+            queue = users[request.user_id] = deque()
+        if front:
+            queue.appendleft(request)
+            users.move_to_end(request.user_id, last=False)
+        else:
+            queue.append(request)
+
+    def _remove(self, request: LLMRequest) -> None:
+        """Remove a cancelled request that has not been dispatched."""
+        users = self._queues[request.priority]
+        queue = users.get(request.user_id)
+        if queue is not None and request in queue:
+            queue.remove(request)
+            if not queue:
+                del users[request.user_id]
+
+    def _next_request(self) -> Optional[LLMRequest]:
+        """Pop the head request of the next user in the most urgent non-empty class."""
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            if not users:
+                continue
+            user_id, queue = next(iter(users.items()))
+            request = queue.popleft()
+            if queue:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            return request
+        return None
+
+    def _take_token(self, now: float) -> float:
+        """Take a token if one is available; otherwise return seconds until one is."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _pump(self) -> None:
+        """Start as many queued requests as the concurrency limit and token bucket allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._active < self.max_concurrency and any(self._queues.values()):
+            wait = self._take_token(time.monotonic())
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+
+            request = self._next_request()
+            self._active += 1
+            self.dispatched += 1
+            self._wait_total[request.priority] += time.monotonic() - request.enqueued_at
+            self._wait_count[request.priority] += 1
+            request.task = asyncio.create_task(self._run(request))
+
+    async def _run(self, request: LLMRequest) -> None:
+        """Send one request; on 429 pause dispatching and requeue it at the front."""
+        request.attempts += 1
+        try:
+            response = await request.send()
+            if response.status_code == 429 and self._rate_limited(request, response):
+                return
+            if not request.future.done():
+                request.future.set_result(response)
+        except asyncio.CancelledError:
+            if not request.future.done():
+                request.future.cancel()
+            raise
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            self._active -= 1
+            self._pump()
+
+    def _rate_limited(self, request: LLMRequest, response: httpx.Response) -> bool:
+        """
+        Pause dispatching after a 429.
+
+        Returns:
+            True if the request was requeued for another attempt
+        """
+        self.rate_limited += 1
+        delay = retry_after_seconds(response, Config.LLM_RATE_LIMIT_PAUSE)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        # Restart with an empty bucket once the pause is over
+        self._tokens = 0.0
+        self._refilled_at = self._paused_until
+        logger.warning(
+            f"OpenRouter rate limit hit ({PRIORITY_NAMES[request.priority]} request, "
+            f"attempt {request.attempts}), pausing {delay:.1f}s"
+        )
+
+        if request.attempts >= self.max_attempts or request.future.done():
+            return False
+        request.task = None
+        request.enqueued_at = time.monotonic()
+        self._enqueue(request, front=True)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths, mean queue wait per class and rate-limit counters."""
+        return {
+            'queued': {
+                PRIORITY_NAMES[p]: sum(len(q) for q in users.values()) for p, users in self._queues.items()
+            },
+            'mean_wait': {
+                PRIORITY_NAMES[p]: round(self._wait_total[p] / self._wait_count[p], 3) if self._wait_count[p] else 0.0
+                for p in PRIORITY_NAMES
+            },
+            'active': self._active,
+            'dispatched': self.dispatched,
+            'rate_limited': self.rate_limited,
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 1)
+        }
+
+
+# Singleton instance
+llm_scheduler = LLMScheduler()
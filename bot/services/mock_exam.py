@@ -0,0 +1,172 @@
+"""
+Full mock exam: all five sections in Goethe order with pipelined loading.
+The next section's questions are fetched while the student works on the current
+one, and writing/speaking answers are evaluated in the background, so the
+weighted report is ready when the last section is finished.
+"""
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any
+
+from bot.services.ai_tutor import ai_tutor
+from bot.services.exam_engine import exam_engine
+from bot.services.models import ExamQuestion, Answer, Evaluation, SpeechMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class MockExamSession:
+    """One student's run through the full mock exam."""
+
+    SECTIONS = ['lesen', 'horen', 'schreiben', 'sprechen', 'vokabular']
+    SUBJECTIVE_SECTIONS = ('schreiben', 'sprechen')
+
+    def __init__(self, level: str, user_id: Optional[int] = None):
+        self.level = level
+        self.user_id = user_id
+        self.index = 0
+        self.section_scores: Dict[str, float] = {}
+        self.weak_areas: Dict[str, List[str]] = {}
+        self.unevaluated: List[str] = []  # subjective sections the examiner could not score
+        self.skipped: List[str] = []  # sections without questions, left out of the score
+        self.answers: List[Answer] = []
+        self._questions: Dict[str, asyncio.Task] = {}
+        self._evaluations: Dict[str, asyncio.Task] = {}
+
+    @property
+    def section(self) -> Optional[str]:
+        """Section in progress, or None once all sections are done."""
+        return self.SECTIONS[self.index] if self.index < len(self.SECTIONS) else None
+
+    @property
+    def is_finished(self) -> bool:
+        """True after the last section has been submitted."""
+        return self.index >= len(self.SECTIONS)
+
+    @property
+    def has_pending_evaluations(self) -> bool:
+        """True while a background evaluation is still running."""
+        return any(not task.done() for task in self._evaluations.values())
+
+    def start(self) -> None:
+        """Begin loading the first two sections."""
+        self._prefetch(0)
+        self._prefetch(1)
+
+    def _prefetch(self, index: int) -> None:
+        """Start loading a section's questions in the background."""
+        if index >= len(self.SECTIONS):
+            return
+        section = self.SECTIONS[index]
+        if section not in self._questions:
+            self._questions[section] = asyncio.create_task(
+                exam_engine.get_exam_questions(self.level, section)
+            )
+
+    async def questions(self) -> List[ExamQuestion]:
+        """
+        Get the current section's questions and prefetch the next section.
+
+        Returns:
+            Questions (usually already loaded while the previous section ran)
+        """
+        self._prefetch(self.index)
+        self._prefetch(self.index + 1)
+        try:
+            return await self._questions[self.section]
+        except Exception as e:
+            logger.error(f"Error loading mock exam section {self.section}: {e}")
+            return []
+
+    def complete_objective(self, answers: List[Answer]) -> Dict[str, Any]:
+        """
+        Score a finished objective section and move on.
+
+        Returns:
+            The section result from ExamEngine.calculate_score
+        """
+        result = exam_engine.calculate_score(answers, self.section)
+        self.section_scores[self.section] = result['score']
+        self.weak_areas[self.section] = result['weak_areas']
+        self.answers.extend(answers)
+        self.index += 1
+        return result
+
+    def complete_subjective(
+        self,
+        question: ExamQuestion,
+        user_text: str,
+        metrics: Optional[SpeechMetrics] = None
+    ) -> None:
+        """Queue a writing/speaking answer for background evaluation and move on."""
+        self._evaluations[self.section] = asyncio.create_task(
+            self._evaluate(self.section, question, user_text, metrics)
+        )
+        self.index += 1
+
+    async def _evaluate(
+        self,
+        section: str,
+        question: ExamQuestion,
+        user_text: str,
+        metrics: Optional[SpeechMetrics]
+    ) -> Evaluation:
+        """Evaluate one subjective answer and record it."""
+        if section == 'schreiben':
+            evaluation = await ai_tutor.evaluate_writing(user_text, question.prompt, self.level, user_id=self.user_id)
+        else:
+            evaluation = await ai_tutor.evaluate_speaking(
+                user_text, question.prompt, self.level, metrics, user_id=self.user_id
+            )
+
+        self.answers.append(Answer(
+            question_id=question.id,
+            user_answer=user_text,
+            evaluation=evaluation
+        ))
+        return evaluation
+
+    def skip_section(self) -> None:
+        """Move past a section that has no questions (not scored)."""
+        self.skipped.append(self.section)
+        self.index += 1
+
+    async def finish(self) -> Dict[str, Any]:
+        """
+        Wait for outstanding evaluations and build the final report.
+
+        Returns:
+            Dictionary with the scores of the sections taken and evaluated, the
+            overall score weighted over them, a completeness and pass flag, the sections below
+            the pass mark, and the sections skipped or not evaluated
+        """
+        sections = list(self._evaluations)
+        results = await asyncio.gather(*self._evaluations.values(), return_exceptions=True)
+
+        for section, result in zip(sections, results):
+            if isinstance(result, BaseException) or result.failed:
+                logger.error(f"Mock exam {section} evaluation failed: {result}")
+                self.unevaluated.append(section)
+                continue
+            self.section_scores[section] = result.overall_score
+            self.weak_areas[section] = list(result.suggestions[:3])
+
+        # Skipped and unevaluated sections are left out, so the weights are spread over the rest
+        scores = {s: self.section_scores[s] for s in self.SECTIONS if s in self.section_scores}
+        overall = exam_engine.calculate_weighted_score(scores)
+        complete = not self.skipped and not self.unevaluated
+
+        return {
+            'section_scores': scores,
+            'score': overall,
+            'complete': complete,
+            'passed': complete and overall >= 60,
+            'weak_sections': [s for s in scores if scores[s] < 60],
+            'skipped': list(self.skipped),
+            'unevaluated': list(self.unevaluated)
+        }
+
+    def cancel(self) -> None:
+        """Stop background loading and evaluations of an abandoned exam."""
+        for task in [*self._questions.values(), *self._evaluations.values()]:
+            task.cancel()
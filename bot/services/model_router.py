@@ -0,0 +1,273 @@
+"""
+Model routing for OpenRouter requests.
+Each task (chat, evaluation, generation) has a prioritized list of models. A
+failed attempt fails over to the next model, and models that keep failing are
+skipped for a cooldown. For hedged tasks a backup request is fired when the
+first one runs past its model's p95 latency, and whichever loses is cancelled.
+Every attempt goes through the shared LLM scheduler.
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Deque
+
+import httpx
+
+from bot.config import Config
+from bot.services.llm_scheduler import llm_scheduler, PRIORITY_CHAT, PRIORITY_EVALUATION, PRIORITY_GENERATION
+
+logger = logging.getLogger(__name__)
+
+TASK_PRIORITIES = {'chat': PRIORITY_CHAT, 'evaluation': PRIORITY_EVALUATION, 'generation': PRIORITY_GENERATION}
+
+# (model, timeout) -> provider response
+Post = Callable[[str, float], Awaitable[httpx.Response]]
+
+
+class ModelStats:
+    """Recent latencies and failures of one model."""
+
+    def __init__(self, window: int = Config.LLM_MODEL_LATENCY_WINDOW):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.consecutive_errors = 0
+        self.unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """False while the model is cooling down after repeated failures."""
+        return time.monotonic() >= self.unavailable_until
+
+    def record_success(self, latency: float) -> None:
+        """Record a 200 response and its latency."""
+        self.requests += 1
+        self.consecutive_errors = 0
+        self.latencies.append(latency)
+
+    def record_rate_limited(self) -> None:
+        """Record a 429: the scheduler pauses and retries, and the model is not at fault."""
+        self.requests += 1
+        self.rate_limited += 1
+
+    def record_failure(self) -> None:
+        """Record an error response or exception."""
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= Config.LLM_MODEL_FAILURE_THRESHOLD:
+            # After the cooldown one more failure is enough to skip it again
+            self.unavailable_until = time.monotonic() + Config.LLM_MODEL_COOLDOWN
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-1) over the window, None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass(slots=True)
+class Attempt:
+    """One request to one model."""
+    model: str
+    hedge: bool = False
+    started_at: Optional[float] = None
+
+
+class ModelRouter:
+    """Failover and hedging across each task's configured models."""
+
+    def __init__(
+        self,
+        models: Dict[str, List[str]] = Config.AI_MODELS,
+        hedge_tasks: List[str] = Config.LLM_HEDGE_TASKS
+    ):
+        self.models = models
+        self.hedge_tasks = set(hedge_tasks)
+        self._stats: Dict[str, ModelStats] = {}
+
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def stats_for(self, model: str) -> ModelStats:
+        """Stats of a model, created on first use."""
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def candidates(self, task: str) -> List[str]:
+        """The task's models in order, skipping those cooling down (unless all are)."""
+        models = self.models.get(task) or [Config.AI_MODEL]
+        return [model for model in models if self.stats_for(model).available] or list(models)
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for a model before firing a backup request."""
+        stats = self.stats_for(model)
+        if len(stats.latencies) < Config.LLM_HEDGE_MIN_SAMPLES:
+            return Config.LLM_HEDGE_DEFAULT_DELAY
+        return max(Config.LLM_HEDGE_MIN_DELAY, stats.percentile(0.95))
+
+    async def _attempt(
+        self,
+        attempt: Attempt,
+        post: Post,
+        timeout: float,
+        priority: int,
+        user_id: Optional[int]
+    ) -> httpx.Response:
+        """Send one attempt through the scheduler and record its outcome."""
+        stats = self.stats_for(attempt.model)
+
+        async def send() -> httpx.Response:
+            attempt.started_at = time.monotonic()
+            try:
+                response = await post(attempt.model, timeout)
+            except asyncio.CancelledError:
+                # A cancelled hedge loser took at least this long; keeping it stops p95 drifting down
+                stats.latencies.append(time.monotonic() - attempt.started_at)
+                raise
+            except Exception:
+                stats.record_failure()
+                raise
+            if response.status_code == 200:
+                stats.record_success(time.monotonic() - attempt.started_at)
+            elif response.status_code == 429:
+                stats.record_rate_limited()
+            else:
+                stats.record_failure()
+            return response
+
+        return await llm_scheduler.submit(send, priority=priority, user_id=user_id)
+
+    async def request(
+        self,
+        task: str,
+        post: Post,
+        timeout: float,
+        user_id: Optional[int] = None
+    ) -> httpx.Response:
+        """
+        Send a request for a task, failing over and hedging across its models.
+
+        Args:
+            task: 'chat', 'evaluation' or 'generation'
+            post: Coroutine function sending the request to one model
+            timeout: Seconds the whole request may take, failovers included
+            user_id: Telegram user the request is for (None for system work)
+
+        Returns:
+            The first successful response, or the last failed one
+
+        Raises:
+            httpx.TimeoutException if the request, scheduler queueing included,
+            runs past the timeout; otherwise the last attempt's exception if no
+            attempt returned a response
+        """
+        try:
+            # Cancelling _route cancels its outstanding attempts, queued or running
+            return await asyncio.wait_for(self._route(task, post, time.monotonic() + timeout, user_id), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise httpx.TimeoutException(f"{task} request took longer than {timeout:.0f}s") from None
+
+    async def _route(
+        self,
+        task: str,
+        post: Post,
+        deadline: float,
+        user_id: Optional[int]
+    ) -> httpx.Response:
+        """Failover and hedging loop of request(); the caller enforces the deadline."""
+        priority = TASK_PRIORITIES[task]
+        waiting = self.candidates(task)
+        hedging = task in self.hedge_tasks
+        pending: Dict[asyncio.Task, Attempt] = {}
+        response: Optional[httpx.Response] = None
+        error: Optional[Exception] = None
+
+        def launch(model: str, hedge: bool = False) -> Attempt:
+            attempt = Attempt(model, hedge)
+            pending[asyncio.create_task(
+                self._attempt(attempt, post, deadline - time.monotonic(), priority, user_id)
+            )] = attempt
+            return attempt
+
+        primary = launch(waiting.pop(0))
+        try:
+            while pending:
+                wait = hedge_at = None
+                if hedging:
+                    if primary.started_at is None:
+                        # Still queued in the scheduler: the hedge clock starts on dispatch
+                        wait = Config.LLM_HEDGE_MIN_DELAY
+                    else:
+                        hedge_at = primary.started_at + self.hedge_delay(primary.model)
+                        wait = max(0.0, hedge_at - time.monotonic())
+
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    now = time.monotonic()
+                    if hedge_at is not None and now >= hedge_at and deadline - now > Config.LLM_HEDGE_MIN_DELAY:
+                        hedging = False
+                        self.hedges += 1
+                        launch(waiting.pop(0) if waiting else primary.model, hedge=True)
+                    continue
+
+                for finished in done:
+                    attempt = pending.pop(finished)
+                    try:
+                        result = finished.result()
+                    except Exception as e:
+                        logger.warning(f"Model {attempt.model} failed for {task}: {e!r}")
+                        error = e
+                        continue
+                    if result.status_code == 200:
+                        if attempt.hedge:
+                            self.hedge_wins += 1
+                        return result
+                    logger.warning(f"Model {attempt.model} returned {result.status_code} for {task}")
+                    response = result
+
+                # After a failure fail over instead of hedging
+                hedging = False
+                if not pending and waiting and deadline - time.monotonic() > Config.LLM_HEDGE_MIN_DELAY:
+                    self.failovers += 1
+                    launch(waiting.pop(0))
+        finally:
+            for loser in pending:
+                loser.cancel()
+
+        if response is not None:
+            return response
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model request counts, error counts and latency percentiles."""
+        return {
+            'models': {
+                model: {
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'rate_limited': stats.rate_limited,
+                    'p50': stats.percentile(0.5),
+                    'p95': stats.percentile(0.95),
+                    'available': stats.available
+                }
+                for model, stats in self._stats.items()
+            },
+            'failovers': self.failovers,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'timeouts': self.timeouts
+        }
+
+
+# Singleton instance
+model_router = ModelRouter()
@@ -0,0 +1,299 @@
+"""
+Row models for the service layer.
+Compact, frozen dataclasses that replace raw Supabase row dictionaries.
+slots=True needs Python 3.10, the minimum the bot supports; see
+benchmark_session_memory.py for what the slots save per exam session.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple
+
+_FRACTION = re.compile(r'\.(\d+)')
+_HOUR_OFFSET = re.compile(r'([+-]\d{2})$')
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a timestamp as returned by PostgREST into an aware datetime.
+    datetime.fromisoformat before Python 3.11 rejects a 'Z' suffix, '+00'
+    offsets and fractions that are not 3 or 6 digits, all of which Postgres
+    can produce. Timestamps without an offset are taken as UTC.
+    """
+    text = value.strip().replace('Z', '+00:00')
+    text = _FRACTION.sub(lambda match: '.' + match.group(1)[:6].ljust(6, '0'), text, count=1)
+    text = _HOUR_OFFSET.sub(r'\1:00', text)
+    parsed = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class User:
+    """A registered student."""
+    id: int
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    current_level: str = 'A1'
+    preferred_lang: str = 'english'
+    subscription_expiry: Optional[str] = None
+    created_at: Optional[str] = None
+    last_active: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'User':
+        """Build a user from a `users` table row."""
+        return cls(
+            row['id'],
+            row.get('username'),
+            row.get('first_name'),
+            row.get('last_name'),
+            row.get('current_level') or 'A1',
+            row.get('preferred_lang') or 'english',
+            row.get('subscription_expiry'),
+            row.get('created_at'),
+            row.get('last_active')
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ExamQuestion:
+    """A single exam question, either stored or AI-generated."""
+    id: str
+    level: str
+    exam_type: str
+    question_text: str = ''
+    question_data: Optional[Dict[str, Any]] = None
+    correct_answer: str = ''
+    difficulty: int = 5
+    generated: bool = False
+    irt_difficulty: Optional[float] = None
+    irt_responses: int = 0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'ExamQuestion':
+        """Build a question from an `exam_questions` table row."""
+        return cls(
+            str(row['id']),
+            row.get('level', ''),
+            row.get('exam_type', ''),
+            row.get('question_text') or '',
+            row.get('question_data') or {},
+            row.get('correct_answer') or '',
+            row.get('difficulty') or 5,
+            row.get('generated', False),
+            row.get('irt_difficulty'),
+            row.get('irt_responses') or 0
+        )
+
+    @property
+    def logit_difficulty(self) -> float:
+        """Difficulty in logits: the calibrated estimate, or seeded from the 1-10 rating."""
+        if self.irt_difficulty is not None:
+            return self.irt_difficulty
+        return (self.difficulty - 5.5) / 1.5
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Question payload (passage, options, hints, ...)."""
+        return self.question_data or {}
+
+    @property
+    def prompt(self) -> str:
+        """Task text, falling back to the payload for generated prompts."""
+        return self.question_text or self.data.get('question_text', '')
+
+    @property
+    def topic(self) -> str:
+        """Topic used for weak area tracking."""
+        return self.data.get('topic') or self.exam_type
+
+
+@dataclass(frozen=True, slots=True)
+class SpeechMetrics:
+    """Fluency measurements computed from ASR word timestamps."""
+    duration: float
+    word_count: int
+    words_per_minute: float
+    articulation_rate: float
+    pause_count: int = 0
+    long_pause_count: int = 0
+    mean_pause: float = 0
+    max_pause: float = 0
+    pause_ratio: float = 0
+    mean_confidence: float = 0
+    low_confidence_words: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SpeechMetrics':
+        """Build metrics from their JSON form."""
+        return cls(
+            float(data.get('duration') or 0),
+            int(data.get('word_count') or 0),
+            float(data.get('words_per_minute') or 0),
+            float(data.get('articulation_rate') or 0),
+            int(data.get('pause_count') or 0),
+            int(data.get('long_pause_count') or 0),
+            float(data.get('mean_pause') or 0),
+            float(data.get('max_pause') or 0),
+            float(data.get('pause_ratio') or 0),
+            float(data.get('mean_confidence') or 0),
+            tuple(data.get('low_confidence_words') or ())
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for JSON storage."""
+        return {
+            'duration': self.duration,
+            'word_count': self.word_count,
+            'words_per_minute': self.words_per_minute,
+            'articulation_rate': self.articulation_rate,
+            'pause_count': self.pause_count,
+            'long_pause_count': self.long_pause_count,
+            'mean_pause': self.mean_pause,
+            'max_pause': self.max_pause,
+            'pause_ratio': self.pause_ratio,
+            'mean_confidence': self.mean_confidence,
+            'low_confidence_words': list(self.low_confidence_words)
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Transcript:
+    """Transcribed speech, with fluency metrics when word timestamps were requested."""
+    text: str
+    metrics: Optional[SpeechMetrics] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Evaluation:
+    """AI evaluation of a writing or speaking submission."""
+    scores: Dict[str, float]
+    overall_score: float = 0
+    mistakes: Tuple[Dict[str, str], ...] = ()
+    strengths: Tuple[str, ...] = ()
+    suggestions: Tuple[str, ...] = ()
+    corrected_text: str = ''
+    pronunciation_tips: Tuple[str, ...] = ()
+    speech_metrics: Optional[SpeechMetrics] = None
+    failed: bool = False  # placeholder returned when the examiner could not be reached
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Evaluation':
+        """Build an evaluation from the examiner's JSON response."""
+        metrics = data.get('speech_metrics')
+        return cls(
+            dict(data.get('scores') or {}),
+            float(data.get('overall_score') or 0),
+            tuple(m for m in data.get('mistakes') or () if isinstance(m, dict)),
+            tuple(data.get('strengths') or ()),
+            tuple(data.get('suggestions') or ()),
+            data.get('corrected_text') or '',
+            tuple(data.get('pronunciation_tips') or ()),
+            SpeechMetrics.from_dict(metrics) if isinstance(metrics, dict) else None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for JSON storage."""
+        result = {
+            'scores': self.scores,
+            'overall_score': self.overall_score,
+            'mistakes': list(self.mistakes),
+            'strengths': list(self.strengths),
+            'suggestions': list(self.suggestions),
+            'corrected_text': self.corrected_text,
+            'pronunciation_tips': list(self.pronunciation_tips)
+        }
+        if self.speech_metrics is not None:
+            result['speech_metrics'] = self.speech_metrics.to_dict()
+        return result
+
+
+@dataclass(frozen=True, slots=True)
+class Answer:
+    """A student's answer to one exam question."""
+    question_id: Optional[str]
+    user_answer: str
+    correct_answer: str = ''
+    is_correct: bool = False
+    topic: Optional[str] = None
+    evaluation: Optional[Evaluation] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the `exam_attempts.answers` JSON column."""
+        if self.evaluation is not None:
+            return {
+                'question_id': self.question_id,
+                'user_response': self.user_answer,
+                'evaluation': self.evaluation.to_dict()
+            }
+        return {
+            'question_id': self.question_id,
+            'user_answer': self.user_answer,
+            'correct_answer': self.correct_answer,
+            'is_correct': self.is_correct,
+            'topic': self.topic
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressEntry:
+    """A single completed learning activity."""
+    id: Optional[str]
+    user_id: int
+    skill: str
+    activity_type: Optional[str] = None
+    score: float = 0
+    weak_areas: Tuple[str, ...] = ()
+    completed_at: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'ProgressEntry':
+        """Build an entry from a `user_progress` table row."""
+        return cls(
+            row.get('id'),
+            row['user_id'],
+            row.get('skill') or 'unknown',
+            row.get('activity_type'),
+            float(row.get('score') or 0),
+            tuple(row.get('weak_areas') or ()),
+            row.get('completed_at')
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VocabularyCard:
+    """Spaced-repetition state of one word for one user (SM-2)."""
+    word: str
+    level: str
+    ease: float = 2.5
+    interval_days: float = 0
+    repetitions: int = 0
+    lapses: int = 0
+    due_at: float = 0  # UNIX timestamp
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'VocabularyCard':
+        """Build a card from a `vocabulary_cards` table row."""
+        return cls(
+            row['word'],
+            row.get('level') or '',
+            float(row.get('ease') or 2.5),
+            float(row.get('interval_days') or 0),
+            row.get('repetitions') or 0,
+            row.get('lapses') or 0,
+            parse_timestamp(row['due_at']).timestamp() if row.get('due_at') else 0
+        )
+
+    def to_row(self, user_id: int) -> Dict[str, Any]:
+        """Row for upserting into `vocabulary_cards`."""
+        return {
+            'user_id': user_id,
+            'word': self.word,
+            'level': self.level,
+            'ease': self.ease,
+            'interval_days': self.interval_days,
+            'repetitions': self.repetitions,
+            'lapses': self.lapses,
+            'due_at': datetime.fromtimestamp(self.due_at, timezone.utc).isoformat()
+        }
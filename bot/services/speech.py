@@ -1,58 +1,202 @@
 """
 Speech processing service using faster-whisper for voice transcription.
 """
-import os
+import io
+import json
+import time
+import asyncio
 import logging
-import tempfile
-from typing import Optional
-from pathlib import Path
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, BinaryIO, Any, List, Dict, Callable, Awaitable
+
+from bot.config import Config
+from bot.services.models import SpeechMetrics, Transcript
+from bot.services.transcript_cache import TranscriptCache
+from bot.services.speech_worker import (
+    write_request, read_frame,
+    ENCODING_COMPRESSED, ENCODING_PCM_F32, FLAG_WORD_TIMESTAMPS,
+    FRAME_PARTIAL, FRAME_ERROR, FRAME_METRICS
+)
 
 logger = logging.getLogger(__name__)
 
 # Try to import faster-whisper
 WHISPER_AVAILABLE = False
 try:
-    from faster_whisper import WhisperModel
+    import numpy as np
+    from faster_whisper import WhisperModel, decode_audio
     WHISPER_AVAILABLE = True
 except ImportError:
     logger.warning("faster-whisper not available. Voice transcription will be disabled.")
 
+# Batched pipeline is only available in newer faster-whisper releases
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
 
 class SpeechService:
     """Service for speech-to-text transcription."""
     
-    def __init__(self):
+    # Whisper models expect 16 kHz mono audio
+    SAMPLE_RATE = 16000
+    
+    # Quality tiers from fastest to most accurate (see Config.SPEECH_TIERS)
+    TIER_ORDER = ['fast', 'standard', 'accurate']
+    
+    def __init__(self, worker_sockets: Optional[List[str]] = None):
         self.model = None
-        self.model_size = "base"  # Options: tiny, base, small, medium, large
+        self.model_size = Config.SPEECH_TIERS['standard']['model_size']
+        
+        # Standalone worker processes; the models are only loaded here without them
+        self.worker_sockets = list(Config.SPEECH_WORKER_SOCKETS if worker_sockets is None else worker_sockets)
+        self._worker_load: Dict[str, int] = {path: 0 for path in self.worker_sockets}
+        
+        # Loaded models and batched pipelines per model size
+        self._models: Dict[str, Any] = {}
+        self._pipelines: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        self._pending = 0
         
-        if WHISPER_AVAILABLE:
+        self.cache: Optional[TranscriptCache] = None
+        if Config.TRANSCRIPT_CACHE_ENABLED:
             try:
-                # Use CPU for compatibility, can change to "cuda" for GPU
-                self.model = WhisperModel(
-                    self.model_size,
-                    device="cpu",
-                    compute_type="int8"
-                )
-                logger.info(f"Whisper model '{self.model_size}' loaded successfully")
+                self.cache = TranscriptCache()
+            except Exception as e:
+                logger.error(f"Transcript cache disabled: {e}")
+        
+        # Clips waiting for a worker thread (dispatcher started lazily inside the event loop)
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.WHISPER_WORKERS,
+            thread_name_prefix='whisper'
+        )
+        
+        if self.worker_sockets:
+            logger.info(f"Forwarding transcription to {len(self.worker_sockets)} speech worker(s)")
+        elif WHISPER_AVAILABLE:
+            try:
+                # Other tiers' models are loaded on first use
+                self.model = self._get_model(self.model_size)
             except Exception as e:
                 logger.error(f"Failed to load Whisper model: {e}")
     
     @property
     def is_available(self) -> bool:
         """Check if speech transcription is available."""
-        return self.model is not None
+        return self.model is not None or bool(self.worker_sockets)
+    
+    def _get_model(self, model_size: str) -> Any:
+        """Get a loaded Whisper model, loading it on first use."""
+        with self._models_lock:
+            model = self._models.get(model_size)
+            if model is None:
+                model = WhisperModel(
+                    model_size,
+                    device=Config.WHISPER_DEVICE,
+                    compute_type=Config.WHISPER_COMPUTE_TYPE,
+                    cpu_threads=Config.WHISPER_CPU_THREADS,
+                    num_workers=Config.WHISPER_WORKERS
+                )
+                self._models[model_size] = model
+                if BatchedInferencePipeline is not None:
+                    self._pipelines[model_size] = BatchedInferencePipeline(model=model)
+                logger.info(f"Whisper model '{model_size}' loaded successfully")
+            return model
+    
+    def _effective_tier(self, tier: str) -> str:
+        """Downgrade the requested tier while the transcription queue is long."""
+        if tier not in self.TIER_ORDER:
+            tier = 'standard'
+        
+        threshold = Config.WHISPER_DOWNGRADE_QUEUE
+        if threshold <= 0 or self._pending < threshold:
+            return tier
+        
+        steps = 1 if self._pending < threshold * 2 else len(self.TIER_ORDER)
+        downgraded = self.TIER_ORDER[max(0, self.TIER_ORDER.index(tier) - steps)]
+        if downgraded != tier:
+            logger.info(f"Transcription queue at {self._pending}, using '{downgraded}' instead of '{tier}'")
+        return downgraded
+    
+    def decode_voice(self, data: Union[bytes, bytearray]) -> Any:
+        """
+        Decode an encoded voice note (OGG/Opus, MP3, ...) in memory.
+        
+        Returns:
+            16 kHz mono float32 NumPy array
+        """
+        return decode_audio(io.BytesIO(data), sampling_rate=self.SAMPLE_RATE)
+    
+    def trim_silence(self, samples: Any) -> Optional[Any]:
+        """
+        Energy-based voice activity pre-pass on decoded 16 kHz samples.
+        Trims leading/trailing silence (keeping a little padding) so the model
+        sees less audio.
+        
+        Returns:
+            A view of the voiced region, or None if the clip has no speech
+        """
+        frame = int(self.SAMPLE_RATE * Config.VAD_FRAME_MS / 1000)
+        count = len(samples) // frame
+        if count == 0:
+            return None
+        
+        # Per-frame RMS without materializing a squared copy of the clip
+        frames = samples[:count * frame].reshape(count, frame)
+        rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame)
+        
+        # Adapt to the clip's background noise, but never below an absolute floor;
+        # capped at half the peak so clips without pauses are not rejected
+        noise_threshold = min(float(np.percentile(rms, 10)) * Config.VAD_NOISE_RATIO, float(rms.max()) * 0.5)
+        threshold = max(Config.VAD_MIN_RMS, noise_threshold)
+        voiced = np.flatnonzero(rms > threshold)
+        
+        if len(voiced) * Config.VAD_FRAME_MS < Config.VAD_MIN_SPEECH_MS:
+            return None
+        
+        padding = int(self.SAMPLE_RATE * Config.VAD_PADDING_MS / 1000)
+        start = max(0, voiced[0] * frame - padding)
+        end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+        
+        trimmed = (len(samples) - (end - start)) / self.SAMPLE_RATE
+        if trimmed > 0:
+            logger.info(f"VAD trimmed {trimmed:.1f}s of silence")
+        return samples[start:end]
+    
+    def prepare_voice(self, data: Union[bytes, bytearray]) -> Optional[Any]:
+        """
+        Decode a voice note and trim its silence (if VAD is enabled).
+        
+        Returns:
+            16 kHz float32 samples, or None if the clip has no speech
+        """
+        audio = self.decode_voice(data)
+        if Config.VAD_ENABLED:
+            return self.trim_silence(audio)
+        return audio
+    
+    async def prepare_voice_async(self, data: Union[bytes, bytearray]) -> Optional[Any]:
+        """prepare_voice on the worker threads; decoding and VAD are CPU-bound."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.prepare_voice, data)
     
     async def transcribe_audio(
         self,
-        audio_path: str,
-        language: str = "de"
+        audio: Union[str, BinaryIO, Any],
+        language: str = "de",
+        tier: str = "standard"
     ) -> Optional[str]:
         """
-        Transcribe audio file to text.
+        Transcribe audio to text.
         
         Args:
-            audio_path: Path to audio file (OGG, WAV, MP3)
+            audio: Path to an audio file, a file-like object, or decoded 16 kHz float32 samples
             language: Language code (de for German)
+            tier: Quality tier ('fast', 'standard', 'accurate'), downgraded under load
         
         Returns:
             Transcribed text or None if failed
@@ -62,28 +206,280 @@ class SpeechService:
             return None
         
         try:
-            # Transcribe with German language hint
-            segments, info = self.model.transcribe(
-                audio_path,
+            tier = self._effective_tier(tier)
+            if not self.worker_sockets:
+                transcript = await self.transcribe_samples(audio, language, tier)
+            elif isinstance(audio, str):
+                with open(audio, 'rb') as f:
+                    transcript = await self._transcribe_remote(f.read(), ENCODING_COMPRESSED, language, tier)
+            elif hasattr(audio, 'read'):
+                transcript = await self._transcribe_remote(audio.read(), ENCODING_COMPRESSED, language, tier)
+            else:
+                transcript = await self._transcribe_remote(
+                    audio.astype('<f4').tobytes(), ENCODING_PCM_F32, language, tier
+                )
+            return transcript.text
+        except Exception as e:
+            logger.error(f"Error transcribing audio: {e}")
+            return None
+    
+    async def transcribe_samples(
+        self,
+        audio: Union[str, BinaryIO, Any],
+        language: str,
+        tier: str,
+        on_partial: Optional[Callable[[str], Awaitable[Any]]] = None,
+        word_timestamps: bool = False
+    ) -> Transcript:
+        """
+        Queue a clip for the worker threads and wait for its transcription.
+        If on_partial is given, it is awaited with the text decoded so far
+        as segments arrive (at most once per PARTIAL_TRANSCRIPT_INTERVAL).
+        With word_timestamps, the transcript carries fluency metrics.
+        """
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = asyncio.Queue()
+            self._dispatcher = asyncio.create_task(self._run_dispatcher())
+        
+        loop = asyncio.get_running_loop()
+        updates: List[Any] = []
+        on_segment = self._partial_callback(loop, on_partial, updates) if on_partial else None
+        
+        future = loop.create_future()
+        await self._queue.put((audio, language, tier, on_segment, word_timestamps, future))
+        self._pending += 1
+        try:
+            transcription = await future
+        finally:
+            self._pending -= 1
+        
+        # Let partial updates land before the caller shows the final text
+        if updates:
+            await asyncio.gather(*(asyncio.wrap_future(u) for u in updates), return_exceptions=True)
+        
+        logger.info(f"Transcribed audio: {transcription.text[:100]}...")
+        return transcription
+    
+    async def _transcribe_remote(
+        self,
+        payload: bytes,
+        encoding: int,
+        language: str,
+        tier: str,
+        on_partial: Optional[Callable[[str], Awaitable[Any]]] = None,
+        word_timestamps: bool = False
+    ) -> Transcript:
+        """
+        Send a clip to the least busy speech worker and wait for its transcription.
+        Partial transcripts streamed by the worker are passed to on_partial.
+        """
+        socket_path = min(self.worker_sockets, key=self._worker_load.__getitem__)
+        self._worker_load[socket_path] += 1
+        self._pending += 1
+        try:
+            transcript = await asyncio.wait_for(
+                self._worker_request(socket_path, payload, encoding, language, tier, on_partial, word_timestamps),
+                Config.SPEECH_WORKER_TIMEOUT
+            )
+        finally:
+            self._worker_load[socket_path] -= 1
+            self._pending -= 1
+        
+        logger.info(f"Transcribed audio: {transcript.text[:100]}...")
+        return transcript
+    
+    async def _worker_request(
+        self,
+        socket_path: str,
+        payload: bytes,
+        encoding: int,
+        language: str,
+        tier: str,
+        on_partial: Optional[Callable[[str], Awaitable[Any]]],
+        word_timestamps: bool
+    ) -> Transcript:
+        """Run one request/response exchange with a speech worker."""
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        try:
+            flags = FLAG_WORD_TIMESTAMPS if word_timestamps else 0
+            await write_request(writer, payload, encoding, language, tier, flags)
+            metrics = None
+            while True:
+                kind, text = await read_frame(reader)
+                if kind == FRAME_ERROR:
+                    raise RuntimeError(f"Speech worker {socket_path} failed: {text}")
+                if kind == FRAME_METRICS:
+                    metrics = SpeechMetrics.from_dict(json.loads(text))
+                    continue
+                if kind != FRAME_PARTIAL:
+                    return Transcript(text, metrics)
+                if on_partial:
+                    try:
+                        await on_partial(text)
+                    except Exception as e:
+                        logger.debug(f"Partial transcript update failed: {e}")
+        finally:
+            writer.close()
+    
+    def _partial_callback(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_partial: Callable[[str], Awaitable[Any]],
+        updates: List[Any]
+    ) -> Callable[[str], None]:
+        """Wrap an async partial-text callback so worker threads can call it, throttled."""
+        last_sent = 0.0
+        
+        async def deliver(text: str) -> None:
+            try:
+                await on_partial(text)
+            except Exception as e:
+                logger.debug(f"Partial transcript update failed: {e}")
+        
+        def on_segment(text: str) -> None:
+            nonlocal last_sent
+            now = time.monotonic()
+            if now - last_sent < Config.PARTIAL_TRANSCRIPT_INTERVAL:
+                return
+            last_sent = now
+            updates.append(asyncio.run_coroutine_threadsafe(deliver(text), loop))
+        
+        return on_segment
+    
+    def _transcribe_sync(
+        self,
+        audio: Union[str, BinaryIO, Any],
+        language: str,
+        tier: str,
+        on_segment: Optional[Callable[[str], None]] = None,
+        word_timestamps: bool = False
+    ) -> Transcript:
+        """Run Whisper on one clip (called from the worker threads)."""
+        settings = Config.SPEECH_TIERS[tier]
+        model = self._get_model(settings['model_size'])
+        pipeline = self._pipelines.get(settings['model_size'])
+        
+        if pipeline is not None:
+            # Decodes the clip's speech chunks in batches
+            segments, info = pipeline.transcribe(
+                audio,
                 language=language,
-                beam_size=5,
-                vad_filter=True  # Filter out non-speech
+                beam_size=settings['beam_size'],
+                batch_size=Config.WHISPER_BATCH_SIZE,
+                word_timestamps=word_timestamps
+            )
+        else:
+            segments, info = model.transcribe(
+                audio,
+                language=language,
+                beam_size=settings['beam_size'],
+                vad_filter=True,  # Filter out non-speech
+                word_timestamps=word_timestamps
             )
-            
-            # Combine all segments
-            transcription = " ".join(segment.text for segment in segments)
-            
-            logger.info(f"Transcribed audio: {transcription[:100]}...")
-            return transcription.strip()
         
-        except Exception as e:
-            logger.error(f"Error transcribing audio: {e}")
+        # Segments are decoded lazily, so join them here in the worker thread
+        parts = []
+        words = []
+        for segment in segments:
+            parts.append(segment.text.strip())
+            if word_timestamps and segment.words:
+                words.extend(segment.words)
+            if on_segment:
+                on_segment(" ".join(parts))
+        
+        metrics = self.speech_metrics(words) if word_timestamps else None
+        return Transcript(" ".join(parts).strip(), metrics)
+    
+    @staticmethod
+    def speech_metrics(words: List[Any]) -> Optional[SpeechMetrics]:
+        """
+        Compute fluency measurements from Whisper word timings.
+        
+        Args:
+            words: Word objects with start, end (seconds), word and probability
+        
+        Returns:
+            SpeechMetrics, or None if fewer than two words were recognized
+        """
+        if len(words) < 2:
+            return None
+        
+        timings = np.array([(w.start, w.end, w.probability) for w in words], dtype=np.float64)
+        starts, ends, probabilities = timings.T
+        
+        duration = float(ends[-1] - starts[0])
+        if duration <= 0:
             return None
+        
+        # Silence between consecutive words; short gaps are normal articulation
+        gaps = starts[1:] - ends[:-1]
+        pauses = gaps[gaps >= Config.SPEECH_PAUSE_MIN_SEC]
+        pause_time = float(pauses.sum())
+        speaking_time = max(duration - pause_time, 1e-6)
+        
+        unclear = np.flatnonzero(probabilities < Config.SPEECH_LOW_CONFIDENCE)
+        low_confidence = tuple(dict.fromkeys(words[i].word.strip() for i in unclear))
+        
+        return SpeechMetrics(
+            duration=round(duration, 2),
+            word_count=len(words),
+            words_per_minute=round(len(words) / duration * 60, 1),
+            articulation_rate=round(len(words) / speaking_time * 60, 1),
+            pause_count=int(pauses.size),
+            long_pause_count=int(np.count_nonzero(pauses >= Config.SPEECH_LONG_PAUSE_SEC)),
+            mean_pause=round(float(pauses.mean()), 2) if pauses.size else 0.0,
+            max_pause=round(float(pauses.max()), 2) if pauses.size else 0.0,
+            pause_ratio=round(pause_time / duration, 3),
+            mean_confidence=round(float(probabilities.mean()), 3),
+            low_confidence_words=low_confidence[:10]
+        )
+    
+    async def _run_dispatcher(self) -> None:
+        """
+        Hand queued clips to the worker threads as soon as one is free. Each
+        request's future is resolved when its own transcription finishes, so a
+        long clip never holds up shorter ones queued after it.
+
+        Clips are not batched across requests: faster-whisper transcribes one
+        audio stream per call (BatchedInferencePipeline batches the 30 s chunks
+        of a single clip), and sharing a forward pass between clips would mean
+        driving CTranslate2 directly, without streamed segments or word
+        timestamps. A collection window only added latency; concurrency comes
+        from the WHISPER_WORKERS threads (see benchmark_speech_concurrency.py).
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(Config.WHISPER_WORKERS)
+        
+        while True:
+            await slots.acquire()
+            *request, future = await self._queue.get()
+            if future.done():
+                # Caller gave up while the clip was queued
+                slots.release()
+                continue
+            
+            job = loop.run_in_executor(self._executor, self._transcribe_sync, *request)
+            job.add_done_callback(functools.partial(self._resolve, future, slots))
+    
+    @staticmethod
+    def _resolve(future: asyncio.Future, slots: asyncio.Semaphore, job: asyncio.Future) -> None:
+        """Pass a finished transcription to its caller and free its worker slot."""
+        slots.release()
+        if future.done():
+            return
+        if job.cancelled():
+            future.cancel()
+        elif job.exception() is not None:
+            future.set_exception(job.exception())
+        else:
+            future.set_result(job.result())
     
     async def transcribe_telegram_voice(
         self,
         voice_file,
-        bot
+        bot,
+        tier: str = "standard",
+        on_partial: Optional[Callable[[str], Awaitable[Any]]] = None
     ) -> Optional[str]:
         """
         Transcribe a Telegram voice message.
@@ -91,41 +487,96 @@ class SpeechService:
         Args:
             voice_file: Telegram Voice or Audio object
             bot: Telegram Bot instance for downloading
+            tier: Quality tier ('fast' for conversation, 'accurate' for graded exams)
+            on_partial: Optional coroutine called with the partial transcript while decoding
         
         Returns:
             Transcribed text or None
         """
+        transcript = await self._transcribe_voice(voice_file, bot, tier, on_partial, word_timestamps=False)
+        return transcript.text if transcript else None
+    
+    async def transcribe_speech(
+        self,
+        voice_file,
+        bot,
+        tier: str = "accurate",
+        on_partial: Optional[Callable[[str], Awaitable[Any]]] = None
+    ) -> Optional[Transcript]:
+        """
+        Transcribe a Telegram voice message with word timestamps and compute
+        fluency metrics (speech rate, pauses, unclear words) for grading.
+        
+        Returns:
+            Transcript (metrics may be None for very short answers) or None
+        """
+        return await self._transcribe_voice(voice_file, bot, tier, on_partial, word_timestamps=True)
+    
+    async def _transcribe_voice(
+        self,
+        voice_file,
+        bot,
+        tier: str,
+        on_partial: Optional[Callable[[str], Awaitable[Any]]],
+        word_timestamps: bool
+    ) -> Optional[Transcript]:
+        """Download, transcribe and cache a Telegram voice message."""
         if not self.is_available:
             return None
         
-        temp_path = None
+        if tier not in self.TIER_ORDER:
+            tier = 'standard'
+        cache_key = getattr(voice_file, 'file_unique_id', None)
+        
         try:
-            # Download voice file
+            # Resent/forwarded notes: a transcript from this tier or a better one will do
+            if self.cache and cache_key:
+                cached = self.cache.get(
+                    cache_key,
+                    self.TIER_ORDER[self.TIER_ORDER.index(tier):],
+                    with_metrics=word_timestamps
+                )
+                if cached is not None:
+                    logger.info(f"Transcript cache hit for {cache_key} (hit rate {self.cache.stats()['hit_rate']:.0%})")
+                    return cached
+            
+            # Download into memory and decode without touching the disk
             file = await bot.get_file(voice_file.file_id)
+            data = await file.download_as_bytearray()
+            used_tier = self._effective_tier(tier)
             
-            # Create temp file for the audio
-            with tempfile.NamedTemporaryFile(suffix='.ogg', delete=False) as temp:
-                temp_path = temp.name
+            if self.worker_sockets:
+                # The worker decodes and trims the compressed note itself
+                transcript = await self._transcribe_remote(
+                    bytes(data), ENCODING_COMPRESSED, "de", used_tier, on_partial, word_timestamps
+                )
+            else:
+                audio = await self.prepare_voice_async(data)
+                transcript = None
+                if audio is not None:
+                    transcript = await self.transcribe_samples(audio, "de", used_tier, on_partial, word_timestamps)
             
-            # Download to temp file
-            await file.download_to_drive(temp_path)
+            if transcript is None or not transcript.text:
+                logger.info(f"No speech detected in voice message {cache_key}")
+                return None
             
-            # Transcribe
-            transcription = await self.transcribe_audio(temp_path)
+            if self.cache and cache_key:
+                self.cache.put(cache_key, used_tier, transcript)
             
-            return transcription
+            return transcript
         
         except Exception as e:
             logger.error(f"Error processing Telegram voice: {e}")
             return None
-        
-        finally:
-            # Cleanup temp file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue and transcript cache metrics."""
+        return {
+            'pending': self._pending,
+            'workers': dict(self._worker_load),
+            'models_loaded': list(self._models),
+            'cache': self.cache.stats() if self.cache else None
+        }
     
     def get_status_message(self) -> str:
         """Get status message about speech service availability."""
@@ -135,5 +586,16 @@ class SpeechService:
             return "Voice transcription is currently unavailable. Please type your responses."
 
 
-# Singleton instance
-speech_service = SpeechService()
+# Singleton instance, created on first use so that importing SpeechService
+# (the speech worker builds its own) loads no model
+_speech_service: Optional[SpeechService] = None
+
+
+def __getattr__(name: str) -> Any:
+    """Module attribute hook providing speech_service."""
+    global _speech_service
+    if name != 'speech_service':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _speech_service is None:
+        _speech_service = SpeechService()
+    return _speech_service
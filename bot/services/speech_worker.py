@@ -0,0 +1,202 @@
+"""
+Standalone speech-to-text worker process.
+Keeps the Whisper models (memory, CPU, CTranslate2 crashes) out of the bot process.
+The bot's SpeechService talks to one or more workers over Unix sockets.
+
+Usage:
+    python -m bot.services.speech_worker --socket /tmp/ethiogerman-speech-0.sock
+
+Run one worker per socket listed in SPEECH_WORKER_SOCKETS (comma separated);
+the bot sends each voice message to the least busy worker.
+
+Protocol (one request per connection, big-endian):
+    request:  magic "EGSW", version, tier, encoding, flags, language length (5 x uint8),
+              payload length (uint32), language (ASCII), payload
+    response: frames of type (uint8) + length (uint32) + UTF-8 text;
+              zero or more PARTIAL frames, a METRICS frame (JSON) if word timestamps
+              were requested, then one FINAL or ERROR frame
+Payloads are either the encoded voice note as downloaded from Telegram
+(decoded and silence-trimmed in the worker) or raw 16 kHz float32 PCM.
+"""
+import os
+import json
+import asyncio
+import struct
+import logging
+import argparse
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EGSW'
+VERSION = 2
+
+REQUEST_HEADER = struct.Struct('!4sBBBBBI')
+FRAME_HEADER = struct.Struct('!BI')
+
+# Payload encodings
+ENCODING_COMPRESSED = 0  # OGG/Opus, MP3, ... as sent by Telegram
+ENCODING_PCM_F32 = 1  # 16 kHz mono little-endian float32 samples
+
+# Request flags
+FLAG_WORD_TIMESTAMPS = 1  # compute fluency metrics from word timestamps
+
+# Response frame types
+FRAME_PARTIAL = 1
+FRAME_FINAL = 2
+FRAME_ERROR = 3
+FRAME_METRICS = 4
+
+# Wire order of quality tiers (matches SpeechService.TIER_ORDER)
+TIERS = ('fast', 'standard', 'accurate')
+
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+
+
+async def write_request(
+    writer: asyncio.StreamWriter,
+    payload: bytes,
+    encoding: int,
+    language: str,
+    tier: str,
+    flags: int = 0
+) -> None:
+    """Send one transcription request."""
+    lang = language.encode('ascii')
+    writer.write(REQUEST_HEADER.pack(
+        MAGIC, VERSION, TIERS.index(tier), encoding, flags, len(lang), len(payload)
+    ))
+    writer.write(lang)
+    writer.write(payload)
+    await writer.drain()
+
+
+async def read_request(reader: asyncio.StreamReader) -> Tuple[bytes, int, str, str, int]:
+    """
+    Read one transcription request.
+
+    Returns:
+        (payload, encoding, language, tier, flags)
+    """
+    magic, version, tier, encoding, flags, lang_length, payload_length = REQUEST_HEADER.unpack(
+        await reader.readexactly(REQUEST_HEADER.size)
+    )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported request (magic={magic!r}, version={version})")
+    if tier >= len(TIERS) or encoding not in (ENCODING_COMPRESSED, ENCODING_PCM_F32):
+        raise ValueError(f"Invalid tier {tier} or encoding {encoding}")
+    if payload_length > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Payload of {payload_length} bytes is too large")
+
+    language = (await reader.readexactly(lang_length)).decode('ascii')
+    payload = await reader.readexactly(payload_length)
+    return payload, encoding, language, TIERS[tier], flags
+
+
+def write_frame(writer: asyncio.StreamWriter, kind: int, text: str) -> None:
+    """Queue one response frame."""
+    data = text.encode('utf-8')
+    writer.write(FRAME_HEADER.pack(kind, len(data)))
+    writer.write(data)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, str]:
+    """
+    Read one response frame.
+
+    Returns:
+        (frame type, text)
+    """
+    kind, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return kind, (await reader.readexactly(length)).decode('utf-8')
+
+
+async def handle_client(service, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Transcribe one request, streaming partial transcripts back to the bot."""
+    try:
+        payload, encoding, language, tier, flags = await read_request(reader)
+
+        if encoding == ENCODING_PCM_F32:
+            import numpy as np
+            audio = np.frombuffer(payload, dtype='<f4')
+        else:
+            audio = await service.prepare_voice_async(payload)
+
+        if audio is None:
+            # No speech in the clip
+            text = ''
+        else:
+            async def on_partial(partial: str) -> None:
+                write_frame(writer, FRAME_PARTIAL, partial)
+                await writer.drain()
+
+            transcript = await service.transcribe_samples(
+                audio, language, tier, on_partial, word_timestamps=bool(flags & FLAG_WORD_TIMESTAMPS)
+            )
+            text = transcript.text
+            if transcript.metrics is not None:
+                write_frame(writer, FRAME_METRICS, json.dumps(transcript.metrics.to_dict()))
+
+        write_frame(writer, FRAME_FINAL, text)
+
+    except asyncio.IncompleteReadError:
+        logger.warning("Client disconnected mid-request")
+        writer.close()
+        return
+    except Exception as e:
+        logger.error(f"Error handling transcription request: {e}")
+        write_frame(writer, FRAME_ERROR, str(e))
+
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str) -> None:
+    """Load the models and serve transcription requests on a Unix socket."""
+    from bot.services.speech import SpeechService
+
+    # Transcribe locally even when SPEECH_WORKER_SOCKETS (meant for the bot) is set
+    service = SpeechService(worker_sockets=[])
+    if not service.is_available:
+        raise SystemExit("Whisper model not available; install faster-whisper to run a speech worker.")
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_client(service, reader, writer),
+        path=socket_path
+    )
+    logger.info(f"Speech worker listening on {socket_path}")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main() -> None:
+    """Parse arguments and run the worker until interrupted."""
+    parser = argparse.ArgumentParser(description="EthioGerman speech-to-text worker")
+    parser.add_argument('--socket', required=True, help="Unix socket path to listen on")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        logger.info("Speech worker stopped")
+
+
+if __name__ == '__main__':
+    main()
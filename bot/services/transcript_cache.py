@@ -0,0 +1,108 @@
+"""
+On-disk cache of voice transcriptions keyed by Telegram's file_unique_id.
+Resent or forwarded voice notes and evaluation retries skip download and inference.
+"""
+import json
+import time
+import sqlite3
+import logging
+from typing import Optional, Iterable, Dict
+
+from bot.config import Config
+from bot.services.models import SpeechMetrics, Transcript
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """SQLite-backed transcript cache with TTL and size-bounded eviction."""
+
+    def __init__(
+        self,
+        path: str = Config.TRANSCRIPT_CACHE_PATH,
+        ttl_seconds: int = Config.TRANSCRIPT_CACHE_TTL,
+        max_entries: int = Config.TRANSCRIPT_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                file_unique_id TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                metrics TEXT,
+                PRIMARY KEY (file_unique_id, tier)
+            )
+        """)
+        try:
+            # Caches created before fluency metrics were stored
+            self._conn.execute("ALTER TABLE transcripts ADD COLUMN metrics TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_created ON transcripts(created_at)")
+        self._conn.commit()
+
+    def get(
+        self,
+        file_unique_id: str,
+        tiers: Iterable[str],
+        with_metrics: bool = False
+    ) -> Optional[Transcript]:
+        """
+        Get a cached transcript produced by any of the given tiers.
+
+        Args:
+            file_unique_id: Telegram file_unique_id of the voice note
+            tiers: Acceptable quality tiers, preferred first
+            with_metrics: Only accept transcripts stored with fluency metrics
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for tier in tiers:
+            row = self._conn.execute(
+                "SELECT text, metrics FROM transcripts WHERE file_unique_id = ? AND tier = ? AND created_at > ?"
+                + (" AND metrics IS NOT NULL" if with_metrics else ""),
+                (file_unique_id, tier, cutoff)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                metrics = SpeechMetrics.from_dict(json.loads(row[1])) if row[1] else None
+                return Transcript(row[0], metrics)
+
+        self.misses += 1
+        return None
+
+    def put(self, file_unique_id: str, tier: str, transcript: Transcript) -> None:
+        """Store a transcript and evict expired or excess entries."""
+        now = time.time()
+        metrics = json.dumps(transcript.metrics.to_dict()) if transcript.metrics else None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO transcripts (file_unique_id, tier, text, created_at, metrics) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (file_unique_id, tier, transcript.text, now, metrics)
+        )
+        self._conn.execute("DELETE FROM transcripts WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            """
+            DELETE FROM transcripts WHERE rowid IN (
+                SELECT rowid FROM transcripts ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss metrics since startup."""
+        lookups = self.hits + self.misses
+        entries = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
@@ -0,0 +1,210 @@
+"""
+Spaced-repetition vocabulary review.
+Words come from the bundled A1-B1 list, each student has an SM-2 card per word,
+and a per-user heap keyed by due time yields the next card to review in O(log n).
+Reviews need no AI calls.
+"""
+import csv
+import time
+import heapq
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from bot.config import Config
+from bot.services.database import db
+from bot.services.models import VocabularyCard
+
+logger = logging.getLogger(__name__)
+
+WORD_LIST_PATH = Path(__file__).parent.parent.parent / 'vocabulary' / 'a1_b1.tsv'
+
+DAY = 24 * 3600
+
+
+@dataclass(frozen=True, slots=True)
+class Word:
+    """An entry of the bundled word list."""
+    german: str
+    english: str
+    example: str
+    level: str
+
+
+def load_word_list(path: Path = WORD_LIST_PATH) -> Dict[str, Word]:
+    """Load the bundled word list, keyed by the German word, in list order."""
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            return {
+                row['german']: Word(row['german'], row['english'], row['example'], row['level'])
+                for row in csv.DictReader(f, delimiter='\t')
+            }
+    except Exception as e:
+        logger.error(f"Error loading word list {path}: {e}")
+        return {}
+
+
+def sm2(card: VocabularyCard, grade: int, now: float) -> VocabularyCard:
+    """Schedule the next review of a card after answering with grade 0-5 (SuperMemo 2)."""
+    ease = round(max(1.3, card.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02)), 3)
+
+    if grade < 3:
+        # Forgotten: start over and show it again shortly
+        return replace(
+            card,
+            ease=ease,
+            interval_days=0,
+            repetitions=0,
+            lapses=card.lapses + 1,
+            due_at=now + Config.VOCAB_RELEARN_MINUTES * 60
+        )
+
+    repetitions = card.repetitions + 1
+    if repetitions == 1:
+        interval = 1.0
+    elif repetitions == 2:
+        interval = 6.0
+    else:
+        interval = round(card.interval_days * card.ease, 1)
+
+    return replace(
+        card,
+        ease=ease,
+        interval_days=interval,
+        repetitions=repetitions,
+        due_at=now + interval * DAY
+    )
+
+
+class Deck:
+    """One user's cards with a heap of (due time, word) for the next due card."""
+
+    def __init__(self, cards: List[VocabularyCard]):
+        self.level: Optional[str] = None
+        self.cards: Dict[str, VocabularyCard] = {card.word: card for card in cards}
+        self._heap: List[Tuple[float, str]] = [(card.due_at, card.word) for card in cards]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def add(self, card: VocabularyCard) -> None:
+        """Insert or reschedule a card."""
+        self.cards[card.word] = card
+        heapq.heappush(self._heap, (card.due_at, card.word))
+
+        # Rescheduling leaves the old heap entry behind; rebuild once they pile up
+        if len(self._heap) > 2 * len(self.cards):
+            self._heap = [(c.due_at, c.word) for c in self.cards.values()]
+            heapq.heapify(self._heap)
+
+    def next_due(self, now: float) -> Optional[VocabularyCard]:
+        """The card due earliest, if it is due by `now`."""
+        heap = self._heap
+        while heap:
+            due_at, word = heap[0]
+            card = self.cards[word]
+            if card.due_at != due_at:
+                # Stale entry from before the card was rescheduled
+                heapq.heappop(heap)
+                continue
+            return card if due_at <= now else None
+        return None
+
+    def due_count(self, now: float) -> int:
+        """Number of cards due by `now`."""
+        return sum(1 for card in self.cards.values() if card.due_at <= now)
+
+
+class VocabularyScheduler:
+    """Per-user decks in an LRU cache, hydrated from the database on a miss."""
+
+    def __init__(self, max_users: int = Config.VOCAB_CACHE_SIZE, words: Optional[Dict[str, Word]] = None):
+        self.max_users = max_users
+        self.words = load_word_list() if words is None else words
+        self._decks: OrderedDict[int, Deck] = OrderedDict()
+
+    async def deck(self, user_id: int, level: str) -> Deck:
+        """
+        Get the user's deck, adding the words of their level they have not seen yet.
+
+        Returns:
+            The cached deck
+        """
+        deck = self._decks.get(user_id)
+        if deck is None:
+            deck = Deck(await db.get_vocabulary_cards(user_id))
+            self._decks[user_id] = deck
+            while len(self._decks) > self.max_users:
+                self._decks.popitem(last=False)
+        else:
+            self._decks.move_to_end(user_id)
+
+        if deck.level != level:
+            await self._add_new_words(user_id, deck, level)
+            deck.level = level
+        return deck
+
+    async def _add_new_words(self, user_id: int, deck: Deck, level: str) -> None:
+        """Bulk-load missing words up to the user's level, VOCAB_NEW_PER_DAY per day."""
+        levels = Config.CEFR_LEVELS[:Config.CEFR_LEVELS.index(level) + 1] if level in Config.CEFR_LEVELS else [level]
+        missing = [w for w in self.words.values() if w.level in levels and w.german not in deck.cards]
+        if not missing:
+            return
+
+        now = time.time()
+        unseen = sum(1 for card in deck.cards.values() if card.repetitions == 0 and card.lapses == 0)
+        cards = [
+            VocabularyCard(word.german, word.level, due_at=now + ((unseen + i) // Config.VOCAB_NEW_PER_DAY) * DAY)
+            for i, word in enumerate(missing)
+        ]
+        for card in cards:
+            deck.add(card)
+
+        await db.save_vocabulary_cards(user_id, cards, only_new=True)
+        logger.info(f"Added {len(cards)} {'/'.join(levels)} words to user {user_id}'s vocabulary deck")
+
+    async def next_card(self, user_id: int, level: str) -> Optional[Tuple[VocabularyCard, Word]]:
+        """
+        Get the next card due for review.
+
+        Returns:
+            (card, word) or None if nothing is due
+        """
+        deck = await self.deck(user_id, level)
+        card = deck.next_due(time.time())
+        if card is None:
+            return None
+        word = self.words.get(card.word)
+        if word is None:
+            # Dropped from the word list; park it far in the future
+            deck.add(replace(card, due_at=float('inf')))
+            return await self.next_card(user_id, level)
+        return card, word
+
+    async def due_count(self, user_id: int, level: str) -> int:
+        """Number of cards the user can review now."""
+        return (await self.deck(user_id, level)).due_count(time.time())
+
+    async def review(self, user_id: int, level: str, word: str, grade: int) -> Optional[VocabularyCard]:
+        """
+        Record an answer and reschedule the card.
+
+        Returns:
+            The updated card, or None if the user has no card for the word
+        """
+        deck = await self.deck(user_id, level)
+        card = deck.cards.get(word)
+        if card is None:
+            return None
+
+        card = sm2(card, grade, time.time())
+        deck.add(card)
+        await db.save_vocabulary_cards(user_id, [card])
+        return card
+
+
+# Singleton instance
+vocabulary_scheduler = VocabularyScheduler()
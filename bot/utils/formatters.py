@@ -4,6 +4,8 @@ Message formatting utilities for consistent bot responses.
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from bot.services.models import Evaluation
+
 
 class Formatters:
     """Utility class for formatting bot messages."""
@@ -142,6 +144,21 @@ Contact: @EthioGermanSchool
         
         return f"{header}{question_text}"
     
+    @staticmethod
+    def answer_feedback(is_correct: bool, explanation: str) -> str:
+        """Format answer feedback for Markdown messages (shown above the next question)."""
+        verdict = "*Richtig!*" if is_correct else "*Falsch.*"
+        if not explanation:
+            return verdict
+        return f"{verdict}\n{Formatters.escape_legacy_markdown(explanation)}"
+    
+    @staticmethod
+    def escape_legacy_markdown(text: str) -> str:
+        """Escape entity characters for Telegram's legacy Markdown (parse_mode='Markdown')."""
+        for char in ['_', '*', '`', '[']:
+            text = text.replace(char, f'\\{char}')
+        return text
+    
     @staticmethod
     def exam_results(
         exam_type: str,
@@ -183,14 +200,99 @@ Contact: @EthioGermanSchool
         return result
     
     @staticmethod
-    def writing_evaluation(evaluation: Dict[str, Any]) -> str:
+    def mock_exam_break(summary: str, section_num: int, total: int, next_section: str) -> str:
+        """Format the pause between two mock exam sections."""
+        return f"""{summary}
+
+*Next: Section {section_num}/{total} - {next_section.capitalize()}*
+
+Tap Continue when you are ready."""
+    
+    @staticmethod
+    def mock_exam_results(
+        section_scores: Dict[str, float],
+        score: float,
+        passed: bool,
+        weak_sections: List[str],
+        unevaluated: Optional[List[str]] = None,
+        skipped: Optional[List[str]] = None
+    ) -> str:
+        """Format the weighted report of a full mock exam."""
+        if skipped or unevaluated:
+            status = "INCOMPLETE"
+        else:
+            status = "PASSED" if passed else "NEEDS IMPROVEMENT"
+        
+        result = f"""
+*Full Mock Exam Results*
+
+*Overall Score:* {score:.1f}% (weighted)
+*Status:* {status}
+
+*Sections:*
+"""
+        for section, section_score in section_scores.items():
+            result += f"- {section.capitalize()}: {section_score:.0f}%\n"
+        for section in unevaluated or []:
+            result += f"- {section.capitalize()}: not evaluated\n"
+        for section in skipped or []:
+            result += f"- {section.capitalize()}: no questions available\n"
+        
+        if skipped or unevaluated:
+            result += "\n_The overall score is weighted over the sections that were scored._\n"
+        if unevaluated:
+            result += "_Some answers could not be evaluated right now, so this attempt was not recorded as completed._\n"
+        
+        if weak_sections:
+            result += "\n*Sections to Review:*\n"
+            for section in weak_sections:
+                result += f"- {section.capitalize()}\n"
+        
+        if passed:
+            result += "\nGreat job! You are on track for the real exam!"
+        else:
+            result += "\nKeep practicing the weaker sections and try again!"
+        
+        return result
+    
+    @staticmethod
+    def vocabulary_card(german: str, level: str, due: int, english: str = '', example: str = '') -> str:
+        """Format a flashcard; the back (translation and example) is shown once revealed."""
+        card = f"Vocabulary Review ({level})\nWords due: {due}\n\n{german}"
+        if english:
+            card += f"\n\n= {english}"
+        if example:
+            card += f"\n\nExample: {example}"
+        return card
+    
+    @staticmethod
+    def vocabulary_review_summary(reviewed: int, remembered: int, finished: bool) -> str:
+        """Format the end of a vocabulary review session."""
+        if reviewed == 0:
+            return (
+                "No words are due right now. Come back later!\n"
+                "Keine Worter fallig. Bis spater!"
+            )
+        
+        result = (
+            "Vocabulary review finished.\n"
+            "Wiederholung beendet.\n\n"
+            f"Words reviewed: {reviewed}\n"
+            f"Remembered: {remembered} ({remembered * 100 // reviewed}%)"
+        )
+        if finished:
+            result += "\n\nAll due words done for now. Bis morgen!"
+        return result
+    
+    @staticmethod
+    def writing_evaluation(evaluation: Evaluation) -> str:
         """Format writing evaluation feedback."""
-        scores = evaluation.get('scores', {})
-        overall = evaluation.get('overall_score', 0)
-        mistakes = evaluation.get('mistakes', [])
-        strengths = evaluation.get('strengths', [])
-        suggestions = evaluation.get('suggestions', [])
-        corrected = evaluation.get('corrected_text', '')
+        scores = evaluation.scores
+        overall = evaluation.overall_score
+        mistakes = evaluation.mistakes
+        strengths = evaluation.strengths
+        suggestions = evaluation.suggestions
+        corrected = evaluation.corrected_text
         
         result = f"""
 *Writing Evaluation*
@@ -227,13 +329,13 @@ Contact: @EthioGermanSchool
         return result
     
     @staticmethod
-    def speaking_evaluation(evaluation: Dict[str, Any]) -> str:
+    def speaking_evaluation(evaluation: Evaluation) -> str:
         """Format speaking evaluation feedback."""
-        scores = evaluation.get('scores', {})
-        overall = evaluation.get('overall_score', 0)
-        mistakes = evaluation.get('mistakes', [])
-        tips = evaluation.get('pronunciation_tips', [])
-        strengths = evaluation.get('strengths', [])
+        scores = evaluation.scores
+        overall = evaluation.overall_score
+        mistakes = evaluation.mistakes
+        tips = evaluation.pronunciation_tips
+        strengths = evaluation.strengths
         
         result = f"""
 *Speaking Evaluation*
@@ -254,6 +356,15 @@ Contact: @EthioGermanSchool
                 result += f"- {s}\n"
             result += "\n"
         
+        metrics = evaluation.speech_metrics
+        if metrics:
+            result += "*Fluency Measurements:*\n"
+            result += f"- Speech rate: {metrics.words_per_minute:.0f} words/min\n"
+            result += f"- Pauses: {metrics.pause_count} ({metrics.long_pause_count} long)\n"
+            if metrics.low_confidence_words:
+                result += f"- Unclear words: {', '.join(metrics.low_confidence_words[:5])}\n"
+            result += "\n"
+        
         if tips:
             result += "*Pronunciation Tips:*\n"
             for t in tips[:3]:
@@ -290,6 +401,33 @@ Contact: @EthioGermanSchool
 Let's begin! Los geht's!
 """
     
+    @staticmethod
+    def lesson_content(lesson: Dict[str, Any]) -> str:
+        """Format a catalog lesson: intro, explanation, examples and practice task (Markdown)."""
+        content = lesson.get('content') or {}
+        escape = Formatters.escape_legacy_markdown
+        
+        result = Formatters.lesson_intro(
+            escape(lesson['title']),
+            lesson['level'],
+            lesson['skill'],
+            escape(lesson.get('topic') or '-')
+        )
+        
+        if content.get('explanation'):
+            result += f"\n{escape(content['explanation'])}\n"
+        
+        examples = content.get('examples', [])
+        if examples:
+            result += "\n*Examples:*\n"
+            for example in examples:
+                result += f"- _{escape(example.get('de', ''))}_ = {escape(example.get('en', ''))}\n"
+        
+        if content.get('practice'):
+            result += f"\n*Practice:* {escape(content['practice'])}\n"
+        
+        return result
+    
     @staticmethod
     def escape_markdown(text: str) -> str:
         """Escape special characters for Telegram MarkdownV2."""
@@ -2,7 +2,7 @@
 Inline keyboard builders for Telegram bot.
 """
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from typing import List, Optional
+from typing import List, Dict, Any, Optional
 
 from bot.config import Config
 
@@ -39,6 +39,9 @@ class Keyboards:
                 InlineKeyboardButton("Sprechen (Speaking)", callback_data="learn_sprechen")
             ],
             [InlineKeyboardButton("Vokabular (Vocabulary)", callback_data="learn_vokabular")],
+            [InlineKeyboardButton("Review Words (Flashcards)", callback_data="learn_review")],
+            [InlineKeyboardButton("Lessons", callback_data="learn_lessons")],
+            [InlineKeyboardButton("Continue Last Session", callback_data="learn_continue")],
             [InlineKeyboardButton("Back to Main Menu", callback_data="menu_main")]
         ]
         return InlineKeyboardMarkup(keyboard)
@@ -169,6 +172,70 @@ class Keyboards:
         ]
         return InlineKeyboardMarkup(keyboard)
     
+    @staticmethod
+    def history_navigation(has_older: bool, has_newer: bool) -> InlineKeyboardMarkup:
+        """Older/Newer paging buttons for exam history."""
+        nav = []
+        if has_newer:
+            nav.append(InlineKeyboardButton("Newer", callback_data="history_newer"))
+        if has_older:
+            nav.append(InlineKeyboardButton("Older", callback_data="history_older"))
+        keyboard = [nav] if nav else []
+        keyboard.append([InlineKeyboardButton("Back to Main Menu", callback_data="menu_main")])
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def lesson_skills(counts: Dict[str, int]) -> InlineKeyboardMarkup:
+        """Skills that have lessons at the user's level."""
+        keyboard = [
+            [InlineKeyboardButton(f"{skill.capitalize()} ({count})", callback_data=f"lessons_skill_{skill}")]
+            for skill, count in sorted(counts.items())
+        ]
+        keyboard.append([InlineKeyboardButton("Back to Learning Menu", callback_data="lessons_menu")])
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def lesson_list(lessons: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
+        """Lessons of one skill."""
+        keyboard = [
+            [InlineKeyboardButton(lesson['title'][:60], callback_data=f"lesson_open_{lesson['id']}")]
+            for lesson in lessons
+        ]
+        keyboard.append([InlineKeyboardButton("Back to Skills", callback_data="lessons_back")])
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def lesson_actions(skill: str) -> InlineKeyboardMarkup:
+        """Actions below an opened lesson."""
+        keyboard = [
+            [InlineKeyboardButton("Practice with Tutor", callback_data="lesson_practice")],
+            [InlineKeyboardButton("Back to Lessons", callback_data=f"lessons_skill_{skill}")]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def review_reveal() -> InlineKeyboardMarkup:
+        """Flashcard front: reveal the answer or stop reviewing."""
+        keyboard = [
+            [InlineKeyboardButton("Show Answer", callback_data="review_show")],
+            [InlineKeyboardButton("End Review", callback_data="review_end")]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def review_grades() -> InlineKeyboardMarkup:
+        """Flashcard back: how well the word was remembered (SM-2 grades)."""
+        keyboard = [
+            [
+                InlineKeyboardButton("Again", callback_data="review_grade_1"),
+                InlineKeyboardButton("Hard", callback_data="review_grade_3"),
+                InlineKeyboardButton("Good", callback_data="review_grade_4"),
+                InlineKeyboardButton("Easy", callback_data="review_grade_5")
+            ],
+            [InlineKeyboardButton("End Review", callback_data="review_end")]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
     @staticmethod
     def back_to_menu() -> InlineKeyboardMarkup:
         """Single back button."""
@@ -0,0 +1,177 @@
+"""
+Query plan check for EthioGerman Language School Telegram Bot.
+Runs EXPLAIN for the SQL behind every DatabaseService query and asserts that
+each one is served by the intended index: the filtered columns must be index
+conditions, not a Filter applied to the rows an index scan returns.
+
+Usage:
+    python setup_database.py      # apply migrations to the local database first
+    python check_query_plans.py
+
+Requires DATABASE_URL pointing at a local Postgres (never production).
+Sequential scans are disabled for the session so the planner picks an index
+whenever a usable one exists, even on empty tables. That makes any index scan
+possible (a full scan of an unrelated index, with everything in a Filter), which
+is why the index name and Index Cond are checked as well.
+"""
+import os
+import re
+import sys
+from typing import Optional, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+USER_ID = 123456789
+UUID = '00000000-0000-0000-0000-000000000000'
+TIMESTAMP = '2025-01-01T00:00:00+00:00'
+
+# (DatabaseService method, table, index the planner must pick (None for partitioned tables,
+#  whose per-partition index names are generated), columns the Index Cond must cover,
+#  SQL equivalent of the PostgREST query)
+QUERIES = [
+    ('get_user', 'users', 'users_pkey', ('id',),
+     f"SELECT * FROM users WHERE id = {USER_ID}"),
+    ('update_user', 'users', 'users_pkey', ('id',),
+     f"UPDATE users SET last_active = NOW() WHERE id = {USER_ID}"),
+    ('get_lessons', 'lessons', 'idx_lessons_active_level_skill', ('level', 'skill'),
+     "SELECT * FROM lessons WHERE is_active = true AND level = 'A1' AND skill = 'lesen' LIMIT 10"),
+    ('get_lesson_by_id', 'lessons', 'lessons_pkey', ('id',),
+     f"SELECT * FROM lessons WHERE id = '{UUID}'"),
+    ('get_lessons_version', 'lessons', 'idx_lessons_updated_at', (),
+     "SELECT updated_at FROM lessons ORDER BY updated_at DESC LIMIT 1"),
+    ('get_exam_questions', 'exam_questions', 'idx_exam_questions_active_difficulty',
+     ('level', 'exam_type', 'difficulty'),
+     "SELECT * FROM exam_questions WHERE level = 'A1' AND exam_type = 'lesen' AND is_active = true "
+     "AND difficulty >= 4 AND difficulty <= 7 LIMIT 5"),
+    ('get_user_progress', 'user_progress', 'idx_user_progress_user_completed', ('user_id',),
+     f"SELECT * FROM user_progress WHERE user_id = {USER_ID} "
+     "ORDER BY completed_at DESC, id DESC LIMIT 20"),
+    ('get_user_progress (skill)', 'user_progress', 'idx_user_progress_user_skill_completed_id', ('user_id', 'skill'),
+     f"SELECT * FROM user_progress WHERE user_id = {USER_ID} AND skill = 'lesen' "
+     "ORDER BY completed_at DESC, id DESC LIMIT 20"),
+    ('get_user_statistics', 'user_progress', None, ('user_id',),
+     f"SELECT skill, AVG(score) FROM user_progress WHERE user_id = {USER_ID} GROUP BY skill"),
+    ('get_user_ability', 'user_abilities', 'user_abilities_pkey', ('user_id', 'skill'),
+     f"SELECT ability, responses FROM user_abilities WHERE user_id = {USER_ID} AND skill = 'lesen'"),
+    ('get_vocabulary_cards', 'vocabulary_cards', 'idx_vocabulary_cards_user_due', ('user_id',),
+     f"SELECT * FROM vocabulary_cards WHERE user_id = {USER_ID} ORDER BY due_at, word LIMIT 1000 OFFSET 0"),
+    ('get_conversation_history', 'conversation_history', None, ('user_id',),
+     f"SELECT * FROM conversation_history WHERE user_id = {USER_ID} ORDER BY timestamp DESC LIMIT 10"),
+    ('get_conversation_history (session)', 'conversation_history', None, ('user_id', 'session_id'),
+     f"SELECT * FROM conversation_history WHERE user_id = {USER_ID} AND session_id = '{UUID}' "
+     "ORDER BY timestamp DESC LIMIT 10"),
+    ('update_exam_attempt', 'exam_attempts', 'exam_attempts_pkey', ('id',),
+     f"UPDATE exam_attempts SET is_completed = true WHERE id = '{UUID}'"),
+    ('get_exam_attempts', 'exam_attempts', 'idx_exam_attempts_history', ('user_id',),
+     f"SELECT * FROM exam_attempts WHERE user_id = {USER_ID} AND is_completed = true "
+     "ORDER BY completed_at DESC LIMIT 10"),
+    # The keyset OR cannot be an index condition; it filters rows already read in index order
+    ('get_exam_history_page', 'exam_attempts', 'idx_exam_attempts_history', ('user_id',),
+     f"SELECT id, exam_type, level, score, completed_at FROM exam_attempts "
+     f"WHERE user_id = {USER_ID} AND is_completed = true "
+     f"AND (completed_at < '{TIMESTAMP}' OR (completed_at = '{TIMESTAMP}' AND id < '{UUID}')) "
+     "ORDER BY completed_at DESC, id DESC LIMIT 11"),
+]
+
+
+def walk_plan(node: dict):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+
+def mentions(expression: str, column: str) -> bool:
+    """True if a plan condition refers to the column."""
+    return re.search(rf'\b{column}\b', expression) is not None
+
+
+def check_scan(scan: dict, index: Optional[str], columns: tuple) -> List[str]:
+    """
+    Problems with one scan of the table: no index, the wrong index, filtered
+    columns missing from the index condition or re-checked by a Filter.
+    """
+    # Index (Only) Scans carry the index themselves; Bitmap Heap Scans get it from their children
+    index_nodes = [node for node in walk_plan(scan) if 'Index Name' in node]
+    if not index_nodes:
+        return [scan['Node Type']]
+
+    problems = []
+    used = {node['Index Name'] for node in index_nodes}
+    if index is not None and index not in used:
+        problems.append(f"uses {', '.join(sorted(used))} instead of {index}")
+
+    conditions = ' '.join(node.get('Index Cond', '') for node in index_nodes)
+    missing = [column for column in columns if not mentions(conditions, column)]
+    if missing:
+        problems.append(f"{', '.join(missing)} not in Index Cond")
+
+    filtered = [column for column in columns if mentions(scan.get('Filter', ''), column)]
+    if filtered:
+        problems.append(f"Filter on {', '.join(filtered)}")
+    return problems
+
+
+def check_query(conn, table: str, index: Optional[str], columns: tuple, sql: str) -> tuple[bool, str]:
+    """
+    Explain a query and check the table is reached through the expected index,
+    with the filtered columns in the index condition.
+
+    Returns:
+        (ok, scan node types and any problems)
+    """
+    row = conn.execute(f"EXPLAIN (FORMAT JSON) {sql}").fetchone()
+    plan = row[0][0]['Plan']
+
+    scans = [
+        node
+        for node in walk_plan(plan)
+        if node.get('Relation Name') == table
+        or node.get('Relation Name', '').startswith(f'{table}_')  # partitions
+    ]
+    if not scans:
+        return False, 'no scan'
+
+    problems = []
+    for scan in scans:
+        problems.extend(problem for problem in check_scan(scan, index, columns) if problem not in problems)
+
+    description = ', '.join(sorted({scan['Node Type'] for scan in scans}))
+    if problems:
+        description += f" ({'; '.join(problems)})"
+    return not problems, description
+
+
+def main() -> None:
+    """Check every query and exit non-zero if any is not served by its index."""
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set. Point it at a local Postgres with migrations applied.")
+        sys.exit(2)
+
+    import psycopg
+
+    failures = 0
+    with psycopg.connect(DATABASE_URL) as conn:
+        conn.execute("SET enable_seqscan = off")
+
+        for name, table, index, columns, sql in QUERIES:
+            ok, scans = check_query(conn, table, index, columns, sql)
+            print(f"{'✓' if ok else '✗'} {name}: {scans}")
+            if not ok:
+                failures += 1
+
+        conn.rollback()
+
+    if failures:
+        print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} not served by the expected index.")
+        sys.exit(1)
+
+    print("\nAll queries use an index.")
+
+
+if __name__ == '__main__':
+    main()
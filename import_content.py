@@ -0,0 +1,150 @@
+"""
+Content pack tool for EthioGerman Language School Telegram Bot.
+Compiles JSONL content sources into packs and bulk-loads packs into the
+exam_questions and lessons tables.
+
+Usage:
+    python import_content.py build content/a1_b1.jsonl     # writes content/a1_b1.egpack
+    python import_content.py info content/a1_b1.egpack     # list the pack's groups
+    python import_content.py import content/a1_b1.egpack   # upsert into the database
+
+Requires DATABASE_URL for import. Rows keep the pack's stable IDs, so importing
+an updated pack updates existing rows (calibrated difficulties are kept).
+The bot also serves packs directly, so importing is only needed for the
+database-backed paths (adaptive calibration, lesson catalog, reporting).
+"""
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+from bot.content.pack import ContentPack, build_pack
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+QUESTION_UPSERT_SQL = """
+INSERT INTO exam_questions (id, level, exam_type, question_text, question_data, correct_answer, difficulty, is_active)
+VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)
+ON CONFLICT (id) DO UPDATE SET
+    level = EXCLUDED.level,
+    exam_type = EXCLUDED.exam_type,
+    question_text = EXCLUDED.question_text,
+    question_data = EXCLUDED.question_data,
+    correct_answer = EXCLUDED.correct_answer,
+    difficulty = EXCLUDED.difficulty,
+    is_active = TRUE
+"""
+
+LESSON_UPSERT_SQL = """
+INSERT INTO lessons (id, level, skill, topic, title, content, is_active)
+VALUES (%s, %s, %s, %s, %s, %s, TRUE)
+ON CONFLICT (id) DO UPDATE SET
+    level = EXCLUDED.level,
+    skill = EXCLUDED.skill,
+    topic = EXCLUDED.topic,
+    title = EXCLUDED.title,
+    content = EXCLUDED.content,
+    is_active = TRUE
+"""
+
+
+def build(source: str) -> None:
+    """Compile a JSONL source into a pack."""
+    started = time.perf_counter()
+    target = build_pack(source)
+    pack = ContentPack(target)
+    print(
+        f"✓ Built {target}: {pack.index['records']} records in {len(pack.index['blocks'])} blocks, "
+        f"{os.path.getsize(source) / 1024:.0f} KB -> {os.path.getsize(target) / 1024:.0f} KB "
+        f"({time.perf_counter() - started:.2f}s)"
+    )
+    pack.close()
+
+
+def info(path: str) -> None:
+    """Print the pack's groups and record counts."""
+    pack = ContentPack(path)
+    print(f"{pack.name} (version {pack.index.get('version')}, {pack.index['records']} records)")
+    for kind, level, type_ in sorted(pack.groups()):
+        print(f"  {kind:<9} {level:<3} {type_:<10} {pack.count(kind, level, type_):>6}")
+    pack.close()
+
+
+def batches(rows, size: int):
+    """Split an iterator of rows into lists of at most `size` rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_pack(path: str, batch_size: int) -> None:
+    """Upsert every question and lesson of a pack in batches, in one transaction."""
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set.")
+        sys.exit(2)
+
+    import psycopg
+    from psycopg.types.json import Jsonb
+
+    pack = ContentPack(path)
+    questions = (
+        (r['id'], r['level'], r['exam_type'], r['question_text'], Jsonb(r.get('question_data') or {}),
+         r.get('correct_answer') or '', r.get('difficulty') or 5)
+        for r in pack.records('question')
+    )
+    lessons = (
+        (r['id'], r['level'], r['skill'], r.get('topic'), r['title'], Jsonb(r.get('content') or {}))
+        for r in pack.records('lesson')
+    )
+
+    started = time.perf_counter()
+    counts = {}
+    with psycopg.connect(DATABASE_URL) as conn:
+        with conn.transaction(), conn.cursor() as cur:
+            for table, sql, rows in (
+                ('exam_questions', QUESTION_UPSERT_SQL, questions),
+                ('lessons', LESSON_UPSERT_SQL, lessons)
+            ):
+                counts[table] = 0
+                for batch in batches(rows, batch_size):
+                    cur.executemany(sql, batch)
+                    counts[table] += len(batch)
+    elapsed = time.perf_counter() - started
+    pack.close()
+
+    total = sum(counts.values())
+    print(
+        f"✓ Imported {counts['exam_questions']} questions and {counts['lessons']} lessons from {pack.name} "
+        f"in {elapsed:.2f}s ({total / elapsed if elapsed else total:.0f} rows/s)"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the command."""
+    parser = argparse.ArgumentParser(description="EthioGerman content pack tool")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help="compile a JSONL source into a pack").add_argument('source')
+    commands.add_parser('info', help="list a pack's contents").add_argument('pack')
+    import_parser = commands.add_parser('import', help="upsert a pack into exam_questions and lessons")
+    import_parser.add_argument('pack')
+    import_parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build(args.source)
+    elif args.command == 'info':
+        info(args.pack)
+    else:
+        import_pack(args.pack, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
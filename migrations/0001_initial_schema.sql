@@ -1,5 +1,4 @@
--- EthioGerman Language School - Database Setup
--- Run this SQL in Supabase SQL Editor
+-- Initial schema: tables and base indexes
 
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
@@ -0,0 +1,38 @@
+-- Server-side progress statistics
+
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_completed ON user_progress(user_id, completed_at DESC, id DESC);
+
+-- Aggregated progress statistics (shape consumed by Formatters.progress_summary)
+CREATE OR REPLACE FUNCTION get_user_statistics(p_user_id BIGINT)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH skills AS (
+        SELECT skill, AVG(COALESCE(score, 0))::FLOAT AS avg_score
+        FROM user_progress
+        WHERE user_id = p_user_id
+        GROUP BY skill
+    ),
+    weak AS (
+        SELECT area, COUNT(*) AS hits
+        FROM user_progress, unnest(weak_areas) AS area
+        WHERE user_id = p_user_id
+        GROUP BY area
+        ORDER BY hits DESC, area
+        LIMIT 5
+    ),
+    totals AS (
+        SELECT COUNT(*) AS total, COALESCE(AVG(COALESCE(score, 0)), 0)::FLOAT AS avg_score
+        FROM user_progress
+        WHERE user_id = p_user_id
+    )
+    SELECT jsonb_build_object(
+        'total_activities', totals.total,
+        'average_score', totals.avg_score,
+        'skill_scores', COALESCE((SELECT jsonb_object_agg(skill, avg_score) FROM skills), '{}'::JSONB),
+        'weak_areas', COALESCE((SELECT jsonb_agg(area ORDER BY hits DESC, area) FROM weak), '[]'::JSONB),
+        'strengths', COALESCE((SELECT jsonb_agg(skill ORDER BY skill) FROM skills WHERE avg_score >= 75), '[]'::JSONB)
+    )
+    FROM totals;
+$$;
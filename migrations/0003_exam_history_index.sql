@@ -0,0 +1,3 @@
+-- Keyset pagination of completed exam attempts
+
+CREATE INDEX IF NOT EXISTS idx_exam_attempts_history ON exam_attempts(user_id, completed_at DESC, id DESC) WHERE is_completed;
@@ -0,0 +1,22 @@
+-- Composite indexes matching the filters and sort orders of DatabaseService queries
+
+-- get_conversation_history: filter by user, newest first
+CREATE INDEX IF NOT EXISTS idx_conversation_history_user_time
+    ON conversation_history(user_id, timestamp DESC);
+
+-- get_exam_questions: equality on level/type, range on difficulty, active rows only
+CREATE INDEX IF NOT EXISTS idx_exam_questions_active_difficulty
+    ON exam_questions(level, exam_type, difficulty)
+    WHERE is_active;
+
+-- get_lessons: equality on level/skill, active rows only
+CREATE INDEX IF NOT EXISTS idx_lessons_active_level_skill
+    ON lessons(level, skill)
+    WHERE is_active;
+
+-- get_user_progress filtered by skill
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_skill_completed
+    ON user_progress(user_id, skill, completed_at DESC);
+
+-- Superseded by the (user_id, completed_at, id) composite from 0002
+DROP INDEX IF EXISTS idx_user_progress_user;
@@ -0,0 +1,124 @@
+-- Monthly range partitioning of conversation_history with archival to compressed cold storage
+
+-- Create (if missing) the partition holding one calendar month (UTC)
+CREATE OR REPLACE FUNCTION create_conversation_partition(p_month DATE)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF conversation_history FOR VALUES FROM (%L) TO (%L)',
+        'conversation_history_' || to_char(month_start, 'YYYY_MM'),
+        month_start::TIMESTAMP AT TIME ZONE 'UTC',
+        (month_start + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC'
+    );
+END;
+$$;
+
+-- Make sure partitions exist for the current month and the next p_months_ahead months
+CREATE OR REPLACE FUNCTION ensure_conversation_partitions(p_months_ahead INT DEFAULT 2)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        PERFORM create_conversation_partition(
+            ((NOW() AT TIME ZONE 'UTC') + make_interval(months => i))::DATE
+        );
+    END LOOP;
+END;
+$$;
+
+-- Swap the plain table for a partitioned one
+ALTER TABLE conversation_history RENAME TO conversation_history_legacy;
+ALTER INDEX conversation_history_pkey RENAME TO conversation_history_legacy_pkey;
+
+CREATE TABLE conversation_history (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+    session_id UUID,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catch-all so inserts never fail if the maintenance job falls behind
+CREATE TABLE conversation_history_default PARTITION OF conversation_history DEFAULT;
+
+SELECT create_conversation_partition(month::DATE)
+FROM (
+    SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC') AS month
+    FROM conversation_history_legacy
+    WHERE timestamp IS NOT NULL
+) months;
+
+SELECT ensure_conversation_partitions(2);
+
+INSERT INTO conversation_history (id, user_id, session_id, role, content, timestamp)
+SELECT id, user_id, session_id, role, content, COALESCE(timestamp, NOW())
+FROM conversation_history_legacy;
+
+DROP TABLE conversation_history_legacy;
+
+CREATE INDEX idx_conversation_history_user_session_time
+    ON conversation_history(user_id, session_id, timestamp DESC);
+CREATE INDEX idx_conversation_history_user_time
+    ON conversation_history(user_id, timestamp DESC);
+
+-- Cold storage: one row per archived session, messages as a compressed JSONB array
+CREATE TABLE IF NOT EXISTS conversation_archive (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+    session_id UUID,
+    started_at TIMESTAMPTZ NOT NULL,
+    ended_at TIMESTAMPTZ NOT NULL,
+    message_count INT NOT NULL,
+    messages JSONB NOT NULL,
+    archived_at TIMESTAMPTZ DEFAULT NOW()
+);
+ALTER TABLE conversation_archive ALTER COLUMN messages SET COMPRESSION lz4;
+CREATE INDEX IF NOT EXISTS idx_conversation_archive_user ON conversation_archive(user_id, started_at DESC);
+
+-- Move every monthly partition older than p_keep_months into the archive and drop it.
+-- Returns the number of archived sessions.
+CREATE OR REPLACE FUNCTION archive_conversation_history(p_keep_months INT DEFAULT 6)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    part RECORD;
+    cutoff DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => p_keep_months))::DATE;
+    sessions INT;
+    archived INT := 0;
+BEGIN
+    FOR part IN
+        SELECT child.relname AS name
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'conversation_history'
+          AND child.relname ~ '^conversation_history_\d{4}_\d{2}$'
+          AND to_date(right(child.relname, 7), 'YYYY_MM') < cutoff
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format(
+            'INSERT INTO conversation_archive (user_id, session_id, started_at, ended_at, message_count, messages)
+             SELECT user_id, session_id, MIN(timestamp), MAX(timestamp), COUNT(*),
+                    jsonb_agg(jsonb_build_object(''role'', role, ''content'', content, ''timestamp'', timestamp)
+                              ORDER BY timestamp)
+             FROM %I
+             GROUP BY user_id, session_id',
+            part.name
+        );
+        GET DIAGNOSTICS sessions = ROW_COUNT;
+        archived := archived + sessions;
+
+        EXECUTE format('DROP TABLE %I', part.name);
+    END LOOP;
+
+    RETURN archived;
+END;
+$$;
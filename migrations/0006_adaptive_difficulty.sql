@@ -0,0 +1,30 @@
+-- Rasch/Elo estimates for adaptive question selection
+
+-- Calibrated item difficulty in logits (NULL until the first update; seeded from difficulty 1-10)
+ALTER TABLE exam_questions
+    ADD COLUMN IF NOT EXISTS irt_difficulty REAL,
+    ADD COLUMN IF NOT EXISTS irt_responses INT NOT NULL DEFAULT 0;
+
+-- Per-user ability per skill, in logits on the same scale
+CREATE TABLE IF NOT EXISTS user_abilities (
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    ability REAL NOT NULL DEFAULT 0,
+    responses INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, skill)
+);
+
+-- Apply the Elo difficulty steps of one finished exam in a single round trip.
+-- p_updates: [{"id": "<question uuid>", "delta": <logits>}, ...]
+-- Deltas (not absolute values) so concurrent exams do not overwrite each other.
+CREATE OR REPLACE FUNCTION update_question_difficulties(p_updates JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE exam_questions q
+    SET irt_difficulty = COALESCE(q.irt_difficulty, (q.difficulty - 5.5) / 1.5) + (u->>'delta')::REAL,
+        irt_responses = q.irt_responses + 1
+    FROM jsonb_array_elements(p_updates) AS u
+    WHERE q.id = (u->>'id')::UUID;
+$$;
@@ -0,0 +1,19 @@
+-- Spaced-repetition state for the bundled vocabulary list (vocabulary/a1_b1.tsv)
+
+-- One SM-2 card per user and word; the word itself is the key into the bundled list
+CREATE TABLE IF NOT EXISTS vocabulary_cards (
+    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+    word TEXT NOT NULL,
+    level TEXT NOT NULL,
+    ease REAL NOT NULL DEFAULT 2.5,
+    interval_days REAL NOT NULL DEFAULT 0,
+    repetitions INT NOT NULL DEFAULT 0,
+    lapses INT NOT NULL DEFAULT 0,
+    due_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, word)
+);
+
+-- Deck hydration reads a user's cards in due order
+CREATE INDEX IF NOT EXISTS idx_vocabulary_cards_user_due
+    ON vocabulary_cards(user_id, due_at);
@@ -0,0 +1,23 @@
+-- Change tracking for the in-memory lesson catalog (bot/services/lesson_catalog.py)
+
+ALTER TABLE lessons
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS lessons_touch_updated_at ON lessons;
+CREATE TRIGGER lessons_touch_updated_at
+    BEFORE UPDATE ON lessons
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+-- get_lessons_version: latest change first
+CREATE INDEX IF NOT EXISTS idx_lessons_updated_at
+    ON lessons(updated_at DESC);
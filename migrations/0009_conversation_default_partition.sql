@@ -0,0 +1,80 @@
+-- Let monthly partitions be created after rows have landed in the DEFAULT partition.
+-- Postgres refuses to create a partition whose range matches rows already in the
+-- default one, so the helper now detaches the default, creates the month, moves
+-- that month's rows over and attaches the default again.
+
+-- Create (if missing) the partition holding one calendar month (UTC)
+CREATE OR REPLACE FUNCTION create_conversation_partition(p_month DATE)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    part_name TEXT := 'conversation_history_' || to_char(month_start, 'YYYY_MM');
+    range_start TIMESTAMPTZ := month_start::TIMESTAMP AT TIME ZONE 'UTC';
+    range_end TIMESTAMPTZ := (month_start + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+    has_default BOOLEAN := to_regclass('conversation_history_default') IS NOT NULL;
+    stranded BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF has_default THEN
+        SELECT EXISTS (
+            SELECT 1 FROM conversation_history_default
+            WHERE timestamp >= range_start AND timestamp < range_end
+        ) INTO stranded;
+    END IF;
+
+    IF stranded THEN
+        -- Blocks writes to conversation_history until the transaction commits
+        ALTER TABLE conversation_history DETACH PARTITION conversation_history_default;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF conversation_history FOR VALUES FROM (%L) TO (%L)',
+        part_name, range_start, range_end
+    );
+
+    IF stranded THEN
+        WITH moved AS (
+            DELETE FROM conversation_history_default
+            WHERE timestamp >= range_start AND timestamp < range_end
+            RETURNING id, user_id, session_id, role, content, timestamp
+        )
+        INSERT INTO conversation_history (id, user_id, session_id, role, content, timestamp)
+        SELECT id, user_id, session_id, role, content, timestamp FROM moved;
+
+        ALTER TABLE conversation_history ATTACH PARTITION conversation_history_default DEFAULT;
+    END IF;
+END;
+$$;
+
+-- Make sure partitions exist for the current month and the next p_months_ahead months,
+-- and give any month still sitting in the default partition its own partition
+CREATE OR REPLACE FUNCTION ensure_conversation_partitions(p_months_ahead INT DEFAULT 2)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    stranded_month DATE;
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        PERFORM create_conversation_partition(
+            ((NOW() AT TIME ZONE 'UTC') + make_interval(months => i))::DATE
+        );
+    END LOOP;
+
+    IF to_regclass('conversation_history_default') IS NOT NULL THEN
+        FOR stranded_month IN
+            SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC')::DATE
+            FROM conversation_history_default
+        LOOP
+            PERFORM create_conversation_partition(stranded_month);
+        END LOOP;
+    END IF;
+END;
+$$;
+
+SELECT ensure_conversation_partitions(2);
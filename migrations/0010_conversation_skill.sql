@@ -0,0 +1,94 @@
+-- Remember which skill a tutoring session practiced, so "continue last session" resumes it.
+-- The partition and archive helpers copy rows by column list, so they are redefined to carry it.
+
+ALTER TABLE conversation_history
+    ADD COLUMN IF NOT EXISTS skill TEXT;
+
+-- Moving rows out of the default partition keeps their skill
+CREATE OR REPLACE FUNCTION create_conversation_partition(p_month DATE)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    part_name TEXT := 'conversation_history_' || to_char(month_start, 'YYYY_MM');
+    range_start TIMESTAMPTZ := month_start::TIMESTAMP AT TIME ZONE 'UTC';
+    range_end TIMESTAMPTZ := (month_start + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+    has_default BOOLEAN := to_regclass('conversation_history_default') IS NOT NULL;
+    stranded BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF has_default THEN
+        SELECT EXISTS (
+            SELECT 1 FROM conversation_history_default
+            WHERE timestamp >= range_start AND timestamp < range_end
+        ) INTO stranded;
+    END IF;
+
+    IF stranded THEN
+        -- Blocks writes to conversation_history until the transaction commits
+        ALTER TABLE conversation_history DETACH PARTITION conversation_history_default;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF conversation_history FOR VALUES FROM (%L) TO (%L)',
+        part_name, range_start, range_end
+    );
+
+    IF stranded THEN
+        WITH moved AS (
+            DELETE FROM conversation_history_default
+            WHERE timestamp >= range_start AND timestamp < range_end
+            RETURNING id, user_id, session_id, role, content, timestamp, skill
+        )
+        INSERT INTO conversation_history (id, user_id, session_id, role, content, timestamp, skill)
+        SELECT id, user_id, session_id, role, content, timestamp, skill FROM moved;
+
+        ALTER TABLE conversation_history ATTACH PARTITION conversation_history_default DEFAULT;
+    END IF;
+END;
+$$;
+
+-- Archived messages keep their skill
+CREATE OR REPLACE FUNCTION archive_conversation_history(p_keep_months INT DEFAULT 6)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    part RECORD;
+    cutoff DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => p_keep_months))::DATE;
+    sessions INT;
+    archived INT := 0;
+BEGIN
+    FOR part IN
+        SELECT child.relname AS name
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'conversation_history'
+          AND child.relname ~ '^conversation_history_\d{4}_\d{2}$'
+          AND to_date(right(child.relname, 7), 'YYYY_MM') < cutoff
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format(
+            'INSERT INTO conversation_archive (user_id, session_id, started_at, ended_at, message_count, messages)
+             SELECT user_id, session_id, MIN(timestamp), MAX(timestamp), COUNT(*),
+                    jsonb_agg(jsonb_build_object(''role'', role, ''content'', content, ''timestamp'', timestamp,
+                                                 ''skill'', skill)
+                              ORDER BY timestamp)
+             FROM %I
+             GROUP BY user_id, session_id',
+            part.name
+        );
+        GET DIAGNOSTICS sessions = ROW_COUNT;
+        archived := archived + sessions;
+
+        EXECUTE format('DROP TABLE %I', part.name);
+    END LOOP;
+
+    RETURN archived;
+END;
+$$;
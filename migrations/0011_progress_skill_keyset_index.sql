@@ -0,0 +1,7 @@
+-- Keyset pagination of get_user_progress filtered by skill: the (completed_at, id)
+-- order needs id in the index too, as in idx_user_progress_user_completed
+
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_skill_completed_id
+    ON user_progress(user_id, skill, completed_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_user_progress_user_skill_completed;
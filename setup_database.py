@@ -1,155 +1,114 @@
 """
-Database setup script for EthioGerman Language School Telegram Bot.
-Run this script once to create all required tables in Supabase.
+Database migration runner for EthioGerman Language School Telegram Bot.
+Applies the versioned SQL files in migrations/ that have not been applied yet.
+
+Usage:
+    python setup_database.py            # apply pending migrations
+    python setup_database.py --status   # list applied and pending migrations
+    python setup_database.py --print    # print pending SQL for the Supabase SQL Editor
+
+Requires DATABASE_URL (Supabase: Settings -> Database -> Connection string).
+Without it, pending SQL is printed for manual execution instead.
 """
-import httpx
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_KEY')
-
-# SQL to create all tables
-SETUP_SQL = """
--- Enable UUID extension
-CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-
--- Users table
-CREATE TABLE IF NOT EXISTS users (
-    id BIGINT PRIMARY KEY,
-    username TEXT,
-    first_name TEXT,
-    last_name TEXT,
-    subscription_expiry TIMESTAMPTZ,
-    current_level TEXT DEFAULT 'A1',
-    preferred_lang TEXT DEFAULT 'english',
-    created_at TIMESTAMPTZ DEFAULT NOW(),
-    last_active TIMESTAMPTZ
-);
+DATABASE_URL = os.getenv('DATABASE_URL')
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
 
--- Lessons table
-CREATE TABLE IF NOT EXISTS lessons (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    level TEXT NOT NULL,
-    skill TEXT NOT NULL,
-    topic TEXT,
-    title TEXT NOT NULL,
-    content JSONB,
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMPTZ DEFAULT NOW()
-);
+# Try to import psycopg
+PSYCOPG_AVAILABLE = False
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    pass
 
--- Exam questions table
-CREATE TABLE IF NOT EXISTS exam_questions (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    level TEXT NOT NULL,
-    exam_type TEXT NOT NULL,
-    question_text TEXT NOT NULL,
-    question_data JSONB,
-    correct_answer TEXT,
-    rubric JSONB,
-    difficulty INT DEFAULT 5,
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    applied_at TIMESTAMPTZ DEFAULT NOW()
 );
+"""
 
--- User progress table
-CREATE TABLE IF NOT EXISTS user_progress (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
-    skill TEXT NOT NULL,
-    activity_type TEXT,
-    score DECIMAL(5,2),
-    weak_areas TEXT[],
-    completed_at TIMESTAMPTZ DEFAULT NOW()
-);
 
--- Conversation history table
-CREATE TABLE IF NOT EXISTS conversation_history (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
-    session_id UUID,
-    role TEXT NOT NULL,
-    content TEXT NOT NULL,
-    timestamp TIMESTAMPTZ DEFAULT NOW()
-);
+def load_migrations() -> list[tuple[str, Path]]:
+    """Return (version, path) for every migration file, in order."""
+    return [(path.stem, path) for path in sorted(MIGRATIONS_DIR.glob('*.sql'))]
 
--- Exam attempts table
-CREATE TABLE IF NOT EXISTS exam_attempts (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
-    exam_type TEXT NOT NULL,
-    level TEXT NOT NULL,
-    score DECIMAL(5,2),
-    answers JSONB,
-    started_at TIMESTAMPTZ DEFAULT NOW(),
-    completed_at TIMESTAMPTZ,
-    is_completed BOOLEAN DEFAULT FALSE
-);
 
--- Create indexes for performance
-CREATE INDEX IF NOT EXISTS idx_users_subscription ON users(subscription_expiry);
-CREATE INDEX IF NOT EXISTS idx_lessons_level_skill ON lessons(level, skill);
-CREATE INDEX IF NOT EXISTS idx_exam_questions_level_type ON exam_questions(level, exam_type);
-CREATE INDEX IF NOT EXISTS idx_user_progress_user ON user_progress(user_id);
-CREATE INDEX IF NOT EXISTS idx_conversation_history_user ON conversation_history(user_id, session_id);
-CREATE INDEX IF NOT EXISTS idx_exam_attempts_user ON exam_attempts(user_id);
-"""
+def applied_versions(conn) -> set[str]:
+    """Return versions already recorded in schema_migrations."""
+    conn.execute(MIGRATIONS_TABLE_SQL)
+    rows = conn.execute("SELECT version FROM schema_migrations").fetchall()
+    return {row[0] for row in rows}
 
 
-def setup_database():
-    """Execute SQL to set up database tables."""
-    
-    # Use Supabase's REST API with raw SQL via RPC
-    # First, let's try using the SQL editor endpoint
-    headers = {
-        'apikey': SUPABASE_KEY,
-        'Authorization': f'Bearer {SUPABASE_KEY}',
-        'Content-Type': 'application/json',
-        'Prefer': 'return=minimal'
-    }
-    
-    # Split into individual statements and execute via postgrest
-    # Actually, we need to use the SQL endpoint or create tables via REST
-    # Let's provide the SQL for manual execution in Supabase dashboard
-    
+def print_sql(migrations: list[tuple[str, Path]]) -> None:
+    """Print migration SQL for manual execution."""
     print("=" * 60)
-    print("DATABASE SETUP SQL")
-    print("=" * 60)
-    print("\nPlease run the following SQL in your Supabase SQL Editor:")
+    print("Please run the following SQL in your Supabase SQL Editor:")
     print("(Dashboard -> SQL Editor -> New Query)")
-    print("\n" + "=" * 60)
-    print(SETUP_SQL)
     print("=" * 60)
-    
-    # Alternative: Try to create tables via REST API
-    print("\n\nAttempting to create tables via API...")
-    
-    # Create users table by inserting and deleting a test record
-    # This won't work for table creation, but we can verify connection
-    
+    print(MIGRATIONS_TABLE_SQL)
+    for version, path in migrations:
+        print(f"-- ==================== {version} ====================")
+        print(path.read_text(encoding='utf-8'))
+        print(f"INSERT INTO schema_migrations (version) VALUES ('{version}') ON CONFLICT DO NOTHING;\n")
+    print("=" * 60)
+
+
+def migrate(status_only: bool = False) -> None:
+    """Apply pending migrations, each in its own transaction."""
+    migrations = load_migrations()
+
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        applied = applied_versions(conn)
+        pending = [(v, p) for v, p in migrations if v not in applied]
+
+        if status_only:
+            for version, _ in migrations:
+                print(f"{'[x]' if version in applied else '[ ]'} {version}")
+            return
+
+        if not pending:
+            print("✓ Database is up to date.")
+            return
+
+        for version, path in pending:
+            print(f"Applying {version}...")
+            with conn.transaction():
+                conn.execute(path.read_text(encoding='utf-8'))
+                conn.execute(
+                    "INSERT INTO schema_migrations (version) VALUES (%s)",
+                    (version,)
+                )
+            print(f"✓ {version}")
+
+
+def setup_database() -> None:
+    """Entry point: apply migrations or print SQL when no direct connection is possible."""
+    args = sys.argv[1:]
+
+    if '--print' in args:
+        print_sql(load_migrations())
+        return
+
+    if not DATABASE_URL or not PSYCOPG_AVAILABLE:
+        reason = "DATABASE_URL is not set" if not DATABASE_URL else "psycopg is not installed"
+        print(f"Cannot connect directly ({reason}).\n")
+        print_sql(load_migrations())
+        return
+
     try:
-        response = httpx.get(
-            f"{SUPABASE_URL}/rest/v1/users",
-            headers=headers,
-            params={'select': 'id', 'limit': '1'}
-        )
-        
-        if response.status_code == 200:
-            print("✓ Connection successful! Tables may already exist.")
-            print("  If you see errors later, please run the SQL above in Supabase dashboard.")
-        elif response.status_code == 404:
-            print("✗ Tables do not exist yet.")
-            print("  Please run the SQL above in your Supabase SQL Editor.")
-        else:
-            print(f"Response: {response.status_code}")
-            print(f"Please run the SQL above in your Supabase SQL Editor.")
-            
+        migrate(status_only='--status' in args)
     except Exception as e:
-        print(f"Error connecting to Supabase: {e}")
-        print("Please run the SQL above in your Supabase SQL Editor.")
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,89 @@
+"""
+Offline simulation of adaptive exams for EthioGerman Language School Telegram Bot.
+Synthetic learners with known abilities take adaptive exams (bot/services/adaptive.py)
+and fixed-order exams over item banks of different sizes. For each bank size it
+prints how many questions were asked and how far the ability estimate landed from
+the truth, which is what ADAPTIVE_MIN_BANK should be chosen from.
+
+Usage:
+    python simulate_adaptive.py
+    python simulate_adaptive.py --learners 5000 --max-questions 10 --banks 5 10 15 30
+
+Needs no database or API keys: the service modules create their clients at
+import, so placeholder credentials are filled in for any that are unset.
+"""
+import os
+import sys
+import math
+import random
+import argparse
+import statistics
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+for name in ('TELEGRAM_BOT_TOKEN', 'SUPABASE_URL', 'SUPABASE_KEY', 'OPENROUTER_API_KEY'):
+    os.environ.setdefault(name, 'https://simulation.invalid' if name == 'SUPABASE_URL' else 'simulation')
+
+from bot.services.adaptive import AdaptiveExam, ItemBank, p_correct
+from bot.services.models import ExamQuestion
+
+
+def make_bank(size: int, rng: random.Random) -> ItemBank:
+    """Questions rated 1-10 like the bundled pack, spread over the whole range."""
+    return ItemBank([
+        ExamQuestion(f'q{i}', 'A1', 'lesen', difficulty=1 + (i * 10 // size + rng.randrange(2)) % 10)
+        for i in range(size)
+    ])
+
+
+def run_exam(exam: AdaptiveExam, ability: float, rng: random.Random, adaptive: bool) -> Tuple[float, int]:
+    """Answer an exam as a learner of the given ability; returns (estimate, questions asked)."""
+    if adaptive:
+        while (question := exam.next_question()) is not None:
+            exam.record(question, rng.random() < p_correct(ability, exam.bank.difficulty(question.id)))
+    else:
+        # Fixed exam: a random draw of max_questions, all of them answered
+        ids = [qid for _, qid in exam.bank._index]
+        for qid in rng.sample(ids, min(exam.max_questions, len(ids))):
+            exam.record(exam.bank.question(qid), rng.random() < p_correct(ability, exam.bank.difficulty(qid)))
+    return exam.ability, len(exam.responses)
+
+
+def simulate(bank_size: int, learners: int, max_questions: int, adaptive: bool, seed: int = 1) -> Tuple[float, float]:
+    """
+    Returns:
+        (RMSE of the ability estimate in logits, mean questions asked)
+    """
+    rng = random.Random(seed)
+    random.seed(seed)  # ItemBank.nearest picks among close candidates with the random module
+    errors: List[float] = []
+    asked: List[int] = []
+    for _ in range(learners):
+        ability = rng.gauss(0, 1)
+        exam = AdaptiveExam(make_bank(bank_size, rng), 0.0, 1.0, max_questions)
+        estimate, count = run_exam(exam, ability, rng, adaptive)
+        errors.append((estimate - ability) ** 2)
+        asked.append(count)
+    return math.sqrt(statistics.fmean(errors)), statistics.fmean(asked)
+
+
+def main() -> None:
+    """Print questions asked and estimate error per bank size, adaptive vs fixed."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--learners', type=int, default=2000)
+    parser.add_argument('--max-questions', type=int, default=10)
+    parser.add_argument('--banks', type=int, nargs='+', default=[5, 8, 10, 15, 30, 100])
+    args = parser.parse_args()
+
+    print(f"{args.learners:,} learners per row, exams of up to {args.max_questions} questions\n")
+    print(f"{'bank':>6}  {'fixed RMSE':>10}  {'asked':>5}  {'adaptive RMSE':>13}  {'asked':>5}")
+    for size in args.banks:
+        fixed_rmse, fixed_asked = simulate(size, args.learners, args.max_questions, adaptive=False)
+        adaptive_rmse, adaptive_asked = simulate(size, args.learners, args.max_questions, adaptive=True)
+        print(f"{size:>6}  {fixed_rmse:>10.3f}  {fixed_asked:>5.1f}  {adaptive_rmse:>13.3f}  {adaptive_asked:>5.1f}")
+
+
+if __name__ == '__main__':
+    main()
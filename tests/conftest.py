@@ -0,0 +1,14 @@
+"""
+Shared test setup.
+Config reads the environment on import and the service modules create their
+clients at import, so placeholder credentials are set before any bot module is
+loaded (validation itself runs in bot/main.py); local SQLite stores live in memory.
+"""
+import os
+
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'test-token')
+os.environ.setdefault('SUPABASE_URL', 'https://test.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
+os.environ.setdefault('OPENROUTER_API_KEY', 'test-key')
+os.environ.setdefault('TRANSCRIPT_CACHE_PATH', ':memory:')
+os.environ.setdefault('EVALUATION_QUEUE_PATH', ':memory:')
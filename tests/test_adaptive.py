@@ -0,0 +1,88 @@
+"""Tests for adaptive exams (database calls and bundled questions are stubbed)."""
+import asyncio
+
+import pytest
+
+from bot.config import Config
+from bot.services import adaptive as adaptive_module
+from bot.services.adaptive import AdaptiveEngine, AdaptiveExam, ItemBank
+from bot.services.models import ExamQuestion
+
+
+def question(question_id, difficulty):
+    return ExamQuestion(question_id, 'A1', 'lesen', difficulty=difficulty)
+
+
+def bank(size=10):
+    return ItemBank([question(f'q{i}', 1 + i % 10) for i in range(size)])
+
+
+class FakeDatabase:
+    def __init__(self, stored):
+        self.stored = stored
+
+    async def get_exam_questions(self, level, exam_type, limit):
+        return list(self.stored)
+
+    async def get_user_ability(self, user_id, exam_type):
+        return (1.0, 50)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(adaptive_module, 'db', FakeDatabase([question(f'db{i}', 5) for i in range(3)]))
+    monkeypatch.setattr(adaptive_module.content_library, 'questions', lambda level, exam_type: [
+        question(f'pack{i}', 1 + i) for i in range(5)
+    ])
+    return AdaptiveEngine()
+
+
+def test_nearest_picks_among_closest_unused():
+    items = bank()
+    # Rating r seeds (r - 5.5) / 1.5 logits; the three closest to 0 are ratings 5, 6 and 4/7
+    picked = {items.nearest(0.0, set(), spread=3).id for _ in range(50)}
+    assert picked <= {'q3', 'q4', 'q5', 'q6'}
+    assert items.nearest(0.0, {'q4', 'q5'}, spread=1).id in {'q3', 'q6'}
+    assert items.nearest(0.0, {f'q{i}' for i in range(10)}) is None
+
+
+def test_posterior_moves_with_answers():
+    exam = AdaptiveExam(bank(), 0.0, 1.0, max_questions=10)
+    exam.record(exam.bank.question('q4'), True)
+    after_correct = exam.ability
+    assert after_correct > 0
+    exam.record(exam.bank.question('q5'), False)
+    assert exam.ability < after_correct
+    assert exam.standard_error < 1.0
+    assert [qid for qid, _, _ in exam.responses] == ['q4', 'q5']
+
+
+def test_stops_at_question_limit_and_when_precise(monkeypatch):
+    exam = AdaptiveExam(bank(), 0.0, 1.0, max_questions=3)
+    asked = []
+    while (q := exam.next_question()) is not None:
+        asked.append(q.id)
+        exam.record(q, True)
+    assert len(asked) == 3 and len(set(asked)) == 3
+
+    monkeypatch.setattr(Config, 'ADAPTIVE_MIN_QUESTIONS', 2)
+    monkeypatch.setattr(Config, 'ADAPTIVE_TARGET_SE', 0.95)
+    exam = AdaptiveExam(bank(), 0.0, 1.0, max_questions=10)
+    while (q := exam.next_question()) is not None:
+        exam.record(q, True)
+    assert len(exam.responses) == 2
+
+
+def test_start_exam_needs_a_large_enough_bank(engine, monkeypatch):
+    monkeypatch.setattr(Config, 'ADAPTIVE_MIN_BANK', 8)
+    exam = asyncio.run(engine.start_exam(1, 'A1', 'lesen', 5))
+    assert len(exam.bank) == 8
+    assert exam.ability == pytest.approx(1.0, abs=0.05)
+
+    monkeypatch.setattr(Config, 'ADAPTIVE_MIN_BANK', 9)
+    assert asyncio.run(AdaptiveEngine().start_exam(1, 'A1', 'lesen', 5)) is None
+
+
+def test_default_min_bank_admits_the_bundled_pack():
+    # The smallest bundled set (lesen) has 5 questions per level
+    assert Config.ADAPTIVE_MIN_BANK <= 5
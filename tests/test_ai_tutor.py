@@ -0,0 +1,67 @@
+"""Tests for AITutorService request plumbing (provider calls are stubbed)."""
+import asyncio
+
+import httpx
+
+from bot.services import ai_tutor as ai_tutor_module
+from bot.services.ai_tutor import AITutorService
+
+
+def completion(content: str) -> httpx.Response:
+    return httpx.Response(200, json={'choices': [{'message': {'content': content}}], 'usage': {}})
+
+
+def test_chat_passes_user_id_to_router(monkeypatch):
+    calls = []
+
+    async def request(task, post, timeout, user_id=None):
+        calls.append((task, user_id))
+        return completion('Hallo!')
+
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', request)
+
+    reply = asyncio.run(AITutorService().chat(
+        user_message='Hallo',
+        conversation_history=[{'role': 'user', 'content': 'Hallo'}],
+        level='A1',
+        user_id=42
+    ))
+
+    assert reply == 'Hallo!'
+    assert calls == [('chat', 42)]
+
+
+def test_chat_without_user_id(monkeypatch):
+    async def request(task, post, timeout, user_id=None):
+        assert user_id is None
+        return completion('Guten Tag!')
+
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', request)
+
+    assert asyncio.run(AITutorService().chat('Hallo', [])) == 'Guten Tag!'
+
+
+def test_evaluate_writing_sends_model_and_user(monkeypatch):
+    sent = []
+
+    class Client:
+        def __init__(self, timeout):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def post(self, url, headers, json):
+            sent.append(json)
+            return completion('{"scores": {"grammar": 80}, "overall_score": 80}')
+
+    monkeypatch.setattr(ai_tutor_module.httpx, 'AsyncClient', Client)
+
+    evaluation = asyncio.run(AITutorService().evaluate_writing('Ich bin Anna.', 'Stell dich vor.', 'A1', user_id=7))
+
+    assert evaluation.overall_score == 80
+    assert not evaluation.failed
+    assert sent[0]['model']
@@ -0,0 +1,51 @@
+"""Tests for check_query_plans' plan checks on EXPLAIN (FORMAT JSON) fragments."""
+from check_query_plans import check_scan
+
+
+def index_scan(index, cond=None, filter=None, node_type='Index Scan'):
+    node = {'Node Type': node_type, 'Relation Name': 'user_progress', 'Index Name': index}
+    if cond:
+        node['Index Cond'] = cond
+    if filter:
+        node['Filter'] = filter
+    return node
+
+
+def test_expected_index_with_covered_columns_passes():
+    scan = index_scan('idx_user_progress_user_skill_completed_id', "((user_id = '1'::bigint) AND (skill = 'lesen'::text))")
+    assert check_scan(scan, 'idx_user_progress_user_skill_completed_id', ('user_id', 'skill')) == []
+
+
+def test_sequential_scan_fails():
+    scan = {'Node Type': 'Seq Scan', 'Relation Name': 'user_progress'}
+    assert check_scan(scan, None, ('user_id',)) == ['Seq Scan']
+
+
+def test_unrelated_index_with_filter_fails():
+    # What enable_seqscan = off produces when no suitable index exists
+    scan = index_scan('user_progress_pkey', filter="((user_id = '1'::bigint) AND (skill = 'lesen'::text))")
+    problems = check_scan(scan, 'idx_user_progress_user_skill_completed_id', ('user_id', 'skill'))
+    assert problems == [
+        'uses user_progress_pkey instead of idx_user_progress_user_skill_completed_id',
+        'user_id, skill not in Index Cond',
+        'Filter on user_id, skill',
+    ]
+
+
+def test_column_re_checked_by_filter_fails():
+    scan = index_scan('idx_user_progress_user_completed', "(user_id = '1'::bigint)", filter="(skill = 'lesen'::text)")
+    assert check_scan(scan, None, ('user_id', 'skill')) == ['skill not in Index Cond', 'Filter on skill']
+
+
+def test_bitmap_scan_uses_its_child_index():
+    scan = {
+        'Node Type': 'Bitmap Heap Scan', 'Relation Name': 'user_progress',
+        'Plans': [{'Node Type': 'Bitmap Index Scan', 'Index Name': 'idx_user_progress_user_completed',
+                   'Index Cond': "(user_id = '1'::bigint)"}]
+    }
+    assert check_scan(scan, 'idx_user_progress_user_completed', ('user_id',)) == []
+
+
+def test_id_does_not_match_user_id():
+    scan = index_scan('users_pkey', "(user_id = '1'::bigint)")
+    assert check_scan(scan, 'users_pkey', ('id',)) == ['id not in Index Cond']
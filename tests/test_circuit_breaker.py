@@ -0,0 +1,109 @@
+"""Tests for the circuit breaker state machine and its use in AITutorService."""
+import asyncio
+
+import httpx
+
+from bot.services import ai_tutor as ai_tutor_module
+from bot.services.ai_tutor import AITutorService
+from bot.services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN, circuit_stats
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = dict(window=10, min_calls=4, failure_rate=0.5, reset_timeout=0.05, half_open_calls=2)
+    options.update(kwargs)
+    return CircuitBreaker('test', slow_call_seconds=1.0, **options)
+
+
+def test_opens_at_failure_rate():
+    breaker = make_breaker()
+    for _ in range(2):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # fewer than min_calls
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_success(2.0)
+    assert breaker.state == OPEN
+    assert breaker.slow_calls == 4
+
+
+def test_half_open_probes_close_the_circuit():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.allow()  # probe budget used up
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_released_probe_frees_its_slot():
+    breaker = make_breaker(half_open_calls=1)
+    for _ in range(4):
+        breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_registered_for_stats():
+    make_breaker()
+    assert circuit_stats()['test']['state'] == CLOSED
+
+
+def test_tutor_records_one_outcome_per_request(monkeypatch):
+    async def request(task, post, timeout, user_id=None):
+        # The router failed over once (503) before the second model answered
+        return httpx.Response(200, json={'choices': [{'message': {'content': 'Hallo'}}], 'usage': {}})
+
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', request)
+    tutor = AITutorService()
+
+    asyncio.run(tutor.chat('Hallo', []))
+
+    assert tutor.breaker.calls == 1
+
+
+def test_tutor_fails_fast_when_open(monkeypatch):
+    async def request(task, post, timeout, user_id=None):
+        raise httpx.ConnectError('connection refused')
+
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', request)
+    tutor = AITutorService()
+    tutor.breaker = make_breaker()
+
+    for _ in range(4):
+        asyncio.run(tutor.evaluate_writing('Text', 'Aufgabe', 'A1'))
+    assert tutor.breaker.state == OPEN
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("request sent while the circuit is open")
+
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', unexpected)
+    evaluation = asyncio.run(tutor.evaluate_writing('Text', 'Aufgabe', 'A1'))
+    assert evaluation.failed
+    assert "unavailable" in asyncio.run(tutor.chat('Hallo', []))
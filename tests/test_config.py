@@ -0,0 +1,22 @@
+"""Tests for Config.validate."""
+import pytest
+
+from bot.config import Config
+
+
+def test_placeholder_configuration_is_valid():
+    assert Config.validate()
+
+
+def test_missing_credentials_are_rejected(monkeypatch):
+    monkeypatch.setattr(Config, 'OPENROUTER_API_KEY', '')
+    with pytest.raises(ValueError, match='OPENROUTER_API_KEY'):
+        Config.validate()
+
+
+@pytest.mark.parametrize('name', ['LLM_RATE_PER_MINUTE', 'LLM_BURST', 'LLM_MAX_CONCURRENCY'])
+@pytest.mark.parametrize('value', [0, -1])
+def test_llm_limits_must_be_positive(monkeypatch, name, value):
+    monkeypatch.setattr(Config, name, value)
+    with pytest.raises(ValueError, match=name):
+        Config.validate()
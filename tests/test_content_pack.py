@@ -0,0 +1,86 @@
+"""Tests for compiled content packs and the bundled A1-B1 pack."""
+import json
+
+import pytest
+
+from bot.content import pack as pack_module
+from bot.content.pack import ContentPack, build_pack, read_source, record_id
+from bot.services.content_library import ContentLibrary, CONTENT_DIR
+
+
+def write_source(path, records):
+    path.write_text(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records), encoding='utf-8')
+    return path
+
+
+def question(key, level='A1', exam_type='lesen'):
+    return {
+        'kind': 'question', 'key': key, 'level': level, 'exam_type': exam_type,
+        'question_text': f'Frage {key}', 'question_data': {'options': ['A) ja', 'B) nein']},
+        'correct_answer': 'A', 'difficulty': 3
+    }
+
+
+def lesson(key):
+    return {'kind': 'lesson', 'key': key, 'level': 'A1', 'skill': 'lesen', 'title': 'Begrüßung', 'content': 'Hallo!'}
+
+
+def test_round_trip_reads_only_the_requested_group(tmp_path, monkeypatch):
+    monkeypatch.setattr(pack_module, 'BLOCK_RECORDS', 2)
+    source = write_source(tmp_path / 'test.jsonl', [
+        {'kind': 'pack', 'name': 'test', 'version': 2},
+        *[question(f'a1-lesen-{i}') for i in range(5)],
+        question('a2-lesen-1', level='A2'),
+        lesson('a1-lesson-1'),
+    ])
+    pack = ContentPack(build_pack(source))
+    try:
+        assert pack.name == 'test'
+        assert pack.index['records'] == 7
+        assert pack.count('question', 'A1', 'lesen') == 5
+        # 5 records at 2 per block
+        assert sum(1 for b in pack.index['blocks'] if b['level'] == 'A1' and b['kind'] == 'question') == 3
+        keys = [r['key'] for r in pack.records('question', 'A1', 'lesen')]
+        assert keys == [f'a1-lesen-{i}' for i in range(5)]
+        assert [r['key'] for r in pack.records('lesson')] == ['a1-lesson-1']
+        assert next(pack.records('question', 'A2'))['question_text'] == 'Frage a2-lesen-1'
+    finally:
+        pack.close()
+
+
+def test_record_ids_are_stable():
+    assert record_id(question('a1-lesen-1')) == record_id(question('a1-lesen-1'))
+    assert record_id(question('a1-lesen-1')) != record_id(question('a1-lesen-2'))
+    assert record_id({**question('x'), 'id': 'fixed'}) == 'fixed'
+
+
+@pytest.mark.parametrize('records, error', [
+    ([{'kind': 'quiz', 'key': 'x'}], 'unknown record kind'),
+    ([{**question('x'), 'question_text': ''}], 'missing question_text'),
+    ([question('x'), question('x')], 'duplicate key'),
+])
+def test_invalid_sources_are_rejected(tmp_path, records, error):
+    with pytest.raises(ValueError, match=error):
+        read_source(write_source(tmp_path / 'bad.jsonl', records))
+
+
+def test_not_a_pack(tmp_path):
+    path = tmp_path / 'bad.egpack'
+    path.write_bytes(b'NOPE' + bytes(16))
+    with pytest.raises(ValueError, match='not a content pack'):
+        ContentPack(path)
+
+
+def test_library_rebuilds_stale_packs(tmp_path):
+    write_source(tmp_path / 'test.jsonl', [question('a1-lesen-1')])
+    library = ContentLibrary(tmp_path)
+    assert [q.question_text for q in library.questions('A1', 'lesen')] == ['Frage a1-lesen-1']
+    assert (tmp_path / 'test.egpack').exists()
+    assert library.questions('B1', 'lesen') == []
+
+
+def test_bundled_pack_is_valid():
+    meta, records = read_source(CONTENT_DIR / 'a1_b1.jsonl')
+    assert meta['name'] == 'a1_b1'
+    levels = {r['level'] for r in records if r['kind'] == 'question'}
+    assert levels == {'A1', 'A2', 'B1'}
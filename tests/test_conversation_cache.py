@@ -0,0 +1,112 @@
+"""Tests for the resume warm cache and the prompt size of resumed sessions."""
+import asyncio
+
+import httpx
+import pytest
+
+from bot.config import Config
+from bot.services import ai_tutor as ai_tutor_module
+from bot.services import conversation_cache as conversation_cache_module
+from bot.services.ai_tutor import AITutorService
+from bot.services.conversation_cache import ConversationCache, summarize_history
+
+
+def turns(count, session_id='s1', skill='schreiben'):
+    """Alternating student/tutor rows as get_conversation_history returns them (oldest first)."""
+    return [
+        {
+            'session_id': session_id,
+            'skill': skill,
+            'role': 'user' if i % 2 == 0 else 'assistant',
+            'content': f"Nachricht {i}: " + ('Ich habe gestern einen langen Brief an meine Vermieterin geschrieben. ' * 4)
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def history(monkeypatch):
+    rows = []
+
+    async def get_conversation_history(user_id, limit=10, since=None):
+        return rows[-limit:]
+
+    monkeypatch.setattr(conversation_cache_module.db, 'get_conversation_history', get_conversation_history)
+    return rows
+
+
+def test_hydration_restores_the_sessions_skill(history):
+    history.extend(turns(2, 'old', 'lesen') + turns(6, 's1', 'schreiben'))
+    session = asyncio.run(ConversationCache(window=20).load(1))
+
+    assert session.session_id == 's1'
+    assert session.skill == 'schreiben'
+    assert len(session.messages) == 6
+
+
+def test_rows_without_skill_resume_as_conversation(history):
+    history.extend(turns(2, skill=None))
+    assert asyncio.run(ConversationCache().load(1)).skill == 'conversation'
+
+
+def test_hydrates_once_then_serves_from_memory(history):
+    history.extend(turns(2))
+    cache = ConversationCache()
+    asyncio.run(cache.load(1))
+    history.clear()
+
+    assert len(asyncio.run(cache.load(1)).messages) == 2
+
+
+def test_evicts_least_recently_used_user():
+    cache = ConversationCache(max_users=2)
+    cache.start(1, 'a', 'lesen')
+    cache.start(2, 'b', 'lesen')
+    cache.get(1)
+    cache.start(3, 'c', 'lesen')
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_resumed_session_sends_fewer_prompt_tokens(history, monkeypatch):
+    history.extend(turns(Config.RESUME_HISTORY_WINDOW))
+    sent = []
+
+    class Client:
+        def __init__(self, timeout):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def post(self, url, headers, json):
+            sent.append(json['messages'])
+            return httpx.Response(200, json={'choices': [{'message': {'content': 'Gut!'}}], 'usage': {}})
+
+    async def request(task, post, timeout, user_id=None):
+        return await post('model', timeout)
+
+    monkeypatch.setattr(ai_tutor_module.httpx, 'AsyncClient', Client)
+    monkeypatch.setattr(ai_tutor_module.model_router, 'request', request)
+    tutor = AITutorService()
+    recent = list(asyncio.run(ConversationCache(window=Config.RESUME_HISTORY_WINDOW).load(1)).messages)
+    keep = Config.RESUME_VERBATIM_MESSAGES
+
+    # Before: the returning student's recent turns replayed verbatim
+    asyncio.run(tutor.chat('Weiter geht es.', recent))
+    # After: the last few turns verbatim, older ones as a digest in the system prompt
+    summary = summarize_history(recent[:-keep])
+    asyncio.run(tutor.chat('Weiter geht es.', recent[-keep:], session_summary=summary))
+
+    def prompt_tokens(messages):
+        # ~4 characters per token for German text
+        return sum(len(message['content']) for message in messages) // 4
+
+    replayed, resumed = (prompt_tokens(messages) for messages in sent)
+    assert summary and summary.splitlines()[-1] in sent[1][0]['content']
+    assert len(sent[1]) == keep + 2  # system prompt, verbatim turns, new message
+    assert resumed < replayed * 0.8
@@ -0,0 +1,301 @@
+"""Tests for DatabaseService: write retries by fault injection, exam history paging and the statistics RPC (PostgREST is stubbed)."""
+import re
+import time
+import random
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from bot.config import Config
+from bot.services.database import DatabaseService
+
+
+class FlakyQuery:
+    """Query builder stub whose execute() fails `failures` times, then succeeds."""
+
+    def __init__(self, failures: int, error: Exception = None):
+        self.failures = failures
+        self.error = error or httpx.ConnectError('connection reset')
+        self.sent = []
+        self.data = None
+
+    def upsert(self, data, **kwargs):
+        self.data = data
+        return self
+
+    def update(self, data):
+        self.data = data
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        self.sent.append(dict(self.data))
+        if len(self.sent) <= self.failures:
+            raise self.error
+        return SimpleNamespace(data=[self.data])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(Config, 'DB_RETRY_BASE_DELAY', 0.01)
+    monkeypatch.setattr(Config, 'DB_RETRY_MAX_DELAY', 0.01)
+    service = DatabaseService()
+    service.breaker.min_calls = 100  # keep the circuit out of the way
+    return service
+
+
+def stub(service, query):
+    service.client = SimpleNamespace(table=lambda name: query)
+
+
+def test_retries_transient_errors_with_same_idempotency_key(service):
+    query = FlakyQuery(failures=2)
+    stub(service, query)
+
+    row = asyncio.run(service.create_exam_attempt(1, 'lesen', 'A1'))
+
+    assert row is not None
+    assert len(query.sent) == 3
+    assert len({sent['id'] for sent in query.sent}) == 1  # every retry upserts the same row
+
+
+def test_gives_up_after_max_attempts(service):
+    query = FlakyQuery(failures=10)
+    stub(service, query)
+
+    assert asyncio.run(service.save_progress(1, 'lesen', 'exercise', 80.0)) is None
+    assert len(query.sent) == Config.DB_WRITE_ATTEMPTS
+
+
+def test_does_not_retry_query_errors(service):
+    query = FlakyQuery(failures=1, error=ValueError('violates check constraint'))
+    stub(service, query)
+
+    assert asyncio.run(service.save_conversation(1, 's', 'user', 'Hallo')) is None
+    assert len(query.sent) == 1
+
+
+def test_deadline_cuts_retries_short(service, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_RETRY_BASE_DELAY', 0.05)
+    monkeypatch.setattr(Config, 'DB_RETRY_MAX_DELAY', 0.05)
+    monkeypatch.setattr('random.uniform', lambda low, high: high)
+    query = FlakyQuery(failures=10)
+    stub(service, query)
+
+    started = time.monotonic()
+    result = asyncio.run(service.update_exam_attempt(
+        'attempt', [], score=50.0, is_completed=True, deadline=time.monotonic() + 0.08
+    ))
+
+    assert result is None
+    assert len(query.sent) == 2  # the second backoff would end past the deadline
+    assert time.monotonic() - started < 0.15
+
+
+class LossyTable:
+    """
+    Table stub that drops about `drop_rate` of requests. Half of the drops lose
+    the request (nothing written), half lose the response after the upsert was
+    applied, which is the case idempotency keys exist for.
+    """
+
+    def __init__(self, drop_rate: float = 0.1, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.drop_rate = drop_rate
+        self.rows = {}
+        self.upserts = 0
+        self.lost_requests = 0
+        self.lost_responses = 0
+
+    def upsert(self, data, on_conflict='id'):
+        table = self
+
+        class Query:
+            def execute(self):
+                roll = table.rng.random()
+                if roll < table.drop_rate / 2:
+                    table.lost_requests += 1
+                    raise httpx.ConnectError('connection reset')
+                table.upserts += 1
+                table.rows[data[on_conflict]] = dict(data)
+                if roll < table.drop_rate:
+                    table.lost_responses += 1
+                    raise httpx.ReadTimeout('response lost')
+                return SimpleNamespace(data=[dict(data)])
+
+        return Query()
+
+
+def test_writes_persist_exactly_once_when_10_percent_of_requests_drop(service):
+    table = LossyTable()
+    service.client = SimpleNamespace(table=lambda name: table)
+
+    async def run():
+        attempts = [service.create_exam_attempt(user_id, 'lesen', 'A1') for user_id in range(250)]
+        progress = [service.save_progress(user_id, 'lesen', 'exercise', 75.0) for user_id in range(250)]
+        return await asyncio.gather(*attempts, *progress)
+
+    results = asyncio.run(run())
+
+    assert table.lost_requests > 0 and table.lost_responses > 0
+    assert all(result is not None for result in results)
+    # One row per write, although lost responses made some writes land twice
+    assert len(table.rows) == 500
+    assert table.upserts == 500 + table.lost_responses
+    returned_ids = [r['id'] if isinstance(r, dict) else r.id for r in results]
+    assert sorted(returned_ids) == sorted(table.rows)
+
+
+class RpcQuery:
+    """RPC call stub returning a fixed payload."""
+
+    def __init__(self, data=None, error=None):
+        self.payload = data
+        self.error = error
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=self.payload)
+
+
+def stub_rpc(service, query):
+    calls = []
+
+    def rpc(name, params):
+        calls.append((name, params))
+        return query
+
+    service.client = SimpleNamespace(rpc=rpc)
+    return calls
+
+
+def test_statistics_come_from_the_rpc(service):
+    calls = stub_rpc(service, RpcQuery({
+        'total_activities': 12,
+        'average_score': '71.5',
+        'skill_scores': {'lesen': 80, 'schreiben': None},
+        'weak_areas': ['Dativ', 'Perfekt'],
+        'strengths': ['lesen']
+    }))
+
+    stats = asyncio.run(service.get_user_statistics(7))
+
+    assert calls == [('get_user_statistics', {'p_user_id': 7})]
+    assert stats == {
+        'total_activities': 12,
+        'average_score': 71.5,
+        'skill_scores': {'lesen': 80.0, 'schreiben': 0.0},
+        'weak_areas': ['Dativ', 'Perfekt'],
+        'strengths': ['lesen']
+    }
+
+
+@pytest.mark.parametrize('query', [
+    RpcQuery(None),
+    RpcQuery({'total_activities': 0}),
+    RpcQuery(error=httpx.ConnectError('connection reset')),
+])
+def test_statistics_default_to_empty(service, query):
+    stub_rpc(service, query)
+    stats = asyncio.run(service.get_user_statistics(7))
+    assert stats == {
+        'total_activities': 0, 'average_score': 0, 'skill_scores': {}, 'weak_areas': [], 'strengths': []
+    }
+
+
+class HistoryQuery:
+    """exam_attempts query stub that applies the keyset filter, order and limit to `rows`."""
+
+    KEYSET = re.compile(r'completed_at\.(lt|gt)\."([^"]+)",and\(completed_at\.eq\."\2",id\.\1\.(.+)\)')
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.orders = []
+        self.limits = []
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def or_(self, expression):
+        self.filters.append(expression)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.limits.append(count)
+        return self
+
+    def execute(self):
+        rows = [(row['completed_at'], row['id']) for row in self.rows]
+        if self.filters:
+            op, value, row_id = self.KEYSET.fullmatch(self.filters[-1]).groups()
+            rows = [key for key in rows if (key > (value, row_id) if op == 'gt' else key < (value, row_id))]
+        rows.sort(reverse=self.orders[-1][1])
+        return SimpleNamespace(data=[{'completed_at': at, 'id': row_id} for at, row_id in rows[:self.limits[-1]]])
+
+
+@pytest.fixture
+def history(service):
+    # 25 attempts, two per day so pages split rows with equal completed_at
+    rows = [
+        {'completed_at': f'2025-01-{i // 2 + 1:02d}T10:00:00+00:00', 'id': f'{i:08d}-0000-0000-0000-000000000000'}
+        for i in range(25)
+    ]
+    query = HistoryQuery(rows)
+    stub(service, query)
+    newest_first = sorted(rows, key=lambda row: (row['completed_at'], row['id']), reverse=True)
+    return query, newest_first
+
+
+def key(row):
+    return row['completed_at'], row['id']
+
+
+def test_keyset_filter_pages_by_completed_at_then_id():
+    cursor = ('2025-01-05T10:00:00+00:00', 'abc')
+    assert DatabaseService._keyset_filter(cursor, 'lt') == \
+        'completed_at.lt."2025-01-05T10:00:00+00:00",and(completed_at.eq."2025-01-05T10:00:00+00:00",id.lt.abc)'
+    assert DatabaseService._keyset_filter(cursor, 'gt') == \
+        'completed_at.gt."2025-01-05T10:00:00+00:00",and(completed_at.eq."2025-01-05T10:00:00+00:00",id.gt.abc)'
+
+
+def test_history_pages_walk_older_to_the_end(service, history):
+    query, newest_first = history
+
+    first, has_more = asyncio.run(service.get_exam_history_page(1, limit=10))
+    assert first == newest_first[:10] and has_more
+    assert query.filters == [] and query.limits == [11]  # one extra row tells if another page exists
+
+    second, has_more = asyncio.run(service.get_exam_history_page(1, cursor=key(first[-1]), limit=10))
+    assert second == newest_first[10:20] and has_more
+    assert query.filters[-1] == DatabaseService._keyset_filter(key(first[-1]), 'lt')
+    assert query.orders[-2:] == [('completed_at', True), ('id', True)]
+
+    last, has_more = asyncio.run(service.get_exam_history_page(1, cursor=key(second[-1]), limit=10))
+    assert last == newest_first[20:] and not has_more
+
+
+def test_newer_pages_are_returned_newest_first(service, history):
+    query, newest_first = history
+
+    page, has_more = asyncio.run(service.get_exam_history_page(1, cursor=key(newest_first[15]), newer=True, limit=10))
+
+    # Fetched oldest first from the cursor, then reversed for display
+    assert query.filters[-1] == DatabaseService._keyset_filter(key(newest_first[15]), 'gt')
+    assert query.orders[-2:] == [('completed_at', False), ('id', False)]
+    assert page == newest_first[5:15] and has_more
+
+    page, has_more = asyncio.run(service.get_exam_history_page(1, cursor=key(newest_first[10]), newer=True, limit=10))
+    assert page == newest_first[:10] and not has_more
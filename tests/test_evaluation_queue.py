@@ -0,0 +1,181 @@
+"""Tests for EvaluationQueue with a stub examiner and database."""
+import time
+import asyncio
+import sqlite3
+
+import pytest
+
+from bot.config import Config
+from bot.services import evaluation_queue as evaluation_queue_module
+from bot.services.evaluation_queue import EvaluationQueue
+from bot.services.models import Evaluation
+
+
+class StubExaminer:
+    """Answers every evaluation after `latency` seconds, tracking concurrency."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.running = 0
+        self.peak = 0
+
+    async def evaluate_writing(self, user_text, prompt, level, user_id=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.running -= 1
+        return Evaluation({'grammar': 80.0}, overall_score=80.0, suggestions=('Artikel üben',))
+
+
+class StubDatabase:
+    def __init__(self):
+        self.progress = {}
+        self.writes = []
+        self.fail_next = 0
+        self.unsaved_attempts = 0
+        self.unsaved_progress = 0
+
+    async def update_exam_attempt(self, attempt_id, answers, score=None, is_completed=False):
+        # DatabaseService logs write errors and returns None
+        if self.unsaved_attempts:
+            self.unsaved_attempts -= 1
+            return None
+        return {'id': attempt_id}
+
+    async def save_progress(self, user_id, skill, activity_type, score, weak_areas=None, progress_id=None):
+        if self.unsaved_progress:
+            self.unsaved_progress -= 1
+            return None
+        # The row lands even when the caller then crashes (lost response, restart)
+        self.writes.append(progress_id)
+        self.progress[progress_id] = score
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError('connection lost after write')
+        return progress_id
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    examiner, database = StubExaminer(), StubDatabase()
+    monkeypatch.setattr(evaluation_queue_module, 'ai_tutor', examiner)
+    monkeypatch.setattr(evaluation_queue_module, 'db', database)
+    monkeypatch.setattr(Config, 'EVALUATION_RETRY_BASE', 0.01)
+    return examiner, database
+
+
+def submit(queue, user_id=1):
+    return queue.submit(user_id, user_id, 'schreiben', 'A1', 'Schreiben Sie eine E-Mail.', 'q1', 'attempt', 'Hallo Anna')
+
+
+async def run_until_delivered(queue, count, timeout=10.0):
+    delivered = []
+    done = asyncio.Event()
+
+    async def deliver(job, evaluation):
+        delivered.append((job, evaluation))
+        if len(delivered) >= count:
+            done.set()
+
+    queue.start(deliver)
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+    finally:
+        await queue.stop()
+    return delivered
+
+
+def test_throughput_under_100_simultaneous_submissions(stubs):
+    examiner, database = stubs
+    queue = EvaluationQueue(path=':memory:', workers=10)
+
+    async def run():
+        for user_id in range(100):
+            submit(queue, user_id)
+        started = time.monotonic()
+        delivered = await run_until_delivered(queue, 100)
+        return delivered, time.monotonic() - started
+
+    delivered, elapsed = asyncio.run(run())
+
+    assert len(delivered) == 100 and all(evaluation is not None for _, evaluation in delivered)
+    assert examiner.peak == 10
+    # 100 x 50 ms on 10 workers is ~0.5 s; one at a time would take 5 s
+    assert elapsed < 2.0
+    assert len(database.progress) == 100
+    assert queue.stats()['pending'] == 0 and queue.stats()['completed'] == 100
+
+
+def test_retry_after_writing_reuses_the_progress_row(stubs):
+    examiner, database = stubs
+    database.fail_next = 1
+    queue = EvaluationQueue(path=':memory:', workers=1)
+    submit(queue)
+
+    delivered = asyncio.run(run_until_delivered(queue, 1))
+
+    assert delivered[0][1] is not None
+    assert len(database.writes) == 2
+    assert len(set(database.writes)) == 1
+    assert len(database.progress) == 1
+
+
+@pytest.mark.parametrize('unsaved', ['unsaved_attempts', 'unsaved_progress'])
+def test_unsaved_result_is_retried_not_dropped(stubs, unsaved):
+    examiner, database = stubs
+    setattr(database, unsaved, 1)
+    queue = EvaluationQueue(path=':memory:', workers=1)
+    submit(queue)
+
+    delivered = asyncio.run(run_until_delivered(queue, 1))
+
+    assert delivered[0][1] is not None
+    assert delivered[0][0].attempts == 2
+    assert len(database.progress) == 1
+    assert queue.stats()['completed'] == 1 and queue.stats()['failed'] == 0
+
+
+def test_job_interrupted_by_restart_keeps_its_progress_key(stubs, tmp_path):
+    examiner, database = stubs
+    path = str(tmp_path / 'evaluations.db')
+    crashed = EvaluationQueue(path=path, workers=1)
+    submit(crashed)
+    job = crashed._claim()  # claimed, then the process died
+
+    restarted = EvaluationQueue(path=path, workers=1)
+    delivered = asyncio.run(run_until_delivered(restarted, 1))
+
+    assert delivered[0][0].progress_id == job.progress_id
+    assert database.writes == [job.progress_id]
+
+
+def test_purges_old_failed_jobs(stubs):
+    queue = EvaluationQueue(path=':memory:', workers=1)
+    old, recent = submit(queue), submit(queue)
+    queue._conn.execute("UPDATE evaluation_jobs SET status = 'failed'")
+    queue._conn.execute("UPDATE evaluation_jobs SET created_at = created_at - 30 * 86400 WHERE id = ?", (old,))
+
+    assert queue.purge() == 1
+    assert [row[0] for row in queue._conn.execute("SELECT id FROM evaluation_jobs")] == [recent]
+
+
+def test_adds_progress_key_to_old_queue_files(tmp_path):
+    path = str(tmp_path / 'evaluations.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE evaluation_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, chat_id INTEGER NOT NULL,
+            exam_type TEXT NOT NULL, level TEXT NOT NULL, prompt TEXT NOT NULL, question_id TEXT,
+            attempt_id TEXT, user_text TEXT NOT NULL, metrics TEXT, status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0, next_run_at REAL NOT NULL, last_error TEXT,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+    queue = EvaluationQueue(path=path, workers=1)
+    submit(queue)
+    assert queue._claim().progress_id
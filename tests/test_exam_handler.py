@@ -0,0 +1,123 @@
+"""Tests for the objective exam answer flow against a stub Telegram API (database calls are stubbed)."""
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.config import Config
+from bot.services import speech as speech_module
+from bot.services.speech import SpeechService
+from bot.services.models import ExamQuestion
+
+# The exam handlers import speech_service; a worker socket keeps it from loading a model
+if speech_module._speech_service is None:
+    speech_module._speech_service = SpeechService(worker_sockets=['unused.sock'])
+
+from bot.handlers import exam  # noqa: E402
+
+API_LATENCY = 0.02  # seconds per Telegram API call
+
+
+class FakeQuery:
+    """Callback query recording the Bot API calls a handler makes."""
+
+    def __init__(self):
+        self.data = ''
+        self.from_user = SimpleNamespace(id=42)
+        self.calls = []
+        self.messages = []
+
+    async def answer(self):
+        self.calls.append('answer')
+        await asyncio.sleep(API_LATENCY)
+
+    async def edit_message_text(self, text, **kwargs):
+        self.calls.append('edit')
+        self.messages.append(text)
+        await asyncio.sleep(API_LATENCY)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.progress = []
+
+    async def update_exam_attempt(self, *args, **kwargs):
+        return True
+
+    async def save_progress(self, **kwargs):
+        self.progress.append(kwargs)
+        return True
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(exam, 'db', database)
+    return database
+
+
+def start_exam(count):
+    questions = [
+        ExamQuestion(
+            f'q{i}', 'A1', 'lesen', f'Frage {i}',
+            {'options': ['ja', 'nein'], 'explanation': 'Siehe_Text'}, 'A'
+        )
+        for i in range(count)
+    ]
+    return SimpleNamespace(user_data={
+        'exam_type': 'lesen',
+        'questions': questions,
+        'total_questions': count,
+        'answers': [],
+        'current_question': 0,
+        'current_question_data': questions[0],
+        'rendered_questions': exam.render_objective_questions(questions),
+    })
+
+
+async def take_exam(context, answers):
+    """Answer every question, tapping 'Next' when the step-by-step flow asks for it."""
+    query = FakeQuery()
+    update = SimpleNamespace(callback_query=query)
+    for answer in answers:
+        query.data = f'answer_{answer}'
+        await exam.handle_objective_answer(update, context)
+        if not Config.EXAM_FAST_FEEDBACK:
+            query.data = 'next_question'
+            await exam.next_question(update, context)
+    return query
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_answers_and_results_are_the_same_in_both_flows(database, monkeypatch, fast):
+    monkeypatch.setattr(Config, 'EXAM_FAST_FEEDBACK', fast)
+    context = start_exam(3)
+    answers = context.user_data['answers']  # user_data is cleared with the results
+    query = asyncio.run(take_exam(context, ['A', 'B', 'A']))
+
+    assert [a.is_correct for a in answers] == [True, False, True]
+    assert database.progress[0]['score'] == pytest.approx(200 / 3, abs=0.1)
+    assert 'Frage 2' not in query.messages[-1]
+
+
+def test_fast_feedback_takes_one_edit_per_answer(database, monkeypatch):
+    monkeypatch.setattr(Config, 'EXAM_FAST_FEEDBACK', True)
+    query = asyncio.run(take_exam(start_exam(10), ['A'] * 10))
+
+    assert query.calls == ['answer', 'edit'] * 10
+    # Feedback sits above the next question, with the explanation escaped for Markdown
+    assert query.messages[0].startswith('*Richtig!*\nSiehe\\_Text\n\n')
+    assert 'Frage 1' in query.messages[0]
+
+
+def test_fast_feedback_halves_api_round_trips(database, monkeypatch):
+    timings = {}
+    for fast in (True, False):
+        monkeypatch.setattr(Config, 'EXAM_FAST_FEEDBACK', fast)
+        started = time.perf_counter()
+        query = asyncio.run(take_exam(start_exam(10), ['A'] * 10))
+        timings[fast] = (len(query.calls), time.perf_counter() - started)
+
+    assert timings[True][0] * 2 == timings[False][0]
+    assert timings[True][1] < timings[False][1]
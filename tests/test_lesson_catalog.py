@@ -0,0 +1,74 @@
+"""Tests for LessonCatalog reloads (database calls are stubbed)."""
+import asyncio
+
+import pytest
+
+from bot.services import lesson_catalog as lesson_catalog_module
+from bot.services.lesson_catalog import LessonCatalog
+
+
+def lesson(lesson_id, title='Begrüßung'):
+    return {'id': lesson_id, 'level': 'A1', 'skill': 'lesen', 'topic': 'Alltag', 'title': title}
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.version = '1:2025-01-01'
+        self.rows = [lesson('db-1')]
+
+    async def get_lessons_version(self):
+        return self.version
+
+    async def get_lesson_catalog(self, limit):
+        return self.rows
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(lesson_catalog_module, 'db', database)
+    monkeypatch.setattr(lesson_catalog_module.content_library, 'lessons', lambda: [lesson('pack-1', 'Zahlen')])
+    return database
+
+
+def ids(catalog):
+    return sorted(l['id'] for l in asyncio.run(catalog.lessons('A1', 'lesen')))
+
+
+def test_loads_database_and_bundled_lessons(database):
+    assert ids(LessonCatalog(check_interval=0)) == ['db-1', 'pack-1']
+
+
+def test_reloads_when_version_changes(database):
+    catalog = LessonCatalog(check_interval=0)
+    ids(catalog)
+    database.version, database.rows = '2:2025-01-02', [lesson('db-1'), lesson('db-2')]
+    assert ids(catalog) == ['db-1', 'db-2', 'pack-1']
+
+
+def test_unreachable_database_keeps_the_catalog(database):
+    catalog = LessonCatalog(check_interval=0)
+    ids(catalog)
+    database.version = None
+    assert ids(catalog) == ['db-1', 'pack-1']
+    asyncio.run(catalog.refresh(force=True))
+    assert ids(catalog) == ['db-1', 'pack-1']
+
+
+def test_failed_fetch_keeps_the_catalog_and_retries(database):
+    catalog = LessonCatalog(check_interval=0)
+    ids(catalog)
+    database.version, database.rows = '2:2025-01-02', None
+    assert ids(catalog) == ['db-1', 'pack-1']
+
+    database.rows = [lesson('db-2')]
+    assert ids(catalog) == ['db-2', 'pack-1']
+
+
+def test_first_load_without_database_serves_bundled_lessons(database):
+    catalog = LessonCatalog(check_interval=0)
+    database.version = None
+    assert ids(catalog) == ['pack-1']
+
+    database.version = '1:2025-01-01'
+    assert ids(catalog) == ['db-1', 'pack-1']
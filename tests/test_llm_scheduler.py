@@ -0,0 +1,118 @@
+"""Tests for LLMScheduler ordering and rate-limit handling (provider calls are stubbed)."""
+import asyncio
+
+import httpx
+
+from bot.services.llm_scheduler import (
+    LLMScheduler, retry_after_seconds, PRIORITY_CHAT, PRIORITY_EVALUATION, PRIORITY_GENERATION
+)
+
+
+def scheduler(**kwargs):
+    options = {'rate_per_minute': 60_000, 'burst': 100, 'max_concurrency': 1, 'max_attempts': 3}
+    options.update(kwargs)
+    return LLMScheduler(**options)
+
+
+async def dispatch_order(sched, requests):
+    """Hold the single slot with a blocker, queue (label, priority, user) requests, return send order."""
+    order = []
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+        return httpx.Response(200)
+
+    def sender(label):
+        async def send():
+            order.append(label)
+            return httpx.Response(200)
+        return send
+
+    first = asyncio.create_task(sched.submit(blocker))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(sched.submit(sender(label), priority, user)) for label, priority, user in requests]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *queued)
+    return order
+
+
+def test_more_urgent_classes_go_first():
+    order = asyncio.run(dispatch_order(scheduler(), [
+        ('generation', PRIORITY_GENERATION, None),
+        ('evaluation', PRIORITY_EVALUATION, 1),
+        ('chat', PRIORITY_CHAT, 2),
+    ]))
+    assert order == ['chat', 'evaluation', 'generation']
+
+
+def test_users_take_turns_within_a_class():
+    order = asyncio.run(dispatch_order(scheduler(), [
+        ('a1', PRIORITY_CHAT, 1),
+        ('a2', PRIORITY_CHAT, 1),
+        ('a3', PRIORITY_CHAT, 1),
+        ('b1', PRIORITY_CHAT, 2),
+    ]))
+    assert order == ['a1', 'b1', 'a2', 'a3']
+
+
+def test_rate_limited_request_is_retried_after_the_pause():
+    sched = scheduler()
+    responses = [httpx.Response(429, headers={'Retry-After': '0.05'}), httpx.Response(200)]
+
+    async def send():
+        return responses.pop(0)
+
+    async def run():
+        return await sched.submit(send)
+
+    assert asyncio.run(run()).status_code == 200
+    assert sched.rate_limited == 1
+    assert sched.dispatched == 2
+
+
+def test_rate_limit_gives_up_after_max_attempts():
+    sched = scheduler(max_attempts=2)
+    sent = []
+
+    async def send():
+        sent.append(1)
+        return httpx.Response(429, headers={'Retry-After': '0'})
+
+    async def run():
+        return await sched.submit(send)
+
+    assert asyncio.run(run()).status_code == 429
+    assert len(sent) == 2
+
+
+def test_cancelled_request_leaves_the_queue():
+    sched = scheduler()
+
+    async def run():
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return httpx.Response(200)
+
+        first = asyncio.create_task(sched.submit(blocker))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(sched.submit(blocker, PRIORITY_GENERATION))
+        await asyncio.sleep(0)
+        assert sched.stats()['queued']['generation'] == 1
+        waiting.cancel()
+        await asyncio.sleep(0)
+        assert sched.stats()['queued']['generation'] == 0
+        release.set()
+        await first
+
+    asyncio.run(run())
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(httpx.Response(429, headers={'Retry-After': '7'}), 10.0) == 7.0
+    assert retry_after_seconds(httpx.Response(429, headers={'Retry-After': 'soon'}), 10.0) == 10.0
+    assert retry_after_seconds(httpx.Response(429), 10.0) == 10.0
+    assert retry_after_seconds(httpx.Response(429, headers={'X-RateLimit-Reset': '0'}), 10.0) == 0.0
@@ -0,0 +1,143 @@
+"""Tests for mock exam scoring and pipelining (question loading and the examiner are stubbed)."""
+import time
+import asyncio
+
+import pytest
+
+from bot.services import mock_exam as mock_exam_module
+from bot.services.mock_exam import MockExamSession
+from bot.services.models import Answer, Evaluation, ExamQuestion
+
+QUESTION_LATENCY = 0.05  # database / generation time per section
+EVALUATION_LATENCY = 0.08  # examiner time per subjective answer
+ANSWER_TIME = 0.05  # the student working through a section
+
+
+class StubEngine:
+    """Loads one question per section after QUESTION_LATENCY; `empty` sections have none."""
+
+    def __init__(self, empty=()):
+        self.empty = empty
+
+    async def get_exam_questions(self, level, section):
+        await asyncio.sleep(QUESTION_LATENCY)
+        if section in self.empty:
+            return []
+        return [ExamQuestion(f'{section}-1', level, section, f'Aufgabe {section}')]
+
+
+class StubTutor:
+    """Returns the configured evaluation per section after EVALUATION_LATENCY."""
+
+    def __init__(self, evaluations):
+        self.evaluations = evaluations
+
+    async def evaluate_writing(self, user_text, prompt, level, user_id=None):
+        await asyncio.sleep(EVALUATION_LATENCY)
+        return self.evaluations['schreiben']
+
+    async def evaluate_speaking(self, user_text, prompt, level, metrics=None, user_id=None):
+        await asyncio.sleep(EVALUATION_LATENCY)
+        return self.evaluations['sprechen']
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def install(evaluations=None, empty=()):
+        engine = StubEngine(empty)
+        monkeypatch.setattr(mock_exam_module.exam_engine, 'get_exam_questions', engine.get_exam_questions)
+        evaluations = {
+            'schreiben': Evaluation({}, overall_score=80),
+            'sprechen': Evaluation({}, overall_score=80),
+            **(evaluations or {})
+        }
+        tutor = StubTutor(evaluations)
+        monkeypatch.setattr(mock_exam_module, 'ai_tutor', tutor)
+        return engine, tutor
+    return install
+
+
+def answers(score):
+    """Ten objective answers, `score` percent of them correct."""
+    return [Answer(f'q{i}', 'A', 'A', is_correct=i < score // 10) for i in range(10)]
+
+
+async def take_mock_exam(scores):
+    """Walk a session through every section like the exam handler does."""
+    session = MockExamSession('A1')
+    session.start()
+    while not session.is_finished:
+        questions = await session.questions()
+        await asyncio.sleep(ANSWER_TIME)
+        if not questions:
+            session.skip_section()
+        elif session.section in MockExamSession.SUBJECTIVE_SECTIONS:
+            session.complete_subjective(questions[0], 'Meine Antwort')
+        else:
+            session.complete_objective(answers(scores.get(session.section, 80)))
+    return await session.finish()
+
+
+async def take_sequentially(engine, tutor):
+    """Naive baseline: load each section when reached and wait for each evaluation."""
+    for section in MockExamSession.SECTIONS:
+        questions = await engine.get_exam_questions('A1', section)
+        await asyncio.sleep(ANSWER_TIME)
+        if section == 'schreiben':
+            await tutor.evaluate_writing('Meine Antwort', questions[0].prompt, 'A1')
+        elif section == 'sprechen':
+            await tutor.evaluate_speaking('Meine Antwort', questions[0].prompt, 'A1')
+
+
+def test_all_sections_weighted(stub):
+    stub()
+    report = asyncio.run(take_mock_exam({}))
+    assert report['score'] == 80
+    assert report['complete'] and report['passed']
+
+
+def test_skipped_section_is_not_scored_as_zero(stub):
+    stub(empty=('vokabular',))
+    report = asyncio.run(take_mock_exam({}))
+    assert 'vokabular' not in report['section_scores']
+    assert report['skipped'] == ['vokabular']
+    assert report['score'] == 80  # weights spread over the sections taken
+    assert not report['complete']
+    assert not report['passed']
+
+
+def test_failed_evaluation_is_left_out_of_the_score(stub):
+    stub({
+        'schreiben': Evaluation(scores={}, overall_score=0, failed=True),
+        'sprechen': Evaluation(scores={}, overall_score=70)
+    })
+    report = asyncio.run(take_mock_exam({'lesen': 70, 'horen': 70, 'vokabular': 70}))
+    assert 'schreiben' not in report['section_scores']
+    assert report['unevaluated'] == ['schreiben']
+    assert report['score'] == 70
+    assert not report['complete']
+    assert not report['passed']
+
+
+def test_evaluated_subjective_section_is_scored(stub):
+    stub({'schreiben': Evaluation(scores={}, overall_score=85, suggestions=('Mehr Konnektoren',))})
+    report = asyncio.run(take_mock_exam({}))
+    assert report['section_scores']['schreiben'] == 85
+    assert report['complete']
+
+
+def test_pipelined_run_beats_the_sequential_baseline(stub):
+    engine, tutor = stub()
+
+    started = time.perf_counter()
+    asyncio.run(take_sequentially(engine, tutor))
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    report = asyncio.run(take_mock_exam({}))
+    pipelined = time.perf_counter() - started
+
+    assert report['complete']
+    # Sequential: 5 x (load + answer) + 2 evaluations = 0.66 s; pipelined: one load,
+    # 5 answers and the tail of the last evaluation, about 0.33 s
+    assert pipelined < sequential * 0.7
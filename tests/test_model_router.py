@@ -0,0 +1,128 @@
+"""Tests for ModelRouter failover, hedging and the total request deadline."""
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from bot.config import Config
+from bot.services import model_router as model_router_module
+from bot.services.llm_scheduler import LLMScheduler
+from bot.services.model_router import ModelRouter
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = LLMScheduler(rate_per_minute=6000, burst=100, max_concurrency=1)
+    monkeypatch.setattr(model_router_module, 'llm_scheduler', scheduler)
+    monkeypatch.setattr(Config, 'LLM_HEDGE_MIN_DELAY', 0.01)
+    return scheduler
+
+
+def test_fails_over_to_next_model(scheduler):
+    router = ModelRouter(models={'chat': ['a', 'b']}, hedge_tasks=[])
+    sent = []
+
+    async def post(model, timeout):
+        sent.append(model)
+        return httpx.Response(503 if model == 'a' else 200)
+
+    response = asyncio.run(router.request('chat', post, timeout=5))
+
+    assert response.status_code == 200
+    assert sent == ['a', 'b']
+    assert router.failovers == 1
+    assert router.stats_for('a').errors == 1
+
+
+def test_hedge_wins_over_slow_primary(scheduler, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_HEDGE_DEFAULT_DELAY', 0.05)
+    scheduler.max_concurrency = 2
+    router = ModelRouter(models={'chat': ['slow', 'fast']}, hedge_tasks=['chat'])
+    cancelled = []
+
+    async def post(model, timeout):
+        try:
+            await asyncio.sleep(5 if model == 'slow' else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return httpx.Response(200)
+
+    async def run():
+        response = await router.request('chat', post, timeout=5)
+        await asyncio.sleep(0.01)
+        return response
+
+    started = time.monotonic()
+    assert asyncio.run(run()).status_code == 200
+    assert time.monotonic() - started < 1
+    assert router.hedges == 1 and router.hedge_wins == 1
+    assert cancelled == ['slow']
+
+
+def test_deadline_includes_scheduler_queueing(scheduler):
+    router = ModelRouter(models={'chat': ['a']}, hedge_tasks=[])
+
+    async def post(model, timeout):
+        return httpx.Response(200)
+
+    async def run():
+        # Another request holds the only slot, so ours never leaves the queue
+        blocker = asyncio.ensure_future(scheduler.submit(lambda: asyncio.sleep(5)))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            await router.request('chat', post, timeout=0.1)
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(0)
+        queued = scheduler.stats()['queued']['chat']
+        blocker.cancel()
+        return elapsed, queued
+
+    elapsed, queued = asyncio.run(run())
+    assert elapsed < 0.5
+    assert queued == 0  # the timed-out attempt was dropped from the queue
+    assert router.timeouts == 1
+
+
+def test_deadline_cancels_running_attempts(scheduler):
+    router = ModelRouter(models={'chat': ['a', 'b']}, hedge_tasks=[])
+    cancelled = []
+
+    async def post(model, timeout):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+
+    async def run():
+        with pytest.raises(httpx.TimeoutException):
+            await router.request('chat', post, timeout=0.1)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert cancelled == ['a']
+    assert scheduler.stats()['active'] == 0
+
+
+def test_rate_limits_do_not_count_as_model_failures(scheduler, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_MODEL_FAILURE_THRESHOLD', 2)
+    scheduler.max_attempts = 3
+    router = ModelRouter(models={'chat': ['a', 'b']}, hedge_tasks=[])
+    sent = []
+
+    async def post(model, timeout):
+        sent.append(model)
+        return httpx.Response(429 if model == 'a' else 200, headers={'Retry-After': '0'})
+
+    response = asyncio.run(router.request('chat', post, timeout=5))
+
+    # The scheduler retried the 429s, then the router failed over; 'a' is not cooling down
+    assert response.status_code == 200
+    assert sent == ['a', 'a', 'a', 'b']
+    stats = router.stats_for('a')
+    assert (stats.rate_limited, stats.errors, stats.consecutive_errors) == (3, 0, 0)
+    assert stats.available
+    assert router.candidates('chat') == ['a', 'b']
@@ -0,0 +1,25 @@
+"""Tests for the slotted row models."""
+import pytest
+
+from benchmark_session_memory import measure, dict_session, model_session
+from bot.services.models import (
+    User, ExamQuestion, Answer, Evaluation, ProgressEntry, SpeechMetrics, VocabularyCard
+)
+
+
+@pytest.mark.parametrize('model', [User, ExamQuestion, Answer, Evaluation, ProgressEntry, SpeechMetrics, VocabularyCard])
+def test_models_are_slotted(model):
+    assert '__slots__' in vars(model)
+    assert '__dict__' not in dir(model)
+
+
+def test_question_from_row_defaults():
+    question = ExamQuestion.from_row({'id': 7, 'level': 'A1', 'exam_type': 'lesen', 'question_text': None})
+    assert question.id == '7'
+    assert question.prompt == ''
+    assert question.data == {}
+    assert question.topic == 'lesen'
+
+
+def test_exam_sessions_take_less_memory_than_row_dicts():
+    assert measure(model_session, 500) < measure(dict_session, 500) * 0.8
@@ -0,0 +1,147 @@
+"""Tests for partial transcripts: throttling, the worker stream and the status message edits."""
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.config import Config
+from bot.services import speech as speech_module
+from bot.services import speech_worker
+from bot.services.models import Transcript
+from bot.services.speech import SpeechService
+
+# The handlers import speech_service; a worker socket keeps it from loading a model
+if speech_module._speech_service is None:
+    speech_module._speech_service = SpeechService(worker_sockets=['unused.sock'])
+
+from bot.handlers import exam, learn  # noqa: E402
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """SpeechService whose Whisper stub decodes (delay, text) segments in order."""
+    service = SpeechService(worker_sockets=['unused.sock'])
+
+    def transcribe(segments, language, tier, on_segment=None, word_timestamps=False):
+        parts = []
+        for delay, text in segments:
+            time.sleep(delay)
+            parts.append(text)
+            if on_segment:
+                on_segment(' '.join(parts))
+        return Transcript(' '.join(parts))
+
+    monkeypatch.setattr(service, '_transcribe_sync', transcribe)
+    return service
+
+
+def test_partials_are_throttled_to_the_interval(service, monkeypatch):
+    monkeypatch.setattr(Config, 'PARTIAL_TRANSCRIPT_INTERVAL', 0.2)
+    partials = []
+
+    async def on_partial(text):
+        partials.append(text)
+
+    # Segments at about 0, 0.05, 0.1, 0.25, 0.3 and 0.5 s
+    segments = [(0, 'a'), (0.05, 'b'), (0.05, 'c'), (0.15, 'd'), (0.05, 'e'), (0.2, 'f')]
+    transcript = asyncio.run(service.transcribe_samples(segments, 'de', 'fast', on_partial))
+
+    assert transcript.text == 'a b c d e f'
+    assert partials == ['a', 'a b c d', 'a b c d e f']
+
+
+def test_worker_streams_partials_to_the_bot(service, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'PARTIAL_TRANSCRIPT_INTERVAL', 0)
+    # The worker receives PCM samples; its Whisper stub decodes fixed segments instead
+    transcribe = service._transcribe_sync
+    segments = [(0.01, 'Ich'), (0.01, 'habe'), (0.01, 'Hunger')]
+    monkeypatch.setattr(service, '_transcribe_sync', lambda audio, *args: transcribe(segments, *args))
+
+    path = str(tmp_path / 'worker.sock')
+    bot_side = SpeechService(worker_sockets=[path])
+    partials = []
+
+    async def on_partial(text):
+        partials.append(text)
+
+    async def run():
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: speech_worker.handle_client(service, reader, writer), path=path
+        )
+        async with server:
+            return await bot_side._transcribe_remote(
+                b'\x00' * 8, speech_worker.ENCODING_PCM_F32, 'de', 'fast', on_partial
+            )
+
+    transcript = asyncio.run(run())
+
+    assert transcript.text == 'Ich habe Hunger'
+    assert partials == ['Ich', 'Ich habe', 'Ich habe Hunger']
+
+
+class StatusMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+class VoiceMessage:
+    def __init__(self):
+        self.voice = SimpleNamespace(file_id='f', file_unique_id='u')
+        self.status = StatusMessage()
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return self.status
+
+
+class StubSpeech:
+    """Speech service that reports one partial before returning `result`."""
+
+    is_available = True
+
+    def __init__(self, result):
+        self.result = result
+
+    async def _transcribe(self, on_partial):
+        await on_partial('Ich habe')
+        return self.result
+
+    async def transcribe_telegram_voice(self, voice, bot, tier='standard', on_partial=None):
+        return await self._transcribe(on_partial)
+
+    async def transcribe_speech(self, voice, bot, tier='accurate', on_partial=None):
+        return await self._transcribe(on_partial)
+
+
+def voice_update():
+    message = VoiceMessage()
+    update = SimpleNamespace(message=message, effective_user=SimpleNamespace(id=42))
+    context = SimpleNamespace(user_data={}, bot=None)
+    return message, update, context
+
+
+def test_speaking_exam_shows_partial_then_final_text(monkeypatch):
+    monkeypatch.setattr(exam, 'speech_service', StubSpeech(Transcript('Ich habe Hunger')))
+    message, update, context = voice_update()
+
+    asyncio.run(exam.handle_speaking_input(update, context))
+
+    assert message.status.edits[0] == 'Processing your voice message...\n\n"Ich habe..."'
+    assert message.status.edits[1].startswith('Transcribed: "Ich habe Hunger"')
+    assert context.user_data['speaking_response'] == 'Ich habe Hunger'
+
+
+def test_tutoring_shows_partial_text_while_listening(monkeypatch):
+    # No final transcript, so the handler stops before calling the tutor
+    monkeypatch.setattr(learn, 'speech_service', StubSpeech(None))
+    message, update, context = voice_update()
+
+    asyncio.run(learn.handle_message(update, context))
+
+    assert message.status.edits == ['Listening... / Ich hore zu...\n\n"Ich habe..."']
+    assert message.replies[-1].startswith("Sorry, I couldn't transcribe")
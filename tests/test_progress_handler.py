@@ -0,0 +1,117 @@
+"""Tests for exam history paging in the progress handler (the database is stubbed)."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services import speech as speech_module
+from bot.services.speech import SpeechService
+
+# bot.handlers imports the exam handlers; a worker socket keeps speech_service from loading a model
+if speech_module._speech_service is None:
+    speech_module._speech_service = SpeechService(worker_sockets=['unused.sock'])
+
+from bot.handlers import progress  # noqa: E402
+
+PAGE = progress.HISTORY_PAGE_SIZE
+
+
+class StubHistory:
+    """get_exam_history_page over an in-memory list, newest first."""
+
+    def __init__(self, count):
+        self.rows = [
+            {'id': f'{i:04d}', 'exam_type': 'lesen', 'score': 70, 'completed_at': f'2025-01-01T00:{i // 60:02d}:{i % 60:02d}'}
+            for i in reversed(range(count))
+        ]
+        self.calls = []
+
+    async def get_exam_history_page(self, user_id, cursor=None, newer=False, limit=5):
+        self.calls.append((cursor, newer))
+        keys = [(row['completed_at'], row['id']) for row in self.rows]
+        if cursor is None:
+            return self.rows[:limit], len(self.rows) > limit
+        if newer:
+            start = sum(1 for key in keys if key > cursor)
+            return self.rows[max(0, start - limit):start], start > limit
+        rows = [row for row, key in zip(self.rows, keys) if key < cursor]
+        return rows[:limit], len(rows) > limit
+
+
+class FakeQuery:
+    def __init__(self):
+        self.data = ''
+        self.text = None
+        self.markup = None
+
+    async def answer(self):
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None, **kwargs):
+        self.text = text
+        self.markup = reply_markup
+
+
+@pytest.fixture
+def history(monkeypatch):
+    def install(count):
+        stub = StubHistory(count)
+        monkeypatch.setattr(progress, 'db', stub)
+        query = FakeQuery()
+        update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=42))
+        context = SimpleNamespace(user_data={})
+
+        def press(data):
+            query.data = data
+            asyncio.run(progress.progress_callback(update, context))
+            return context.user_data.get('history_cursors')
+
+        return stub, query, press
+    return install
+
+
+def boundaries(rows):
+    return (rows[0]['completed_at'], rows[0]['id']), (rows[-1]['completed_at'], rows[-1]['id'])
+
+
+def navigation(query):
+    """Labels of the Older/Newer buttons shown."""
+    return [button.text for row in query.markup.inline_keyboard[:-1] for button in row]
+
+
+def test_browsing_older_and_back_updates_the_cursors(history):
+    stub, query, press = history(PAGE * 2 + 3)
+
+    assert press('view_history') == boundaries(stub.rows[:PAGE])
+    assert navigation(query) == ['Older']
+
+    assert press('history_older') == boundaries(stub.rows[PAGE:PAGE * 2])
+    assert stub.calls[-1] == (boundaries(stub.rows[:PAGE])[1], False)
+    assert navigation(query) == ['Newer', 'Older']
+
+    assert press('history_older') == boundaries(stub.rows[PAGE * 2:])
+    assert navigation(query) == ['Newer']
+
+    assert press('history_newer') == boundaries(stub.rows[PAGE:PAGE * 2])
+    assert stub.calls[-1] == (boundaries(stub.rows[PAGE * 2:])[0], True)
+
+    assert press('history_newer') == boundaries(stub.rows[:PAGE])
+    assert navigation(query) == ['Older']
+
+
+@pytest.mark.parametrize('button', ['history_older', 'history_newer'])
+def test_browsing_past_either_end_restarts_at_the_newest_page(history, button):
+    stub, query, press = history(PAGE)
+    press('view_history')
+
+    # A stale button pages past the end; the newest page is shown again
+    assert press(button) == boundaries(stub.rows)
+    assert stub.calls[-1] == (None, False)
+    assert navigation(query) == []
+
+
+def test_empty_history_clears_the_cursors(history):
+    stub, query, press = history(0)
+
+    assert press('view_history') is None
+    assert query.text.startswith('No exam history yet')
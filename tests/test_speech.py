@@ -0,0 +1,216 @@
+"""Tests for SpeechService: transcription dispatch, tiers, VAD and fluency metrics (Whisper is stubbed)."""
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bot.config import Config
+from bot.services.models import SpeechMetrics, Transcript
+from bot.services import speech_worker
+from bot.services.speech import SpeechService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(Config, 'WHISPER_WORKERS', 2)
+    # A worker socket keeps the constructor from loading a model; clips are still transcribed locally
+    service = SpeechService(worker_sockets=['unused.sock'])
+
+    def transcribe(audio, language, tier, on_segment=None, word_timestamps=False):
+        time.sleep(audio)
+        return Transcript(f"{audio}s clip")
+
+    monkeypatch.setattr(service, '_transcribe_sync', transcribe)
+    return service
+
+
+def test_short_clip_is_not_held_up_by_a_long_one(service):
+    async def run():
+        started = time.monotonic()
+        finished = {}
+
+        async def transcribe(seconds):
+            await service.transcribe_samples(seconds, 'de', 'standard')
+            finished[seconds] = time.monotonic() - started
+
+        await asyncio.gather(transcribe(0.5), transcribe(0.05))
+        return finished
+
+    finished = asyncio.run(run())
+    assert finished[0.05] < 0.25
+    assert finished[0.5] >= 0.5
+
+
+def test_clips_beyond_the_worker_count_wait_for_a_free_slot(service):
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(*(service.transcribe_samples(0.1, 'de', 'standard') for _ in range(3)))
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(run())
+    assert [r.text for r in results] == ['0.1s clip'] * 3
+    assert 0.2 <= elapsed < 0.35  # two run at once, the third after one of them
+
+
+def test_errors_reach_only_their_caller(service, monkeypatch):
+    def transcribe(audio, language, tier, on_segment=None, word_timestamps=False):
+        if audio == 'broken':
+            raise RuntimeError('decode failed')
+        return Transcript('ok')
+
+    monkeypatch.setattr(service, '_transcribe_sync', transcribe)
+
+    async def run():
+        return await asyncio.gather(
+            service.transcribe_samples('broken', 'de', 'standard'),
+            service.transcribe_samples('fine', 'de', 'standard'),
+            return_exceptions=True
+        )
+
+    broken, fine = asyncio.run(run())
+    assert isinstance(broken, RuntimeError)
+    assert fine.text == 'ok'
+
+
+def test_voice_notes_are_decoded_off_the_event_loop(service, monkeypatch):
+    threads = []
+
+    def prepare_voice(data):
+        threads.append(threading.current_thread().name)
+        return 0.0
+
+    class File:
+        async def download_as_bytearray(self):
+            return bytearray(b'ogg')
+
+    class Bot:
+        async def get_file(self, file_id):
+            return File()
+
+    monkeypatch.setattr(service, 'prepare_voice', prepare_voice)
+    service.worker_sockets = []
+    service.model = object()
+    service.cache = None
+    voice = type('Voice', (), {'file_id': 'f', 'file_unique_id': 'u'})()
+
+    text = asyncio.run(service.transcribe_telegram_voice(voice, Bot()))
+
+    assert text == '0.0s clip'
+    assert threads and threads[0].startswith('whisper')
+
+
+def test_worker_decodes_off_the_event_loop(service, monkeypatch, tmp_path):
+    threads = []
+
+    def prepare_voice(data):
+        threads.append(threading.current_thread().name)
+        return 0.0
+
+    monkeypatch.setattr(service, 'prepare_voice', prepare_voice)
+    path = str(tmp_path / 'worker.sock')
+
+    async def run():
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: speech_worker.handle_client(service, reader, writer), path=path
+        )
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await speech_worker.write_request(writer, b'ogg', speech_worker.ENCODING_COMPRESSED, 'de', 'fast')
+            frame = await speech_worker.read_frame(reader)
+            writer.close()
+            return frame
+
+    assert asyncio.run(run()) == (speech_worker.FRAME_FINAL, '0.0s clip')
+    assert threads[0].startswith('whisper')
+
+
+@pytest.mark.parametrize('pending, requested, used', [
+    (0, 'accurate', 'accurate'),
+    (7, 'accurate', 'accurate'),
+    (8, 'accurate', 'standard'),
+    (8, 'fast', 'fast'),
+    (16, 'accurate', 'fast'),
+    (0, 'unknown', 'standard'),
+])
+def test_tiers_downgrade_while_the_queue_is_long(service, monkeypatch, pending, requested, used):
+    monkeypatch.setattr(Config, 'WHISPER_DOWNGRADE_QUEUE', 8)
+    service._pending = pending
+    assert service._effective_tier(requested) == used
+
+
+def test_downgrade_can_be_disabled(service, monkeypatch):
+    monkeypatch.setattr(Config, 'WHISPER_DOWNGRADE_QUEUE', 0)
+    service._pending = 100
+    assert service._effective_tier('accurate') == 'accurate'
+
+
+def clip(*parts):
+    """Synthetic 16 kHz clip from (seconds, amplitude) parts: faint noise, or a 220 Hz tone."""
+    rng = np.random.default_rng(0)
+    chunks = []
+    for seconds, amplitude in parts:
+        n = int(SpeechService.SAMPLE_RATE * seconds)
+        noise = rng.normal(0, 0.001, n)
+        tone = amplitude * np.sin(2 * np.pi * 220 * np.arange(n) / SpeechService.SAMPLE_RATE)
+        chunks.append(noise + tone)
+    return np.concatenate(chunks).astype(np.float32)
+
+
+def test_vad_trims_leading_and_trailing_silence(service):
+    trimmed = service.trim_silence(clip((1.0, 0), (1.0, 0.3), (1.0, 0)))
+    # One second of speech plus VAD_PADDING_MS on both sides, to the frame
+    expected = 1.0 + 2 * Config.VAD_PADDING_MS / 1000
+    assert abs(len(trimmed) / SpeechService.SAMPLE_RATE - expected) <= 2 * Config.VAD_FRAME_MS / 1000
+
+
+def test_vad_keeps_clips_without_pauses(service):
+    audio = clip((2.0, 0.3))
+    assert len(service.trim_silence(audio)) >= len(audio) - SpeechService.SAMPLE_RATE * Config.VAD_FRAME_MS // 1000
+
+
+@pytest.mark.parametrize('parts', [
+    [(2.0, 0)],
+    [(1.0, 0), (0.1, 0.3), (1.0, 0)],
+    [(0.01, 0.3)],
+])
+def test_vad_rejects_clips_without_speech(service, parts):
+    assert service.trim_silence(clip(*parts)) is None
+
+
+def words(*timings):
+    """Whisper-like words from (start, end, probability) tuples."""
+    return [SimpleNamespace(word=f' w{i}', start=start, end=end, probability=p) for i, (start, end, p) in enumerate(timings)]
+
+
+def test_fluency_metrics_from_word_timings():
+    metrics = SpeechService.speech_metrics(words(
+        (0.0, 0.5, 0.9),
+        (0.6, 1.0, 0.9),   # 0.1 s gap: articulation, not a pause
+        (1.5, 2.0, 0.3),   # 0.5 s pause
+        (3.5, 4.0, 0.9),   # 1.5 s long pause
+    ))
+    assert metrics.duration == 4.0
+    assert metrics.word_count == 4
+    assert metrics.words_per_minute == 60.0
+    assert metrics.articulation_rate == 120.0
+    assert (metrics.pause_count, metrics.long_pause_count) == (2, 1)
+    assert (metrics.mean_pause, metrics.max_pause, metrics.pause_ratio) == (1.0, 1.5, 0.5)
+    assert metrics.low_confidence_words == ('w2',)
+    assert SpeechMetrics.from_dict(metrics.to_dict()) == metrics
+
+
+def test_fluency_metrics_need_two_words():
+    assert SpeechService.speech_metrics(words((0.0, 0.5, 0.9))) is None
+    assert SpeechService.speech_metrics(words((1.0, 1.0, 0.9), (1.0, 1.0, 0.9))) is None
+
+
+def test_fluency_metrics_overhead_is_small():
+    # A two-minute answer at about 150 words a minute
+    answer = words(*((i * 0.4, i * 0.4 + 0.3, 0.8) for i in range(300)))
+    started = time.perf_counter()
+    for _ in range(20):
+        SpeechService.speech_metrics(answer)
+    assert (time.perf_counter() - started) / 20 < 0.01
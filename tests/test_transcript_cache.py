@@ -0,0 +1,91 @@
+"""Tests for TranscriptCache on a temporary SQLite file."""
+import sqlite3
+
+import pytest
+
+from bot.services.models import SpeechMetrics, Transcript
+from bot.services.transcript_cache import TranscriptCache
+
+METRICS = SpeechMetrics(duration=4.0, word_count=8, words_per_minute=120.0, articulation_rate=140.0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranscriptCache(path=str(tmp_path / 'transcripts.db'), ttl_seconds=3600, max_entries=3)
+
+
+def age(cache, file_unique_id, seconds):
+    """Backdate a cached note's entries."""
+    cache._conn.execute(
+        "UPDATE transcripts SET created_at = created_at - ? WHERE file_unique_id = ?", (seconds, file_unique_id)
+    )
+    cache._conn.commit()
+
+
+def test_hit_and_miss_counts(cache):
+    cache.put('note', 'standard', Transcript('Guten Morgen'))
+
+    assert cache.get('note', ['standard']).text == 'Guten Morgen'
+    assert cache.get('other', ['standard']) is None
+    assert cache.get('note', ['accurate']) is None
+
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': pytest.approx(1 / 3), 'entries': 1}
+
+
+def test_expired_entries_are_not_served_and_get_evicted(cache):
+    cache.put('old', 'fast', Transcript('alt'))
+    age(cache, 'old', 3601)
+
+    assert cache.get('old', ['fast']) is None
+    cache.put('new', 'fast', Transcript('neu'))
+    assert cache.stats()['entries'] == 1
+
+
+def test_oldest_entries_are_evicted_beyond_max_entries(cache):
+    for i in range(3):
+        cache.put(f'note{i}', 'fast', Transcript(f'Text {i}'))
+        age(cache, f'note{i}', 100 - i)  # note0 is the oldest
+    cache.put('note3', 'fast', Transcript('Text 3'))
+
+    assert cache.stats()['entries'] == 3
+    assert cache.get('note0', ['fast']) is None
+    assert cache.get('note1', ['fast']).text == 'Text 1'
+
+
+def test_tiers_are_tried_in_the_given_order(cache):
+    cache.put('note', 'standard', Transcript('standard text'))
+    cache.put('note', 'accurate', Transcript('accurate text'))
+
+    assert cache.get('note', ['standard', 'accurate']).text == 'standard text'
+    assert cache.get('note', ['accurate', 'standard']).text == 'accurate text'
+    assert cache.get('note', ['fast', 'accurate']).text == 'accurate text'
+
+
+def test_with_metrics_skips_transcripts_stored_without_them(cache):
+    cache.put('note', 'fast', Transcript('ohne Messwerte'))
+    assert cache.get('note', ['fast'], with_metrics=True) is None
+
+    cache.put('note', 'accurate', Transcript('mit Messwerten', METRICS))
+    cached = cache.get('note', ['fast', 'accurate'], with_metrics=True)
+    assert cached.text == 'mit Messwerten'
+    assert cached.metrics == METRICS
+
+
+def test_adds_metrics_column_to_old_cache_files(tmp_path):
+    path = str(tmp_path / 'transcripts.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE transcripts (
+            file_unique_id TEXT NOT NULL, tier TEXT NOT NULL, text TEXT NOT NULL,
+            created_at REAL NOT NULL, PRIMARY KEY (file_unique_id, tier)
+        )
+    """)
+    conn.execute("INSERT INTO transcripts VALUES ('old', 'fast', 'Hallo', strftime('%s', 'now'))")
+    conn.commit()
+    conn.close()
+
+    cache = TranscriptCache(path=path)
+
+    assert cache.get('old', ['fast']).text == 'Hallo'
+    cache.put('new', 'accurate', Transcript('Tschüss', METRICS))
+    assert cache.get('new', ['accurate'], with_metrics=True).metrics == METRICS
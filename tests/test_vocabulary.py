@@ -0,0 +1,60 @@
+"""Tests for SM-2 scheduling, the due-card heap and card rows."""
+import pytest
+
+from bot.config import Config
+from bot.services.models import VocabularyCard, parse_timestamp
+from bot.services.vocabulary import Deck, sm2, DAY
+
+NOW = 1_700_000_000.0
+
+
+def test_sm2_intervals_grow_1_6_then_by_ease():
+    card = VocabularyCard('Haus', 'A1')
+    card = sm2(card, 5, NOW)
+    assert (card.repetitions, card.interval_days, card.due_at) == (1, 1.0, NOW + DAY)
+    card = sm2(card, 5, NOW)
+    assert card.interval_days == 6.0
+    ease = card.ease
+    card = sm2(card, 4, NOW)
+    assert card.interval_days == round(6.0 * ease, 1)
+
+
+def test_sm2_lapse_resets_and_relearns_soon():
+    card = sm2(sm2(VocabularyCard('Haus', 'A1'), 5, NOW), 5, NOW)
+    card = sm2(card, 1, NOW)
+    assert (card.repetitions, card.interval_days, card.lapses) == (0, 0, 1)
+    assert card.due_at == NOW + Config.VOCAB_RELEARN_MINUTES * 60
+
+
+def test_sm2_ease_never_drops_below_1_3():
+    card = VocabularyCard('Haus', 'A1')
+    for _ in range(20):
+        card = sm2(card, 0, NOW)
+    assert card.ease == 1.3
+
+
+def test_deck_yields_cards_in_due_order_and_skips_stale_entries():
+    deck = Deck([VocabularyCard('a', 'A1', due_at=NOW - 10), VocabularyCard('b', 'A1', due_at=NOW - 5)])
+    assert deck.next_due(NOW).word == 'a'
+
+    deck.add(sm2(deck.cards['a'], 5, NOW))  # 'a' moves a day ahead
+    assert deck.next_due(NOW).word == 'b'
+    assert deck.next_due(NOW - 6) is None
+    assert deck.due_count(NOW) == 1
+
+
+@pytest.mark.parametrize('value', [
+    '2025-03-01T12:00:00.12345+00:00',  # 5-digit fraction, rejected by fromisoformat before 3.11
+    '2025-03-01T12:00:00.1+00:00',
+    '2025-03-01T12:00:00Z',
+    '2025-03-01 12:00:00+00',
+    '2025-03-01T12:00:00',
+])
+def test_card_rows_parse_postgrest_timestamps(value):
+    card = VocabularyCard.from_row({'word': 'Haus', 'level': 'A1', 'due_at': value})
+    assert int(card.due_at) == int(parse_timestamp('2025-03-01T12:00:00+00:00').timestamp())
+
+
+def test_card_row_round_trip():
+    card = VocabularyCard('Haus', 'A1', ease=2.36, interval_days=6.0, repetitions=2, lapses=1, due_at=NOW + 0.25)
+    assert VocabularyCard.from_row(card.to_row(user_id=1)) == card